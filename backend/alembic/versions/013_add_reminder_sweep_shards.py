@@ -0,0 +1,46 @@
+"""Add reminder_sweep_shards table
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '013'
+down_revision: Union[str, None] = '012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'reminder_sweep_shards',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('run_date', sa.Date(), nullable=False),
+        sa.Column('shard', sa.Integer(), nullable=False),
+        sa.Column('shard_count', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('owner', sa.String(length=255), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_user_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('reminders_created', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('run_date', 'shard', name='unique_shard_per_run')
+    )
+    op.create_index(op.f('ix_reminder_sweep_shards_id'), 'reminder_sweep_shards', ['id'], unique=False)
+    op.create_index('idx_reminder_sweep_shards_claim', 'reminder_sweep_shards', ['run_date', 'status'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_reminder_sweep_shards_claim', table_name='reminder_sweep_shards')
+    op.drop_index(op.f('ix_reminder_sweep_shards_id'), table_name='reminder_sweep_shards')
+    op.drop_table('reminder_sweep_shards')
@@ -0,0 +1,116 @@
+"""Add photo_blobs table and backfill it from the upload directory
+
+Every stored photo gets a row keyed by the SHA-256 of its bytes, with a
+reference count of the plants, plant_photos and room_photos rows that use it.
+Files with identical content are merged: references are repointed at one
+copy. The redundant files are left on disk (no row references them any
+more), so a failed or rolled back migration never leaves rows pointing at
+deleted files.
+
+The backfill can only hash the stored files, which save_photo has already
+re-encoded, whereas new uploads are keyed by the SHA-256 of the raw upload
+bytes. So a legacy row's content_hash identifies its stored file, not the
+original photo: uploading that original again does not dedupe against it
+and creates a new blob.
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-17
+
+"""
+import hashlib
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '014'
+down_revision: Union[str, None] = '013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REFERENCING_TABLES = ('plants', 'plant_photos', 'room_photos')
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def upgrade() -> None:
+    photo_blobs = op.create_table(
+        'photo_blobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('photo_url', sa.String(length=500), nullable=False),
+        sa.Column('size_bytes', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('last_uploaded_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('photo_url')
+    )
+    op.create_index(op.f('ix_photo_blobs_id'), 'photo_blobs', ['id'], unique=False)
+    op.create_index(op.f('ix_photo_blobs_content_hash'), 'photo_blobs', ['content_hash'], unique=True)
+
+    # Backfill from the files on disk
+    upload_dir = settings.UPLOAD_DIR
+    if not os.path.isdir(upload_dir):
+        return
+
+    files_by_hash = defaultdict(list)
+    for entry in sorted(os.scandir(upload_dir), key=lambda e: e.name):
+        if entry.is_file() and not entry.name.startswith('.'):
+            files_by_hash[_sha256(entry.path)].append(entry.name)
+    if not files_by_hash:
+        return
+
+    bind = op.get_bind()
+    ref_counts = defaultdict(int)
+    for table in REFERENCING_TABLES:
+        rows = bind.execute(sa.text(
+            f"SELECT photo_url, COUNT(*) FROM {table} WHERE photo_url LIKE '/photos/%' GROUP BY photo_url"
+        ))
+        for photo_url, count in rows:
+            ref_counts[photo_url] += count
+
+    blobs = []
+    for content_hash, names in files_by_hash.items():
+        # Keep the most referenced copy and point the others' references at it
+        names.sort(key=lambda name: -ref_counts[f"/photos/{name}"])
+        keep_url = f"/photos/{names[0]}"
+        for duplicate in names[1:]:
+            duplicate_url = f"/photos/{duplicate}"
+            for table in REFERENCING_TABLES:
+                bind.execute(
+                    sa.text(f"UPDATE {table} SET photo_url = :keep WHERE photo_url = :duplicate"),
+                    {"keep": keep_url, "duplicate": duplicate_url}
+                )
+            ref_counts[keep_url] += ref_counts.pop(duplicate_url, 0)
+
+        stat = os.stat(os.path.join(upload_dir, names[0]))
+        blobs.append({
+            'content_hash': content_hash,
+            'photo_url': keep_url,
+            'size_bytes': stat.st_size,
+            'ref_count': ref_counts[keep_url],
+            'last_uploaded_at': datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+        })
+
+    op.bulk_insert(photo_blobs, blobs)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_photo_blobs_content_hash'), table_name='photo_blobs')
+    op.drop_index(op.f('ix_photo_blobs_id'), table_name='photo_blobs')
+    op.drop_table('photo_blobs')
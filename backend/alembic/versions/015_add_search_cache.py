@@ -0,0 +1,46 @@
+"""Add search_cache table
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '015'
+down_revision: Union[str, None] = '014'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'search_cache',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cache_key', sa.String(length=64), nullable=False),
+        sa.Column('query', sa.Text(), nullable=False),
+        sa.Column('num_results', sa.Integer(), nullable=False),
+        sa.Column('results', sa.JSON(), nullable=False),
+        sa.Column('is_empty', sa.Boolean(), nullable=False, server_default='false'),
+        sa.Column('fetched_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_search_cache_id'), 'search_cache', ['id'], unique=False)
+    op.create_index(op.f('ix_search_cache_cache_key'), 'search_cache', ['cache_key'], unique=True)
+    op.create_index(op.f('ix_search_cache_expires_at'), 'search_cache', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_search_cache_expires_at'), table_name='search_cache')
+    op.drop_index(op.f('ix_search_cache_cache_key'), table_name='search_cache')
+    op.drop_index(op.f('ix_search_cache_id'), table_name='search_cache')
+    op.drop_table('search_cache')
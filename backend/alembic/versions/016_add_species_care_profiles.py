@@ -0,0 +1,209 @@
+"""Add species_care_profiles and fold per-plant care recommendations into them
+
+Care recommendations are now stored once per species. For every species
+that already has per-plant recommendations, the most recently refreshed
+plant's rows become the species profile, the other plants' copies are
+deleted and all of those plants are linked to the profile.
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-17
+
+"""
+import random
+import re
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '016'
+down_revision: Union[str, None] = '015'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RECOMMENDATION_COLUMNS = (
+    'species_name', 'lighting', 'watering', 'humidity', 'temperature', 'misting', 'soil',
+    'room_placement', 'seasonal_care', 'source_url', 'source_title', 'rank', 'created_at'
+)
+
+species_care_profiles = sa.table(
+    'species_care_profiles',
+    sa.column('id', sa.Integer()),
+    sa.column('species_key', sa.String()),
+    sa.column('species_name', sa.String()),
+    sa.column('care_summary', sa.Text()),
+    sa.column('incomplete', sa.Boolean()),
+    sa.column('refreshed_at', sa.DateTime(timezone=True)),
+    sa.column('expires_at', sa.DateTime(timezone=True)),
+    sa.column('refresh_after', sa.DateTime(timezone=True)),
+)
+care_recommendations = sa.table(
+    'care_recommendations',
+    sa.column('id', sa.Integer()),
+    sa.column('plant_id', sa.Integer()),
+    sa.column('profile_id', sa.Integer()),
+    sa.column('species_name', sa.String()),
+    sa.column('created_at', sa.DateTime(timezone=True)),
+)
+plants = sa.table(
+    'plants',
+    sa.column('id', sa.Integer()),
+    sa.column('species', sa.String()),
+    sa.column('identified_common_name', sa.String()),
+    sa.column('care_summary', sa.Text()),
+    sa.column('care_profile_id', sa.Integer()),
+)
+
+
+def _species_key(species: str) -> str:
+    # Same normalization as app.services.care_profiles.species_key
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", species)).strip().lower()
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'species_care_profiles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('species_key', sa.String(length=255), nullable=False),
+        sa.Column('species_name', sa.String(length=255), nullable=False),
+        sa.Column('care_summary', sa.Text(), nullable=True),
+        sa.Column('incomplete', sa.Boolean(), nullable=False, server_default='false'),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('refresh_after', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_species_care_profiles_id'), 'species_care_profiles', ['id'], unique=False)
+    op.create_index(op.f('ix_species_care_profiles_species_key'), 'species_care_profiles', ['species_key'], unique=True)
+    op.create_index(op.f('ix_species_care_profiles_refresh_after'), 'species_care_profiles', ['refresh_after'], unique=False)
+
+    with op.batch_alter_table('care_recommendations') as batch_op:
+        batch_op.add_column(sa.Column('profile_id', sa.Integer(), nullable=True))
+        batch_op.alter_column('plant_id', existing_type=sa.Integer(), nullable=True)
+        batch_op.create_foreign_key(
+            'fk_care_recommendations_profile_id', 'species_care_profiles',
+            ['profile_id'], ['id'], ondelete='CASCADE'
+        )
+        batch_op.create_index(op.f('ix_care_recommendations_profile_id'), ['profile_id'], unique=False)
+
+    with op.batch_alter_table('plants') as batch_op:
+        batch_op.add_column(sa.Column('care_profile_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_plants_care_profile_id', 'species_care_profiles',
+            ['care_profile_id'], ['id'], ondelete='SET NULL'
+        )
+        batch_op.create_index(op.f('ix_plants_care_profile_id'), ['care_profile_id'], unique=False)
+
+    _fold_recommendations()
+
+
+def _fold_recommendations() -> None:
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(
+            care_recommendations.c.plant_id,
+            care_recommendations.c.species_name,
+            care_recommendations.c.created_at,
+            plants.c.species,
+            plants.c.identified_common_name,
+            plants.c.care_summary,
+        ).select_from(
+            care_recommendations.join(plants, plants.c.id == care_recommendations.c.plant_id)
+        )
+    ).fetchall()
+
+    # species key -> plant id -> (latest refresh, species name, care summary)
+    species_plants = {}
+    for plant_id, species_name, created_at, species, common_name, care_summary in rows:
+        name = species_name or species or common_name
+        if not name or not _species_key(name):
+            continue
+        refreshed_at = _as_utc(created_at) if created_at else datetime.min.replace(tzinfo=timezone.utc)
+        by_plant = species_plants.setdefault(_species_key(name), {})
+        previous = by_plant.get(plant_id)
+        if previous is None or refreshed_at > previous[0]:
+            by_plant[plant_id] = (refreshed_at, name, care_summary)
+
+    now = datetime.now(timezone.utc)
+    ttl = timedelta(days=settings.CARE_PROFILE_TTL_DAYS)
+    window = min(timedelta(hours=settings.CARE_PROFILE_REFRESH_WINDOW_HOURS), ttl / 2)
+
+    for key, by_plant in species_plants.items():
+        keep_plant = max(by_plant, key=lambda plant_id: by_plant[plant_id][0])
+        refreshed_at, name, care_summary = by_plant[keep_plant]
+        if refreshed_at.year == 1:
+            refreshed_at = now
+
+        expires_at = refreshed_at + ttl
+        refresh_after = expires_at - window * random.random()
+        if refresh_after < now:
+            # Spread renewals of already-stale profiles over the next window
+            refresh_after = now + window * random.random()
+
+        profile_id = bind.execute(
+            species_care_profiles.insert().values(
+                species_key=key,
+                species_name=name,
+                care_summary=care_summary,
+                incomplete=False,
+                refreshed_at=refreshed_at,
+                expires_at=expires_at,
+                refresh_after=refresh_after,
+            ).returning(species_care_profiles.c.id)
+        ).scalar_one()
+
+        bind.execute(
+            care_recommendations.update()
+            .where(care_recommendations.c.plant_id == keep_plant)
+            .values(profile_id=profile_id, plant_id=None)
+        )
+        bind.execute(
+            care_recommendations.delete()
+            .where(care_recommendations.c.plant_id.in_(list(by_plant)))
+        )
+        bind.execute(
+            plants.update()
+            .where(plants.c.id.in_(list(by_plant)))
+            .values(care_profile_id=profile_id)
+        )
+
+
+def downgrade() -> None:
+    # Give every linked plant its own copy of its species' recommendations again
+    columns = ', '.join(RECOMMENDATION_COLUMNS)
+    selected = ', '.join(f'cr.{column}' for column in RECOMMENDATION_COLUMNS)
+    op.execute(
+        f"INSERT INTO care_recommendations (plant_id, {columns}) "
+        f"SELECT p.id, {selected} FROM plants p "
+        f"JOIN care_recommendations cr ON cr.profile_id = p.care_profile_id"
+    )
+    op.execute("DELETE FROM care_recommendations WHERE plant_id IS NULL")
+
+    with op.batch_alter_table('plants') as batch_op:
+        batch_op.drop_index(op.f('ix_plants_care_profile_id'))
+        batch_op.drop_constraint('fk_plants_care_profile_id', type_='foreignkey')
+        batch_op.drop_column('care_profile_id')
+
+    with op.batch_alter_table('care_recommendations') as batch_op:
+        batch_op.drop_index(op.f('ix_care_recommendations_profile_id'))
+        batch_op.drop_constraint('fk_care_recommendations_profile_id', type_='foreignkey')
+        batch_op.drop_column('profile_id')
+        batch_op.alter_column('plant_id', existing_type=sa.Integer(), nullable=False)
+
+    op.drop_index(op.f('ix_species_care_profiles_refresh_after'), table_name='species_care_profiles')
+    op.drop_index(op.f('ix_species_care_profiles_species_key'), table_name='species_care_profiles')
+    op.drop_index(op.f('ix_species_care_profiles_id'), table_name='species_care_profiles')
+    op.drop_table('species_care_profiles')
@@ -0,0 +1,132 @@
+"""Add normalized species name columns, species_aliases and trigram indexes
+
+SpeciesCache lookups compared lower(name) with the search key, which no
+plain index on the name columns can serve. The normalized forms are now
+stored in their own indexed columns, alternative names get an indexed
+species_aliases table, and on PostgreSQL pg_trgm GIN indexes back the
+"%term%" search of /enrichment/cache.
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.species_names import normalize_species_name
+
+
+# revision identifiers, used by Alembic.
+revision: str = '017'
+down_revision: Union[str, None] = '016'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+TRIGRAM_INDEXES = (
+    ('ix_species_cache_scientific_name_trgm', 'species_cache', 'scientific_name_normalized'),
+    ('ix_species_cache_common_name_trgm', 'species_cache', 'common_name_normalized'),
+    ('ix_species_aliases_name_trgm', 'species_aliases', 'name_normalized'),
+)
+
+species_cache = sa.table(
+    'species_cache',
+    sa.column('id', sa.Integer()),
+    sa.column('scientific_name', sa.String()),
+    sa.column('common_name', sa.String()),
+    sa.column('alternative_names', sa.JSON()),
+    sa.column('scientific_name_normalized', sa.String()),
+    sa.column('common_name_normalized', sa.String()),
+)
+species_aliases = sa.table(
+    'species_aliases',
+    sa.column('species_cache_id', sa.Integer()),
+    sa.column('name', sa.String()),
+    sa.column('name_normalized', sa.String()),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('species_cache') as batch_op:
+        batch_op.add_column(sa.Column('scientific_name_normalized', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('common_name_normalized', sa.String(length=255), nullable=True))
+        batch_op.create_index(op.f('ix_species_cache_scientific_name_normalized'), ['scientific_name_normalized'], unique=False)
+        batch_op.create_index(op.f('ix_species_cache_common_name_normalized'), ['common_name_normalized'], unique=False)
+
+    op.create_table(
+        'species_aliases',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('species_cache_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('name_normalized', sa.String(length=255), nullable=False),
+        sa.ForeignKeyConstraint(['species_cache_id'], ['species_cache.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('species_cache_id', 'name_normalized', name='uq_species_aliases_species_name')
+    )
+    op.create_index(op.f('ix_species_aliases_id'), 'species_aliases', ['id'], unique=False)
+    op.create_index(op.f('ix_species_aliases_species_cache_id'), 'species_aliases', ['species_cache_id'], unique=False)
+    op.create_index(op.f('ix_species_aliases_name_normalized'), 'species_aliases', ['name_normalized'], unique=False)
+
+    _backfill_names()
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, table, column in TRIGRAM_INDEXES:
+            op.execute(f"CREATE INDEX {name} ON {table} USING gin ({column} gin_trgm_ops)")
+
+
+def _backfill_names() -> None:
+    # Python rather than SQL, so existing rows get exactly the normalization new rows do
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(
+                species_cache.c.id,
+                species_cache.c.scientific_name,
+                species_cache.c.common_name,
+                species_cache.c.alternative_names,
+            ).where(species_cache.c.id > last_id).order_by(species_cache.c.id).limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+
+        aliases = []
+        for cache_id, scientific_name, common_name, alternative_names in rows:
+            bind.execute(
+                species_cache.update().where(species_cache.c.id == cache_id).values(
+                    scientific_name_normalized=normalize_species_name(scientific_name),
+                    common_name_normalized=normalize_species_name(common_name),
+                )
+            )
+            seen = set()
+            for name in alternative_names or []:
+                key = normalize_species_name(name) if isinstance(name, str) else None
+                if key and key not in seen:
+                    seen.add(key)
+                    aliases.append({'species_cache_id': cache_id, 'name': name[:255], 'name_normalized': key})
+
+        if aliases:
+            bind.execute(species_aliases.insert(), aliases)
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        for name, _, _ in TRIGRAM_INDEXES:
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    op.drop_index(op.f('ix_species_aliases_name_normalized'), table_name='species_aliases')
+    op.drop_index(op.f('ix_species_aliases_species_cache_id'), table_name='species_aliases')
+    op.drop_index(op.f('ix_species_aliases_id'), table_name='species_aliases')
+    op.drop_table('species_aliases')
+
+    with op.batch_alter_table('species_cache') as batch_op:
+        batch_op.drop_index(op.f('ix_species_cache_common_name_normalized'))
+        batch_op.drop_index(op.f('ix_species_cache_scientific_name_normalized'))
+        batch_op.drop_column('common_name_normalized')
+        batch_op.drop_column('scientific_name_normalized')
@@ -0,0 +1,50 @@
+"""Add toxicity_verdicts table
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '018'
+down_revision: Union[str, None] = '017'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'toxicity_verdicts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name_key', sa.String(length=255), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('has_verdict', sa.Boolean(), nullable=False, server_default='true'),
+        sa.Column('pet_friendly', sa.Boolean(), nullable=True),
+        sa.Column('toxicity_level', sa.String(length=20), nullable=True),
+        sa.Column('toxic_parts', sa.Text(), nullable=True),
+        sa.Column('symptoms', sa.Text(), nullable=True),
+        sa.Column('source', sa.String(length=50), nullable=False, server_default='web_search'),
+        sa.Column('confidence', sa.Float(), nullable=True),
+        sa.Column('fetched_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_toxicity_verdicts_id'), 'toxicity_verdicts', ['id'], unique=False)
+    op.create_index(op.f('ix_toxicity_verdicts_name_key'), 'toxicity_verdicts', ['name_key'], unique=True)
+    op.create_index(op.f('ix_toxicity_verdicts_expires_at'), 'toxicity_verdicts', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_toxicity_verdicts_expires_at'), table_name='toxicity_verdicts')
+    op.drop_index(op.f('ix_toxicity_verdicts_name_key'), table_name='toxicity_verdicts')
+    op.drop_index(op.f('ix_toxicity_verdicts_id'), table_name='toxicity_verdicts')
+    op.drop_table('toxicity_verdicts')
@@ -0,0 +1,42 @@
+"""Add identification_cache table
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '019'
+down_revision: Union[str, None] = '018'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'identification_cache',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('image_hash', sa.String(length=16), nullable=False),
+        sa.Column('organ', sa.String(length=20), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_identification_cache_id'), 'identification_cache', ['id'], unique=False)
+    op.create_index(op.f('ix_identification_cache_image_hash'), 'identification_cache', ['image_hash'], unique=False)
+    op.create_index(op.f('ix_identification_cache_expires_at'), 'identification_cache', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_identification_cache_expires_at'), table_name='identification_cache')
+    op.drop_index(op.f('ix_identification_cache_image_hash'), table_name='identification_cache')
+    op.drop_index(op.f('ix_identification_cache_id'), table_name='identification_cache')
+    op.drop_table('identification_cache')
@@ -0,0 +1,46 @@
+"""Add diagnosis_cache table
+
+Revision ID: 020
+Revises: 019
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '020'
+down_revision: Union[str, None] = '019'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'diagnosis_cache',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cache_key', sa.String(length=64), nullable=False),
+        sa.Column('image_hash', sa.String(length=64), nullable=False),
+        sa.Column('plant_name', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('results', sa.JSON(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_diagnosis_cache_id'), 'diagnosis_cache', ['id'], unique=False)
+    op.create_index(op.f('ix_diagnosis_cache_cache_key'), 'diagnosis_cache', ['cache_key'], unique=True)
+    op.create_index(op.f('ix_diagnosis_cache_image_hash'), 'diagnosis_cache', ['image_hash'], unique=False)
+    op.create_index(op.f('ix_diagnosis_cache_expires_at'), 'diagnosis_cache', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_diagnosis_cache_expires_at'), table_name='diagnosis_cache')
+    op.drop_index(op.f('ix_diagnosis_cache_image_hash'), table_name='diagnosis_cache')
+    op.drop_index(op.f('ix_diagnosis_cache_cache_key'), table_name='diagnosis_cache')
+    op.drop_index(op.f('ix_diagnosis_cache_id'), table_name='diagnosis_cache')
+    op.drop_table('diagnosis_cache')
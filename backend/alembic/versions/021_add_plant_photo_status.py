@@ -0,0 +1,26 @@
+"""Add status column to plant_photos table
+
+Revision ID: 021
+Revises: 020
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '021'
+down_revision: Union[str, None] = '020'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('plant_photos', sa.Column('status', sa.String(length=20), nullable=False, server_default='complete'))
+
+
+def downgrade() -> None:
+    op.drop_column('plant_photos', 'status')
@@ -0,0 +1,40 @@
+"""Add species_tip_pools table
+
+Revision ID: 022
+Revises: 021
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '022'
+down_revision: Union[str, None] = '021'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'species_tip_pools',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('species_key', sa.String(length=255), nullable=False),
+        sa.Column('species_name', sa.String(length=255), nullable=False),
+        sa.Column('tips', sa.JSON(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_species_tip_pools_id'), 'species_tip_pools', ['id'], unique=False)
+    op.create_index(op.f('ix_species_tip_pools_species_key'), 'species_tip_pools', ['species_key'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_species_tip_pools_species_key'), table_name='species_tip_pools')
+    op.drop_index(op.f('ix_species_tip_pools_id'), table_name='species_tip_pools')
+    op.drop_table('species_tip_pools')
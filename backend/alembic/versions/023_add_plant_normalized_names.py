@@ -0,0 +1,70 @@
+"""Add normalized species name columns to plants
+
+The species cache backfill matched plants to species_cache with
+lower(trim(...)) in SQL, which is not normalize_species_name() (no NFKC, no
+collapsing of inner whitespace, and ASCII-only lower() on SQLite), so it
+missed plants that per-plant lookups matched. Plants now store the
+normalized names, filled the same way new rows are.
+
+Revision ID: 023
+Revises: 022
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.species_names import normalize_species_name
+
+
+# revision identifiers, used by Alembic.
+revision: str = '023'
+down_revision: Union[str, None] = '022'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+plants = sa.table(
+    'plants',
+    sa.column('id', sa.Integer()),
+    sa.column('species', sa.String()),
+    sa.column('identified_common_name', sa.String()),
+    sa.column('species_normalized', sa.String()),
+    sa.column('identified_common_name_normalized', sa.String()),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('plants') as batch_op:
+        batch_op.add_column(sa.Column('species_normalized', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('identified_common_name_normalized', sa.String(length=255), nullable=True))
+
+    # Python rather than SQL, so existing rows get exactly the normalization new rows do
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(plants.c.id, plants.c.species, plants.c.identified_common_name)
+            .where(plants.c.id > last_id).order_by(plants.c.id).limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+
+        for plant_id, species, common_name in rows:
+            if species or common_name:
+                bind.execute(
+                    plants.update().where(plants.c.id == plant_id).values(
+                        species_normalized=normalize_species_name(species),
+                        identified_common_name_normalized=normalize_species_name(common_name),
+                    )
+                )
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('plants') as batch_op:
+        batch_op.drop_column('identified_common_name_normalized')
+        batch_op.drop_column('species_normalized')
@@ -1,8 +1,20 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
 
+
+def _async_database_url(url: str) -> str:
+    """Map the sync DATABASE_URL onto its async driver (asyncpg / aiosqlite)."""
+    scheme, rest = url.split("://", 1)
+    if scheme in ("postgresql", "postgresql+psycopg2", "postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    if scheme == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    return url
+
+
 # Create SQLAlchemy engine
 engine = create_engine(
     settings.DATABASE_URL,
@@ -13,6 +25,20 @@ engine = create_engine(
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session for the request path, so queries don't block the event loop
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or _async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    echo=settings.DEBUG
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -28,3 +54,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Async database session dependency for FastAPI routes.
+    Yields an AsyncSession and closes it after use.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
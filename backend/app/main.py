@@ -4,19 +4,20 @@ from pathlib import Path
 load_dotenv(dotenv_path=Path(__file__).resolve().parents[1] / ".env")
 
 import time
-from fastapi import FastAPI, Depends, Request
+from fastapi import FastAPI, Depends, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from starlette.middleware.base import BaseHTTPMiddleware
 from app.config import settings
 from app.utils.auth import get_current_user
+from app.utils.user_cache import AuthenticatedUser, principal_cache
 from app.utils.rate_limit import limiter
 from app.utils.logging_config import setup_logging, get_logger
-from app.models.user import User
-import os
+from app.utils.http_client import http_clients
+from app.utils.password_hashing import password_hash_pool
+from app.database import async_engine
 
 # Initialize logging
 setup_logging()
@@ -89,6 +90,16 @@ app.add_middleware(RequestLoggingMiddleware)
 
 # Import and start scheduler
 from app.services.scheduler import scheduler_service
+from app.services.push_dispatch import push_dispatcher
+from app.services.photo_storage import photo_storage
+from app.services.google_search import google_search
+from app.services.care_profiles import care_profiles
+from app.services.perenual import perenual_service
+from app.services.pet_toxicity import pet_toxicity_service
+from app.services.plantnet import plantnet
+from app.services.image_diagnosis import image_diagnosis
+from app.services.diagnosis_jobs import diagnosis_jobs
+from app.services.tips_generator import tips_generator
 
 
 @app.on_event("startup")
@@ -96,8 +107,11 @@ async def startup_event():
     """Start background scheduler on app startup."""
     logger.info(f"Starting {settings.APP_NAME} v{settings.VERSION}")
     logger.info(f"Debug mode: {settings.DEBUG}")
+    await http_clients.start()
     scheduler_service.start_reminder_job()
     scheduler_service.start_enrichment_job()
+    scheduler_service.start_care_profile_job()
+    scheduler_service.start_photo_sweep_job()
     logger.info("Application startup complete")
 
 
@@ -106,6 +120,11 @@ async def shutdown_event():
     """Shutdown scheduler on app shutdown."""
     logger.info("Shutting down application...")
     scheduler_service.shutdown()
+    await diagnosis_jobs.shutdown()
+    await http_clients.aclose()
+    await async_engine.dispose()
+    password_hash_pool.shutdown()
+    photo_storage.shutdown()
     logger.info("Application shutdown complete")
 
 
@@ -118,11 +137,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files for photo uploads
-if os.path.exists(settings.UPLOAD_DIR):
-    app.mount("/photos", StaticFiles(directory=settings.UPLOAD_DIR), name="photos")
-
-
 @app.get("/")
 @limiter.limit(settings.RATE_LIMIT_DEFAULT)
 async def root(request: Request):
@@ -145,16 +159,39 @@ async def health_check(request: Request):
     }
 
 
+@app.get("/api/v1/metrics")
+@limiter.limit(settings.RATE_LIMIT_DEFAULT)
+async def metrics(request: Request, current_user: AuthenticatedUser = Depends(get_current_user)):
+    """Runtime metrics for outbound integrations and internal caches (METRICS_ADMIN_EMAILS only)."""
+    if current_user.email.lower() not in {email.lower() for email in settings.METRICS_ADMIN_EMAILS}:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to read metrics")
+    return {
+        "outbound_http": http_clients.stats(),
+        "push": push_dispatcher.stats(),
+        "auth_cache": principal_cache.stats(),
+        "password_hashing": password_hash_pool.stats(),
+        "image_pipeline": photo_storage.stats(),
+        "google_search": google_search.stats(),
+        "care_profiles": care_profiles.stats(),
+        "perenual": perenual_service.stats(),
+        "pet_toxicity": pet_toxicity_service.stats(),
+        "plantnet": plantnet.stats(),
+        "image_diagnosis": image_diagnosis.stats(),
+        "diagnosis_jobs": diagnosis_jobs.stats(),
+        "tips": tips_generator.stats(),
+    }
+
+
 @app.post("/api/v1/reminders/trigger")
 @limiter.limit(settings.RATE_LIMIT_DEFAULT)
-async def trigger_reminders(request: Request, current_user: User = Depends(get_current_user)):
+async def trigger_reminders(request: Request, current_user: AuthenticatedUser = Depends(get_current_user)):
     """Manually trigger reminder check (for testing)."""
     result = await scheduler_service.trigger_reminder_check_now()
     return result
 
 
 # Include routers
-from app.routers import auth, plants, watering, feeding, diagnosis, identification, care, rooms, tips, notifications, enrichment
+from app.routers import auth, plants, watering, feeding, diagnosis, identification, care, rooms, tips, notifications, enrichment, photos
 
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(plants.router, prefix="/api/v1/plants", tags=["Plants"])
@@ -167,6 +204,7 @@ app.include_router(rooms.router, prefix="/api/v1", tags=["Rooms"])
 app.include_router(tips.router, prefix="/api/v1", tags=["Tips"])
 app.include_router(notifications.router, prefix="/api/v1", tags=["Notifications"])
 app.include_router(enrichment.router, prefix="/api/v1", tags=["Data Enrichment"])
+app.include_router(photos.router, tags=["Photos"])
 
 
 if __name__ == "__main__":
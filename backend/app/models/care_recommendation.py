@@ -1,15 +1,43 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
 from sqlalchemy.sql import func
 from app.database import Base
 
 
+class SpeciesCareProfile(Base):
+    """
+    Care knowledge for one species, shared by every plant of that species.
+
+    Populated from a single care search and renewed on a TTL by the
+    background refresher; plants point at it through plants.care_profile_id.
+    """
+
+    __tablename__ = "species_care_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    species_key = Column(String(255), nullable=False, unique=True, index=True)  # Normalized species name
+    species_name = Column(String(255), nullable=False)  # Name as last searched
+    care_summary = Column(Text, nullable=True)
+    incomplete = Column(Boolean, nullable=False, server_default='false')  # Some categories timed out; retried sooner
+
+    refreshed_at = Column(DateTime(timezone=True), nullable=False)  # When the search results were taken
+    expires_at = Column(DateTime(timezone=True), nullable=False)  # Lookups re-search after this
+    refresh_after = Column(DateTime(timezone=True), nullable=False, index=True)  # Background renewal is due (jittered, before expiry)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<SpeciesCareProfile(id={self.id}, species_key={self.species_key})>"
+
+
 class PlantCareRecommendation(Base):
     """Care recommendation model for storing web search results about plant care."""
 
     __tablename__ = "care_recommendations"
 
     id = Column(Integer, primary_key=True, index=True)
-    plant_id = Column(Integer, ForeignKey("plants.id", ondelete="CASCADE"), nullable=False)
+    plant_id = Column(Integer, ForeignKey("plants.id", ondelete="CASCADE"), nullable=True)  # Legacy per-plant rows only
+    profile_id = Column(Integer, ForeignKey("species_care_profiles.id", ondelete="CASCADE"), nullable=True, index=True)  # Shared species rows
     species_name = Column(String(255), nullable=True)  # Species this recommendation is for
 
     # Web search results stored as structured data
@@ -29,4 +57,4 @@ class PlantCareRecommendation(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     def __repr__(self):
-        return f"<PlantCareRecommendation(id={self.id}, plant_id={self.plant_id}, species={self.species_name})>"
+        return f"<PlantCareRecommendation(id={self.id}, plant_id={self.plant_id}, profile_id={self.profile_id}, species={self.species_name})>"
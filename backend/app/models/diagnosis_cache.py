@@ -0,0 +1,24 @@
+"""Persisted image diagnosis results."""
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class DiagnosisCacheEntry(Base):
+    """
+    One vision-model diagnosis, keyed by image content, plant name and description.
+
+    Lets a retry of the same problem on the same photo reuse the analysis
+    instead of paying for another model call.
+    """
+    __tablename__ = "diagnosis_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), nullable=False, unique=True, index=True)  # sha256 of image hash, plant name, fingerprint, model
+    image_hash = Column(String(64), nullable=False, index=True)  # sha256 of the image bytes sent
+    plant_name = Column(String(255), nullable=False)  # Normalized
+    description = Column(Text, nullable=False)  # description_fingerprint() of the user's description
+    results = Column(JSON, nullable=False)  # List of {title, snippet, url, rank}
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    hit_count = Column(Integer, nullable=False, server_default='0')
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
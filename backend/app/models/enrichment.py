@@ -1,7 +1,9 @@
 """Plant data enrichment tracking models."""
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, Date, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, Date, JSON, UniqueConstraint
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from app.database import Base
+from app.utils.species_names import normalize_species_name
 
 
 class PlantEnrichment(Base):
@@ -119,7 +121,13 @@ class SpeciesCache(Base):
     # Names (for lookup)
     scientific_name = Column(String(255), nullable=True, index=True)
     common_name = Column(String(255), nullable=True, index=True)
-    alternative_names = Column(JSON, nullable=True)  # List of other common names
+    alternative_names = Column(JSON, nullable=True)  # List of other common names (mirrored in species_aliases)
+
+    # normalize_species_name() of the names above, kept in sync by the validators below.
+    # Equality lookups use the btree indexes; on PostgreSQL migration 017 also adds
+    # pg_trgm GIN indexes for substring search.
+    scientific_name_normalized = Column(String(255), nullable=True, index=True)
+    common_name_normalized = Column(String(255), nullable=True, index=True)
 
     # Full API response cached
     raw_data = Column(JSON, nullable=True)
@@ -149,5 +157,47 @@ class SpeciesCache(Base):
     fetched_at = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    aliases = relationship("SpeciesAlias", backref="species", cascade="all, delete-orphan")
+
+    @validates('scientific_name', 'common_name')
+    def _normalize_name(self, key, value):
+        setattr(self, f"{key}_normalized", normalize_species_name(value))
+        return value
+
+    @validates('alternative_names')
+    def _sync_aliases(self, key, value):
+        names = {}
+        for name in value or []:
+            if isinstance(name, str) and normalize_species_name(name):
+                names.setdefault(normalize_species_name(name), name[:255])
+        self.aliases = [SpeciesAlias(name=name) for name in names.values()]
+        return value
+
     def __repr__(self):
         return f"<SpeciesCache(id={self.id}, perenual_id={self.perenual_id}, name={self.common_name})>"
+
+
+class SpeciesAlias(Base):
+    """
+    One alternative common name of a cached species.
+
+    Populated from SpeciesCache.alternative_names so lookups can match any of
+    a species' names with an index instead of scanning JSON lists.
+    """
+    __tablename__ = "species_aliases"
+    __table_args__ = (
+        UniqueConstraint('species_cache_id', 'name_normalized', name='uq_species_aliases_species_name'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    species_cache_id = Column(Integer, ForeignKey("species_cache.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String(255), nullable=False)
+    name_normalized = Column(String(255), nullable=False, index=True)
+
+    @validates('name')
+    def _normalize_name(self, key, value):
+        self.name_normalized = normalize_species_name(value)
+        return value
+
+    def __repr__(self):
+        return f"<SpeciesAlias(id={self.id}, species_cache_id={self.species_cache_id}, name={self.name})>"
@@ -0,0 +1,23 @@
+"""Cached PlantNet identification results, keyed by perceptual image hash."""
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class IdentificationCacheEntry(Base):
+    """
+    One PlantNet response together with the dHash of the photo it was for.
+
+    Lookups match on Hamming distance between hashes (through an in-process
+    BK-tree), so a retry with the same or a nearly identical photo reuses the
+    result instead of uploading the image again.
+    """
+    __tablename__ = "identification_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    image_hash = Column(String(16), nullable=False, index=True)  # 64-bit dHash as hex
+    organ = Column(String(20), nullable=False)  # PlantNet organ parameter the result was for
+    result = Column(JSON, nullable=False)  # PlantNetService.identify_plant() response
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    hit_count = Column(Integer, nullable=False, server_default='0')
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
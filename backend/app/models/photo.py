@@ -12,6 +12,7 @@ class PlantPhoto(Base):
     plant_id = Column(Integer, ForeignKey("plants.id", ondelete="CASCADE"), nullable=False)
     photo_url = Column(String(500), nullable=False)  # Path to stored photo
     description = Column(Text, nullable=True)  # User's description of the problem
+    status = Column(String(20), nullable=False, server_default='complete')  # Diagnosis job: pending, running, complete, failed
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
@@ -26,3 +27,22 @@ class DiagnosisSolution(Base):
     url = Column(String(1000), nullable=False)  # Link to the solution
     rank = Column(Integer, nullable=False)  # Position in search results
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class PhotoBlob(Base):
+    """
+    One stored image file, keyed by the SHA-256 of the uploaded bytes.
+
+    ref_count is the number of Plant, PlantPhoto and RoomPhoto rows whose
+    photo_url points at this blob, kept up to date by mapper listeners in
+    app.services.photo_storage. The file is only removed once it reaches zero.
+    """
+    __tablename__ = "photo_blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), nullable=False, unique=True, index=True)  # sha256 hex of the upload
+    photo_url = Column(String(500), nullable=False, unique=True)  # /photos/<name>, as stored on referencing rows
+    size_bytes = Column(Integer, nullable=False, server_default='0')  # Size of the stored file
+    ref_count = Column(Integer, nullable=False, server_default='0')
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_uploaded_at = Column(DateTime(timezone=True), server_default=func.now())  # Latest upload (incl. duplicates)
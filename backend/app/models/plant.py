@@ -1,7 +1,8 @@
 from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from app.database import Base
+from app.utils.species_names import normalize_species_name
 
 
 class Plant(Base):
@@ -30,6 +31,7 @@ class Plant(Base):
     seasonal_outdoor = Column(Boolean, nullable=True)  # Can go outside in summer?
     seasonal_notes = Column(Text, nullable=True)  # Additional seasonal care info
     care_summary = Column(Text, nullable=True)  # Auto-generated summary from web search
+    care_profile_id = Column(Integer, ForeignKey("species_care_profiles.id", ondelete="SET NULL"), nullable=True, index=True)  # Shared species care recommendations
 
     # Pet safety
     pet_friendly = Column(Boolean, nullable=True)  # True if safe for pets, False if toxic
@@ -39,6 +41,11 @@ class Plant(Base):
     identified_common_name = Column(String(255), nullable=True)  # Common name from PlantNet
     auto_identified = Column(Boolean, nullable=True, server_default='false')  # True if identified via PlantNet
 
+    # normalize_species_name() of species and identified_common_name, kept in sync by the
+    # validator below, so the species cache backfill matches names the way lookups do
+    species_normalized = Column(String(255), nullable=True)
+    identified_common_name_normalized = Column(String(255), nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -54,5 +61,10 @@ class Plant(Base):
         lazy="joined"
     )
 
+    @validates('species', 'identified_common_name')
+    def _normalize_name(self, key, value):
+        setattr(self, f"{key}_normalized", normalize_species_name(value))
+        return value
+
     def __repr__(self):
         return f"<Plant(id={self.id}, name={self.name}, user_id={self.user_id})>"
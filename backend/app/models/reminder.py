@@ -1,5 +1,5 @@
 """Reminder and notification models."""
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Boolean, Enum, Text, UniqueConstraint
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
@@ -22,4 +22,35 @@ class Reminder(Base):
     scheduled_for = Column(DateTime(timezone=True), nullable=False)  # When to send the reminder
     sent = Column(Boolean, default=False, nullable=False)  # Whether reminder was sent
     sent_at = Column(DateTime(timezone=True), nullable=True)  # When it was actually sent
+    push_sent = Column(Boolean, default=False)  # Whether a push notification was delivered
+    push_sent_at = Column(DateTime(timezone=True), nullable=True)
+    in_app_notification_id = Column(Integer, ForeignKey("notifications.id"), nullable=True)
+    delivery_error = Column(Text, nullable=True)  # Last delivery error, if any
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ReminderSweepShard(Base):
+    """
+    Lease and checkpoint for one shard of a day's reminder sweep.
+
+    Due schedules are split into shards by user_id. Workers claim a shard
+    by taking its lease, record the last fully processed user as a
+    checkpoint, and a shard whose lease expires is picked up by another worker.
+    """
+    __tablename__ = "reminder_sweep_shards"
+    __table_args__ = (
+        UniqueConstraint("run_date", "shard", name="unique_shard_per_run"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    run_date = Column(Date, nullable=False)
+    shard = Column(Integer, nullable=False)
+    shard_count = Column(Integer, nullable=False)
+    status = Column(String(20), default="pending", nullable=False)  # pending, running, completed
+    owner = Column(String(255), nullable=True)  # Worker currently holding the lease
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    last_user_id = Column(Integer, default=0, nullable=False)  # Checkpoint: users <= this are done
+    reminders_created = Column(Integer, default=0, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
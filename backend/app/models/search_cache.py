@@ -0,0 +1,26 @@
+"""Persisted Google Custom Search responses."""
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class SearchCacheEntry(Base):
+    """
+    One cached search response, keyed by normalized query + result count.
+
+    Second tier behind GoogleSearchService's in-process LRU, shared by every
+    worker process and kept across restarts.
+    """
+    __tablename__ = "search_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), nullable=False, unique=True, index=True)  # sha256 of "<normalized query>|<num>"
+    query = Column(Text, nullable=False)  # Normalized query, for debugging
+    num_results = Column(Integer, nullable=False)
+    results = Column(JSON, nullable=False)  # List of {title, snippet, url, rank}
+    is_empty = Column(Boolean, nullable=False, server_default='false')  # Negative entry (API returned no items)
+    fetched_at = Column(DateTime(timezone=True), nullable=False)  # When the API returned it; callers with a shorter TTL refetch
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    hit_count = Column(Integer, nullable=False, server_default='0')
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
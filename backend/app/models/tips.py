@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -27,3 +27,25 @@ class DidYouKnowTip(Base):
 
     def __repr__(self):
         return f"<DidYouKnowTip(id={self.id}, title={self.title[:30]}..., user_id={self.user_id})>"
+
+
+class SpeciesTipPool(Base):
+    """
+    Tip search results for one species, shared by every user growing it.
+
+    Filled by one round of tip searches; tips generation for any user with
+    that species draws from the pool until it expires.
+    """
+
+    __tablename__ = "species_tip_pools"
+
+    id = Column(Integer, primary_key=True, index=True)
+    species_key = Column(String(255), nullable=False, unique=True, index=True)  # Normalized species name
+    species_name = Column(String(255), nullable=False)  # Name as last searched
+    tips = Column(JSON, nullable=False)  # Unique search results, list of {title, snippet, url, rank}
+    expires_at = Column(DateTime(timezone=True), nullable=False)  # Searched again after this
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<SpeciesTipPool(id={self.id}, species_key={self.species_key})>"
@@ -0,0 +1,34 @@
+"""Persisted pet toxicity verdicts from the web-search fallback."""
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ToxicityVerdict(Base):
+    """
+    What the web search concluded about one plant name not in the local table.
+
+    Keyed by the normalized species (or, without one, common name) that was
+    searched. Rows with has_verdict=False record that the search was
+    inconclusive and expire sooner, so the name is searched again later.
+    """
+    __tablename__ = "toxicity_verdicts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name_key = Column(String(255), nullable=False, unique=True, index=True)  # normalize_species_name() of the searched name
+    name = Column(String(255), nullable=False)  # As searched, for debugging
+    has_verdict = Column(Boolean, nullable=False, server_default='true')  # False = negative entry (no verdict)
+    pet_friendly = Column(Boolean, nullable=True)
+    toxicity_level = Column(String(20), nullable=True)
+    toxic_parts = Column(Text, nullable=True)
+    symptoms = Column(Text, nullable=True)
+    source = Column(String(50), nullable=False, server_default='web_search')
+    confidence = Column(Float, nullable=True)  # Keyword-score margin of the search results, 0-1
+    fetched_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    hit_count = Column(Integer, nullable=False, server_default='0')
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<ToxicityVerdict(id={self.id}, name_key={self.name_key}, pet_friendly={self.pet_friendly})>"
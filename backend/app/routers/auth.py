@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 import secrets
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 from app.models.password_reset import PasswordResetToken
 from app.schemas.auth import (
@@ -10,7 +11,8 @@ from app.schemas.auth import (
     ForgotPasswordRequest, ForgotPasswordResponse,
     ResetPasswordRequest, ResetPasswordResponse
 )
-from app.utils.auth import get_password_hash, verify_password, create_access_token, get_current_user
+from app.utils.auth import get_password_hash_async, verify_password_async, create_access_token, get_current_user_async
+from app.utils.user_cache import AuthenticatedUser, principal_cache
 from app.utils.rate_limit import limiter
 from app.config import settings
 from app.services.email_service import email_service
@@ -20,7 +22,7 @@ router = APIRouter()
 
 @router.post("/register", response_model=UserWithToken, status_code=status.HTTP_201_CREATED)
 @limiter.limit(settings.RATE_LIMIT_AUTH)
-async def register(request: Request, user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(request: Request, user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user.
 
@@ -28,26 +30,29 @@ async def register(request: Request, user_data: UserRegister, db: Session = Depe
     Returns the user information and JWT access token.
     """
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User.id).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
+    # Return the connection to the pool while bcrypt runs
+    await db.rollback()
+
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         email=user_data.email,
         password_hash=hashed_password
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     # Generate access token
-    access_token = create_access_token(data={"sub": new_user.email})
+    access_token = create_access_token(data={"sub": new_user.email}, user_id=new_user.id)
 
     return {
         "user": UserResponse.from_orm(new_user),
@@ -58,17 +63,20 @@ async def register(request: Request, user_data: UserRegister, db: Session = Depe
 
 @router.post("/login", response_model=UserWithToken)
 @limiter.limit(settings.RATE_LIMIT_AUTH)
-async def login(request: Request, user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(request: Request, user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Login with email and password.
 
     Authenticates user credentials and returns JWT access token.
     """
     # Get user by email
-    user = db.query(User).filter(User.email == user_data.email).first()
+    user = (await db.execute(select(User).where(User.email == user_data.email))).scalar_one_or_none()
+
+    # Return the connection to the pool while bcrypt runs
+    await db.close()
 
     # Verify user exists and password is correct
-    if not user or not verify_password(user_data.password, user.password_hash):
+    if not user or not await verify_password_async(user_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -76,7 +84,7 @@ async def login(request: Request, user_data: UserLogin, db: Session = Depends(ge
         )
 
     # Generate access token
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_access_token(data={"sub": user.email}, user_id=user.id)
 
     return {
         "user": UserResponse.from_orm(user),
@@ -86,13 +94,23 @@ async def login(request: Request, user_data: UserLogin, db: Session = Depends(ge
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Get current authenticated user information.
 
     Requires valid JWT token in Authorization header.
     """
-    return UserResponse.from_orm(current_user)
+    user = await db.get(User, current_user.id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return UserResponse.from_orm(user)
 
 
 @router.post("/logout")
@@ -111,7 +129,7 @@ async def logout():
 async def forgot_password(
     request: Request,
     data: ForgotPasswordRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Request a password reset.
@@ -119,7 +137,7 @@ async def forgot_password(
     Generates a password reset token and sends an email with the reset link.
     """
     # Find user by email
-    user = db.query(User).filter(User.email == data.email).first()
+    user = (await db.execute(select(User).where(User.email == data.email))).scalar_one_or_none()
 
     # Always return success to prevent email enumeration
     if not user:
@@ -128,10 +146,12 @@ async def forgot_password(
         )
 
     # Invalidate any existing reset tokens for this user
-    db.query(PasswordResetToken).filter(
-        PasswordResetToken.user_id == user.id,
-        PasswordResetToken.used == False
-    ).update({"used": True})
+    await db.execute(
+        update(PasswordResetToken).where(
+            PasswordResetToken.user_id == user.id,
+            PasswordResetToken.used == False
+        ).values(used=True)
+    )
 
     # Generate new reset token
     token = secrets.token_urlsafe(32)
@@ -144,7 +164,7 @@ async def forgot_password(
     )
 
     db.add(reset_token)
-    db.commit()
+    await db.commit()
 
     # Determine the frontend URL for the reset link
     # Try to get from referer or use default
@@ -171,17 +191,19 @@ async def forgot_password(
 
 @router.post("/reset-password", response_model=ResetPasswordResponse)
 @limiter.limit(settings.RATE_LIMIT_AUTH)
-async def reset_password(request: Request, data: ResetPasswordRequest, db: Session = Depends(get_db)):
+async def reset_password(request: Request, data: ResetPasswordRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Reset password using a reset token.
 
     Validates the token and updates the user's password.
     """
     # Find the reset token
-    reset_token = db.query(PasswordResetToken).filter(
-        PasswordResetToken.token == data.token,
-        PasswordResetToken.used == False
-    ).first()
+    reset_token = (await db.execute(
+        select(PasswordResetToken).where(
+            PasswordResetToken.token == data.token,
+            PasswordResetToken.used == False
+        )
+    )).scalar_one_or_none()
 
     if not reset_token:
         raise HTTPException(
@@ -192,26 +214,41 @@ async def reset_password(request: Request, data: ResetPasswordRequest, db: Sessi
     # Check if token is expired
     if reset_token.expires_at < datetime.utcnow():
         reset_token.used = True
-        db.commit()
+        await db.commit()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Reset token has expired. Please request a new one."
         )
 
     # Get the user
-    user = db.query(User).filter(User.id == reset_token.user_id).first()
+    user = await db.get(User, reset_token.user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User not found"
         )
+    user_id, user_email, reset_token_id = user.id, user.email, reset_token.id
+
+    # Return the connection to the pool while bcrypt runs
+    await db.rollback()
+    password_hash = await get_password_hash_async(data.new_password)
+
+    # Update password and mark token as used (guarded so a concurrent reset can't reuse it)
+    used = await db.execute(
+        update(PasswordResetToken).where(
+            PasswordResetToken.id == reset_token_id,
+            PasswordResetToken.used == False
+        ).values(used=True)
+    )
+    if used.rowcount != 1:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid or expired reset token"
+        )
+    await db.execute(update(User).where(User.id == user_id).values(password_hash=password_hash))
 
-    # Update password
-    user.password_hash = get_password_hash(data.new_password)
-
-    # Mark token as used
-    reset_token.used = True
-
-    db.commit()
+    await db.commit()
+    principal_cache.invalidate(user_email)
 
     return ResetPasswordResponse(message="Password has been reset successfully. You can now login with your new password.")
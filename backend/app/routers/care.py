@@ -1,19 +1,21 @@
 """Plant care recommendations endpoints."""
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.database import get_db
-from app.models.user import User
 from app.models.plant import Plant
-from app.models.care_recommendation import PlantCareRecommendation
+from app.models.care_recommendation import PlantCareRecommendation, SpeciesCareProfile
 from app.schemas.care import (
     PlantCareRecommendationResponse,
     PlantCareRecommendationListResponse,
     CareSearchResult
 )
 from app.utils.auth import get_current_user
+from app.utils.user_cache import AuthenticatedUser
+from app.services.care_profiles import care_profiles, recommendation_rows
 from app.services.care_search import care_search
+from app.utils.bulk_insert import bulk_insert_returning
 
 router = APIRouter()
 
@@ -29,45 +31,70 @@ def verify_plant_ownership(plant_id: int, user_id: int, db: Session) -> Plant:
     return plant
 
 
+def build_list_response(
+    recommendations: List[PlantCareRecommendation],
+    plant_id: int,
+    profile: Optional[SpeciesCareProfile] = None
+) -> PlantCareRecommendationListResponse:
+    """Report recommendations against the plant that asked, shared or not."""
+    return PlantCareRecommendationListResponse(
+        recommendations=[
+            PlantCareRecommendationResponse.model_validate(rec).model_copy(update={"plant_id": plant_id})
+            for rec in recommendations
+        ],
+        total=len(recommendations),
+        refreshed_at=profile.refreshed_at if profile else None
+    )
+
+
 @router.get("/plants/{plant_id}/care-recommendations", response_model=PlantCareRecommendationListResponse)
 async def get_care_recommendations(
     plant_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Get all care recommendations for a plant.
 
-    Returns stored care recommendations grouped by source.
+    Returns the care recommendations of the plant's species profile, or the
+    plant's own stored recommendations if it has not been linked to one.
     """
     # Verify plant ownership
     plant = verify_plant_ownership(plant_id, current_user.id, db)
 
+    if plant.care_profile_id is not None:
+        profile = db.get(SpeciesCareProfile, plant.care_profile_id)
+        recommendations = care_profiles.get_recommendations(db, plant.care_profile_id)
+        return build_list_response(recommendations, plant_id, profile)
+
     # Get all care recommendations for this plant
     recommendations = db.query(PlantCareRecommendation).filter(
         PlantCareRecommendation.plant_id == plant_id
     ).order_by(PlantCareRecommendation.rank).all()
 
-    return PlantCareRecommendationListResponse(
-        recommendations=[PlantCareRecommendationResponse.model_validate(rec) for rec in recommendations],
-        total=len(recommendations)
-    )
+    return build_list_response(recommendations, plant_id)
 
 
 @router.post("/plants/{plant_id}/refresh-care", response_model=PlantCareRecommendationListResponse, status_code=status.HTTP_201_CREATED)
 async def refresh_care_recommendations(
     plant_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Refresh care recommendations for a plant by performing new searches.
-
-    This endpoint:
-    1. Searches for fresh care information using Google Custom Search
-    2. Deletes old recommendations
-    3. Creates new recommendations from search results
-    4. Returns the new recommendations
+    Refresh care recommendations for a plant.
+
+    Care recommendations are stored once per species and shared by every
+    plant of that species. This endpoint:
+    1. Looks up the species' care profile; a fresh one is returned as is
+    2. Otherwise searches Google Custom Search once for the species
+       (concurrent refreshes of the same species share the search)
+    3. Links the plant to the profile and copies its care summary
+    4. Returns the species' recommendations
+
+    A search that only produced the in-app fallback tips (no API keys, or the
+    API failing) is not shared as a profile: the tips are stored for this plant
+    alone and replaced once a real search succeeds.
     """
     # Verify plant ownership
     plant = verify_plant_ownership(plant_id, current_user.id, db)
@@ -80,67 +107,45 @@ async def refresh_care_recommendations(
             detail="Plant must have species or common name for care recommendations"
         )
 
-    # Delete existing recommendations
-    db.query(PlantCareRecommendation).filter(
-        PlantCareRecommendation.plant_id == plant_id
-    ).delete()
-    db.commit()
-
-    # Search for new care information
-    care_results = await care_search.search_care_info(species, num_results=3)
-
-    # Create new care recommendations from search results
-    created_recommendations = []
-    rank = 1
-
-    # Process each category
-    for category, results in care_results.items():
-        for result in results:
-            # Create a recommendation for each search result
-            recommendation = PlantCareRecommendation(
-                plant_id=plant_id,
-                species_name=species,
-                source_url=result['url'],
-                source_title=result['title'],
-                rank=rank
+    profile, report = await care_profiles.get_profile(db, species)
+    if profile is None:
+        if report.timed_out and not report.results:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="Care search did not respond in time; existing recommendations were kept"
             )
-
-            # Assign the snippet to the appropriate category field
-            if category == 'lighting':
-                recommendation.lighting = result['snippet']
-            elif category == 'watering':
-                recommendation.watering = result['snippet']
-            elif category == 'humidity':
-                recommendation.humidity = result['snippet']
-            elif category == 'general':
-                # For general results, distribute across fields
-                recommendation.room_placement = result['snippet']
-
-            db.add(recommendation)
-            created_recommendations.append(recommendation)
-            rank += 1
-
-    db.commit()
-
-    # Refresh to get IDs and timestamps
-    for rec in created_recommendations:
-        db.refresh(rec)
-
-    # Update plant's care_summary
-    care_summary = care_search.extract_care_summary(care_results)
-    plant.care_summary = care_summary
+        if report.results:
+            db.query(PlantCareRecommendation).filter(
+                PlantCareRecommendation.plant_id == plant_id
+            ).delete()
+            bulk_insert_returning(
+                db, PlantCareRecommendation, recommendation_rows(report.results, species, plant_id=plant_id)
+            )
+            plant.care_profile_id = None
+            plant.care_summary = care_search.extract_care_summary(report.results)
+            db.commit()
+        recommendations = db.query(PlantCareRecommendation).filter(
+            PlantCareRecommendation.plant_id == plant_id
+        ).order_by(PlantCareRecommendation.rank).all()
+        return build_list_response(recommendations, plant_id)
+
+    # Per-plant rows from before the species profile are superseded by it
+    if plant.care_profile_id != profile.id:
+        db.query(PlantCareRecommendation).filter(
+            PlantCareRecommendation.plant_id == plant_id
+        ).delete()
+        plant.care_profile_id = profile.id
+    plant.care_summary = profile.care_summary
     db.commit()
 
-    return PlantCareRecommendationListResponse(
-        recommendations=[PlantCareRecommendationResponse.model_validate(rec) for rec in created_recommendations],
-        total=len(created_recommendations)
-    )
+    recommendations = care_profiles.get_recommendations(db, profile.id)
+    return build_list_response(recommendations, plant_id, profile)
 
 
 @router.delete("/care-recommendations/{recommendation_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_care_recommendation(
     recommendation_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -159,6 +164,13 @@ async def delete_care_recommendation(
             detail="Care recommendation not found"
         )
 
+    # Shared species recommendations belong to every plant of the species
+    if recommendation.plant_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Shared species care recommendations cannot be deleted"
+        )
+
     # Verify plant ownership
     plant = db.query(Plant).filter(Plant.id == recommendation.plant_id).first()
     if not plant or plant.user_id != current_user.id:
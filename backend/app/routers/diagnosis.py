@@ -1,22 +1,30 @@
 """Plant diagnosis endpoints."""
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Response
 from sqlalchemy.orm import Session
-from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from typing import List, Union
 
 from app.database import get_db
-from app.models.user import User
 from app.models.plant import Plant
 from app.models.photo import PlantPhoto, DiagnosisSolution
 from app.schemas.diagnosis import (
     DiagnosisResponse,
+    DiagnosisJobResponse,
     DiagnosisListResponse,
     PlantPhotoResponse,
     DiagnosisSolutionResponse,
 )
 from app.utils.auth import get_current_user
+from app.utils.user_cache import AuthenticatedUser
 from app.services.photo_storage import photo_storage
-from app.services.google_search import google_search
-from app.services.image_diagnosis import image_diagnosis
+from app.services.diagnosis_jobs import (
+    COMPLETE,
+    PENDING,
+    DiagnosisJob,
+    diagnosis_jobs,
+    run_diagnosis,
+    save_solutions,
+)
 
 router = APIRouter()
 
@@ -66,11 +74,52 @@ def validate_description(description: str) -> None:
         )
 
 
-@router.post("/plants/{plant_id}/diagnose", response_model=DiagnosisResponse, status_code=status.HTTP_201_CREATED)
+def _respond(db: Session, photo: PlantPhoto, results: List[dict]) -> dict:
+    """Save the solutions and build the response from the inserted rows."""
+    photo_response = PlantPhotoResponse.model_validate(photo)
+    solutions = save_solutions(db, photo.id, results)
+    db.commit()
+
+    return {
+        "photo": photo_response,
+        "solutions": solutions,
+        "total_solutions": len(solutions)
+    }
+
+
+def _enqueue(
+    response: Response,
+    photo: PlantPhoto,
+    current_user: AuthenticatedUser,
+    plant: Plant,
+    description: str,
+    force_refresh: bool
+) -> dict:
+    diagnosis_jobs.submit(DiagnosisJob(
+        photo_id=photo.id,
+        user_id=current_user.id,
+        plant_id=plant.id,
+        photo_url=photo.photo_url,
+        plant_name=plant.name or "plant",
+        description=description,
+        force_refresh=force_refresh
+    ))
+    response.status_code = status.HTTP_202_ACCEPTED
+    return {"job_id": photo.id, "status": photo.status, "photo": photo}
+
+
+@router.post(
+    "/plants/{plant_id}/diagnose",
+    response_model=Union[DiagnosisResponse, DiagnosisJobResponse],
+    status_code=status.HTTP_201_CREATED
+)
 async def create_text_diagnosis(
     plant_id: int,
+    response: Response,
     description: str = Form(...),
-    current_user: User = Depends(get_current_user),
+    force_refresh: bool = Form(False),
+    background: bool = Form(False),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -81,6 +130,13 @@ async def create_text_diagnosis(
     2. Combines image analysis with user's problem description
     3. Stores the diagnosis and solutions in the database
     4. Returns the diagnosis results
+
+    A repeat of an earlier diagnosis (same photo, plant name and description)
+    is answered from the diagnosis cache unless force_refresh is set.
+
+    With background set, returns 202 with a job id as soon as the diagnosis
+    is recorded; completion is pushed as a "diagnosis_complete" message on
+    /ws/notifications, and GET /diagnosis/{job_id} can be polled instead.
     """
     # Validate description
     validate_description(description)
@@ -88,6 +144,9 @@ async def create_text_diagnosis(
     # Verify plant ownership
     plant = verify_plant_ownership(plant_id, current_user.id, db)
 
+    if background:
+        diagnosis_jobs.ensure_capacity()
+
     # Use plant's existing photo URL
     photo_url = plant.photo_url or ""
 
@@ -95,56 +154,36 @@ async def create_text_diagnosis(
     photo = PlantPhoto(
         plant_id=plant_id,
         photo_url=photo_url,
-        description=description
+        description=description,
+        status=PENDING if background else COMPLETE
     )
     db.add(photo)
     db.commit()
     db.refresh(photo)
 
-    # Use image-based diagnosis if photo exists
-    if photo_url:
-        search_results = await image_diagnosis.analyze_plant_image(
-            image_path=photo_url,
-            plant_name=plant.name or "plant",
-            user_description=description
-        )
-    else:
-        # Fallback to text-based search if no photo
-        search_query = f"{plant.name} {description} plant problem solution"
-        search_results = await google_search.search_plant_problem(search_query)
+    if background:
+        return _enqueue(response, photo, current_user, plant, description, force_refresh)
 
-    # Save solutions to database
-    solutions = []
-    for result in search_results:
-        solution = DiagnosisSolution(
-            photo_id=photo.id,
-            title=result['title'],
-            snippet=result.get('snippet'),
-            url=result.get('url', ''),
-            rank=result['rank']
-        )
-        db.add(solution)
-        solutions.append(solution)
-
-    db.commit()
+    # Image-based diagnosis if the plant has a photo, text search otherwise
+    search_results = await run_diagnosis(photo_url, plant.name or "plant", description, force_refresh)
 
-    # Refresh all solutions to get their IDs
-    for solution in solutions:
-        db.refresh(solution)
-
-    return {
-        "photo": photo,
-        "solutions": solutions,
-        "total_solutions": len(solutions)
-    }
+    # Save solutions to database
+    return _respond(db, photo, search_results)
 
 
-@router.post("/plants/{plant_id}/diagnosis", response_model=DiagnosisResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/plants/{plant_id}/diagnosis",
+    response_model=Union[DiagnosisResponse, DiagnosisJobResponse],
+    status_code=status.HTTP_201_CREATED
+)
 async def create_diagnosis(
     plant_id: int,
+    response: Response,
     file: UploadFile = File(...),
     description: str = Form(...),
-    current_user: User = Depends(get_current_user),
+    force_refresh: bool = Form(False),
+    background: bool = Form(False),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -155,6 +194,12 @@ async def create_diagnosis(
     2. Uses AI vision to analyze the image
     3. Stores the photo and solutions in the database
     4. Returns the diagnosis results
+
+    Re-uploading the same photo with the same description is answered from
+    the diagnosis cache unless force_refresh is set.
+
+    With background set, returns 202 with a job id once the photo is stored;
+    see create_text_diagnosis.
     """
     # Validate description
     validate_description(description)
@@ -169,6 +214,9 @@ async def create_diagnosis(
             detail="File must be an image"
         )
 
+    if background:
+        diagnosis_jobs.ensure_capacity()
+
     # Save the photo
     photo_url = await photo_storage.save_photo(file, plant_id)
 
@@ -176,50 +224,28 @@ async def create_diagnosis(
     photo = PlantPhoto(
         plant_id=plant_id,
         photo_url=photo_url,
-        description=description
+        description=description,
+        status=PENDING if background else COMPLETE
     )
     db.add(photo)
     db.commit()
     db.refresh(photo)
 
+    if background:
+        return _enqueue(response, photo, current_user, plant, description, force_refresh)
+
     # Use AI image analysis for diagnosis
-    search_results = await image_diagnosis.analyze_plant_image(
-        image_path=photo_url,
-        plant_name=plant.name or "plant",
-        user_description=description
-    )
+    search_results = await run_diagnosis(photo_url, plant.name or "plant", description, force_refresh)
 
     # Save solutions to database
-    solutions = []
-    for result in search_results:
-        solution = DiagnosisSolution(
-            photo_id=photo.id,
-            title=result['title'],
-            snippet=result.get('snippet'),
-            url=result.get('url', ''),
-            rank=result['rank']
-        )
-        db.add(solution)
-        solutions.append(solution)
-
-    db.commit()
-
-    # Refresh all solutions to get their IDs
-    for solution in solutions:
-        db.refresh(solution)
-
-    return {
-        "photo": photo,
-        "solutions": solutions,
-        "total_solutions": len(solutions)
-    }
+    return _respond(db, photo, search_results)
 
 
 @router.get("/plants/{plant_id}/diagnosis", response_model=DiagnosisListResponse)
 async def get_plant_diagnoses(
     plant_id: int,
     limit: int = 50,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get all diagnosis photos for a plant."""
@@ -241,7 +267,7 @@ async def get_plant_diagnoses(
 @router.get("/diagnosis/{photo_id}", response_model=DiagnosisResponse)
 async def get_diagnosis(
     photo_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific diagnosis with its solutions."""
@@ -272,7 +298,7 @@ async def get_diagnosis(
 @router.delete("/diagnosis/{photo_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_diagnosis(
     photo_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Delete a diagnosis and its photo."""
@@ -287,11 +313,13 @@ async def delete_diagnosis(
     # Verify plant ownership
     verify_plant_ownership(photo.plant_id, current_user.id, db)
 
-    # Delete the photo file
-    photo_storage.delete_photo(photo.photo_url)
+    photo_url = photo.photo_url
 
     # Delete from database (solutions will be cascade deleted)
     db.delete(photo)
     db.commit()
 
+    # Delete the photo file (kept if another row still uses the same image)
+    await run_in_threadpool(photo_storage.delete_photo, photo_url)
+
     return None
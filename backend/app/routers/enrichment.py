@@ -5,9 +5,9 @@ from typing import Optional
 
 from app.database import get_db
 from app.utils.auth import get_current_user
+from app.utils.user_cache import AuthenticatedUser
 from app.utils.rate_limit import limiter
 from app.config import settings
-from app.models.user import User
 from app.services.data_scraper import data_scraper
 from app.services.scheduler import scheduler_service
 
@@ -19,7 +19,7 @@ router = APIRouter()
 async def get_enrichment_stats(
     request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     """
     Get plant data enrichment statistics.
@@ -39,7 +39,7 @@ async def get_enrichment_stats(
 async def trigger_enrichment(
     request: Request,
     max_plants: Optional[int] = None,
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     """
     Manually trigger plant data enrichment.
@@ -65,7 +65,7 @@ async def get_enrichment_logs(
     request: Request,
     limit: int = 10,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     """
     Get recent enrichment run logs.
@@ -108,7 +108,7 @@ async def get_cached_species(
     search: Optional[str] = None,
     limit: int = 20,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     """
     Get cached species data from Perenual API.
@@ -117,23 +117,31 @@ async def get_cached_species(
     which can be reused without additional API calls.
 
     Args:
-        search: Optional search term for species name
+        search: Optional search term, matched anywhere in the scientific,
+            common or alternative names
         limit: Number of results to return (default 20)
 
     Returns:
         List of cached species entries
     """
-    from app.models.enrichment import SpeciesCache
-    from sqlalchemy import or_, func
+    from app.models.enrichment import SpeciesCache, SpeciesAlias
+    from app.utils.species_names import normalize_species_name, contains_pattern
+    from sqlalchemy import or_, select
 
     query = db.query(SpeciesCache)
 
-    if search:
-        search_term = f"%{search.lower()}%"
+    term = normalize_species_name(search)
+    if term:
+        # Normalized columns carry pg_trgm indexes on PostgreSQL, so this needs no full scan
+        pattern = contains_pattern(term)
+        alias_matches = select(SpeciesAlias.species_cache_id).where(
+            SpeciesAlias.name_normalized.like(pattern, escape='\\')
+        )
         query = query.filter(
             or_(
-                func.lower(SpeciesCache.common_name).like(search_term),
-                func.lower(SpeciesCache.scientific_name).like(search_term)
+                SpeciesCache.common_name_normalized.like(pattern, escape='\\'),
+                SpeciesCache.scientific_name_normalized.like(pattern, escape='\\'),
+                SpeciesCache.id.in_(alias_matches)
             )
         )
 
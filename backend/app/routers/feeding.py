@@ -1,11 +1,11 @@
 """Feeding schedule and history endpoints."""
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta, date
 from typing import List
 
-from app.database import get_db
-from app.models.user import User
+from app.database import get_async_db
 from app.models.plant import Plant
 from app.models.feeding import FeedingSchedule, FeedingHistory
 from app.schemas.feeding import (
@@ -16,14 +16,16 @@ from app.schemas.feeding import (
     FeedingHistoryResponse,
     FeedingHistoryListResponse,
 )
-from app.utils.auth import get_current_user
+from app.utils.auth import get_current_user_async
+from app.utils.user_cache import AuthenticatedUser
 
 router = APIRouter()
 
 
-def verify_plant_ownership(plant_id: int, user_id: int, db: Session) -> Plant:
+async def verify_plant_ownership(plant_id: int, user_id: int, db: AsyncSession) -> Plant:
     """Verify that the plant belongs to the current user."""
-    plant = db.query(Plant).filter(Plant.id == plant_id, Plant.user_id == user_id).first()
+    result = await db.execute(select(Plant).where(Plant.id == plant_id, Plant.user_id == user_id))
+    plant = result.unique().scalar_one_or_none()
     if not plant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -41,15 +43,15 @@ def calculate_next_feeding(last_fed: date, frequency_days: int) -> date:
 async def create_feeding_schedule(
     plant_id: int,
     schedule_data: FeedingScheduleCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a feeding schedule for a plant."""
     # Verify plant ownership
-    verify_plant_ownership(plant_id, current_user.id, db)
+    await verify_plant_ownership(plant_id, current_user.id, db)
 
     # Check if schedule already exists
-    existing = db.query(FeedingSchedule).filter(FeedingSchedule.plant_id == plant_id).first()
+    existing = (await db.execute(select(FeedingSchedule).where(FeedingSchedule.plant_id == plant_id))).scalar_one_or_none()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -62,22 +64,22 @@ async def create_feeding_schedule(
         frequency_days=schedule_data.frequency_days
     )
     db.add(schedule)
-    db.commit()
-    db.refresh(schedule)
+    await db.commit()
+    await db.refresh(schedule)
     return schedule
 
 
 @router.get("/plants/{plant_id}/feeding/schedule", response_model=FeedingScheduleResponse)
 async def get_feeding_schedule(
     plant_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get feeding schedule for a plant."""
     # Verify plant ownership
-    verify_plant_ownership(plant_id, current_user.id, db)
+    await verify_plant_ownership(plant_id, current_user.id, db)
 
-    schedule = db.query(FeedingSchedule).filter(FeedingSchedule.plant_id == plant_id).first()
+    schedule = (await db.execute(select(FeedingSchedule).where(FeedingSchedule.plant_id == plant_id))).scalar_one_or_none()
     if not schedule:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -90,14 +92,14 @@ async def get_feeding_schedule(
 async def update_feeding_schedule(
     plant_id: int,
     schedule_data: FeedingScheduleUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update feeding schedule for a plant."""
     # Verify plant ownership
-    verify_plant_ownership(plant_id, current_user.id, db)
+    await verify_plant_ownership(plant_id, current_user.id, db)
 
-    schedule = db.query(FeedingSchedule).filter(FeedingSchedule.plant_id == plant_id).first()
+    schedule = (await db.execute(select(FeedingSchedule).where(FeedingSchedule.plant_id == plant_id))).scalar_one_or_none()
     if not schedule:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -111,30 +113,30 @@ async def update_feeding_schedule(
         if schedule.last_fed:
             schedule.next_feeding = calculate_next_feeding(schedule.last_fed, schedule.frequency_days)
 
-    db.commit()
-    db.refresh(schedule)
+    await db.commit()
+    await db.refresh(schedule)
     return schedule
 
 
 @router.delete("/plants/{plant_id}/feeding/schedule", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_feeding_schedule(
     plant_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete feeding schedule for a plant."""
     # Verify plant ownership
-    verify_plant_ownership(plant_id, current_user.id, db)
+    await verify_plant_ownership(plant_id, current_user.id, db)
 
-    schedule = db.query(FeedingSchedule).filter(FeedingSchedule.plant_id == plant_id).first()
+    schedule = (await db.execute(select(FeedingSchedule).where(FeedingSchedule.plant_id == plant_id))).scalar_one_or_none()
     if not schedule:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Feeding schedule not found for this plant"
         )
 
-    db.delete(schedule)
-    db.commit()
+    await db.delete(schedule)
+    await db.commit()
     return None
 
 
@@ -142,12 +144,12 @@ async def delete_feeding_schedule(
 async def record_feeding(
     plant_id: int,
     feeding_data: FeedingHistoryCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Record a feeding event and update the schedule."""
     # Verify plant ownership
-    verify_plant_ownership(plant_id, current_user.id, db)
+    await verify_plant_ownership(plant_id, current_user.id, db)
 
     # Use provided time or current time
     fed_at = feeding_data.fed_at or datetime.utcnow()
@@ -161,13 +163,13 @@ async def record_feeding(
     db.add(history)
 
     # Update schedule if it exists
-    schedule = db.query(FeedingSchedule).filter(FeedingSchedule.plant_id == plant_id).first()
+    schedule = (await db.execute(select(FeedingSchedule).where(FeedingSchedule.plant_id == plant_id))).scalar_one_or_none()
     if schedule:
         schedule.last_fed = fed_at.date()
         schedule.next_feeding = calculate_next_feeding(fed_at.date(), schedule.frequency_days)
 
-    db.commit()
-    db.refresh(history)
+    await db.commit()
+    await db.refresh(history)
     return history
 
 
@@ -175,18 +177,20 @@ async def record_feeding(
 async def get_feeding_history(
     plant_id: int,
     limit: int = 50,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get feeding history for a plant."""
     # Verify plant ownership
-    verify_plant_ownership(plant_id, current_user.id, db)
+    await verify_plant_ownership(plant_id, current_user.id, db)
 
-    history = db.query(FeedingHistory)\
-        .filter(FeedingHistory.plant_id == plant_id)\
-        .order_by(FeedingHistory.fed_at.desc())\
-        .limit(limit)\
-        .all()
+    result = await db.execute(
+        select(FeedingHistory)
+        .where(FeedingHistory.plant_id == plant_id)
+        .order_by(FeedingHistory.fed_at.desc())
+        .limit(limit)
+    )
+    history = result.scalars().all()
 
     return {
         "history": history,
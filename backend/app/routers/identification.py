@@ -1,12 +1,13 @@
 """Plant identification endpoints."""
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List
 
 from app.database import get_db
-from app.models.user import User
 from app.schemas.identification import PlantNetIdentificationResponse, PlantNetIdentificationResult, PetToxicityInfo
 from app.utils.auth import get_current_user
+from app.utils.user_cache import AuthenticatedUser
 from app.services.photo_storage import photo_storage
 from app.services.plantnet import plantnet
 from app.services.pet_toxicity import pet_toxicity_service
@@ -19,7 +20,7 @@ router = APIRouter()
 async def identify_plant(
     file: UploadFile = File(...),
     organ: str = "auto",
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -59,37 +60,33 @@ async def identify_plant(
         # Call PlantNet API
         identification_result = await plantnet.identify_plant(full_path, organ)
 
+        # Only include valid results
+        candidates = [result for result in identification_result.get('all_results') or [] if result.get('species')]
+        has_top = bool(identification_result.get('species'))
+
+        # Look up pet toxicity for every result and the top result in one batch
+        toxicity = await pet_toxicity_service.get_toxicity_many(
+            candidates + ([identification_result] if has_top else [])
+        )
+
         # Build response with all results
         all_results = []
-        if identification_result.get('all_results'):
-            for result in identification_result['all_results']:
-                if result.get('species'):  # Only include valid results
-                    # Look up pet toxicity for this result
-                    toxicity_data = await pet_toxicity_service.get_toxicity(
-                        species=result.get('species'),
-                        common_name=result.get('common_name'),
-                        genus=result.get('genus')
-                    )
-                    pet_toxicity = PetToxicityInfo(**toxicity_data) if toxicity_data else None
-
-                    all_results.append(PlantNetIdentificationResult(
-                        species=result.get('species', 'Unknown'),
-                        common_name=result.get('common_name'),
-                        confidence=result.get('confidence', 0.0),
-                        family=result.get('family'),
-                        genus=result.get('genus'),
-                        pet_toxicity=pet_toxicity
-                    ))
+        for result, toxicity_data in zip(candidates, toxicity):
+            pet_toxicity = PetToxicityInfo(**toxicity_data) if toxicity_data else None
+
+            all_results.append(PlantNetIdentificationResult(
+                species=result.get('species', 'Unknown'),
+                common_name=result.get('common_name'),
+                confidence=result.get('confidence', 0.0),
+                family=result.get('family'),
+                genus=result.get('genus'),
+                pet_toxicity=pet_toxicity
+            ))
 
         # Get top result
         top_result = None
-        if identification_result.get('species'):
-            # Look up pet toxicity for top result
-            top_toxicity_data = await pet_toxicity_service.get_toxicity(
-                species=identification_result.get('species'),
-                common_name=identification_result.get('common_name'),
-                genus=identification_result.get('genus')
-            )
+        if has_top:
+            top_toxicity_data = toxicity[-1]
             top_pet_toxicity = PetToxicityInfo(**top_toxicity_data) if top_toxicity_data else None
 
             top_result = PlantNetIdentificationResult(
@@ -111,10 +108,9 @@ async def identify_plant(
         return response
 
     except Exception as e:
-        # Only clean up photo on error
+        # Only release the upload on error; the blob may be shared with other photos
         try:
-            if os.path.exists(full_path):
-                os.remove(full_path)
+            await run_in_threadpool(photo_storage.delete_photo, temp_photo_path)
         except Exception:
             pass
         raise HTTPException(
@@ -1,12 +1,13 @@
 """Notification API endpoints."""
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime
 
-from app.database import get_db
-from app.utils.auth import get_current_user, get_websocket_user
-from app.models.user import User
+from app.database import get_async_db
+from app.utils.auth import get_current_user_async, get_websocket_user
+from app.utils.user_cache import AuthenticatedUser
 from app.models.notification import Notification, NotificationPreferences, NotificationToken
 from app.schemas.notification import (
     NotificationResponse,
@@ -28,7 +29,7 @@ router = APIRouter()
 async def websocket_notifications_endpoint(
     websocket: WebSocket,
     token: str = Query(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """WebSocket endpoint for real-time notifications."""
     # Authenticate user from token
@@ -37,6 +38,9 @@ async def websocket_notifications_endpoint(
         await websocket.close(code=1008)  # Policy violation
         return
 
+    # Release the pooled connection; the socket may stay open for hours
+    await db.close()
+
     # Connect WebSocket
     await websocket_manager.connect(websocket, user.id)
 
@@ -59,29 +63,31 @@ async def get_notifications(
     skip: int = 0,
     limit: int = 50,
     unread_only: bool = False,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user's notifications."""
-    query = db.query(Notification).filter(Notification.user_id == current_user.id)
+    query = select(Notification).where(Notification.user_id == current_user.id)
 
     if unread_only:
-        query = query.filter(Notification.read == False)
+        query = query.where(Notification.read == False)
 
-    notifications = query.order_by(Notification.created_at.desc()).offset(skip).limit(limit).all()
-    return notifications
+    result = await db.execute(query.order_by(Notification.created_at.desc()).offset(skip).limit(limit))
+    return result.scalars().all()
 
 
 @router.get("/notifications/unread-count")
 async def get_unread_count(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get count of unread notifications."""
-    count = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.read == False
-    ).count()
+    count = await db.scalar(
+        select(func.count()).select_from(Notification).where(
+            Notification.user_id == current_user.id,
+            Notification.read == False
+        )
+    )
 
     return {"count": count}
 
@@ -89,39 +95,45 @@ async def get_unread_count(
 @router.post("/notifications/mark-read")
 async def mark_notifications_read(
     payload: NotificationMarkRead,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mark notifications as read."""
-    notifications = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.id.in_(payload.notification_ids)
-    ).all()
+    result = await db.execute(
+        select(Notification).where(
+            Notification.user_id == current_user.id,
+            Notification.id.in_(payload.notification_ids)
+        )
+    )
+    notifications = result.scalars().all()
 
     for notification in notifications:
         notification.read = True
         notification.read_at = datetime.now()
 
-    db.commit()
+    await db.commit()
 
     return {"success": True, "marked": len(notifications)}
 
 
 @router.post("/notifications/mark-all-read")
 async def mark_all_notifications_read(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mark all notifications as read."""
-    count = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.read == False
-    ).update({
-        "read": True,
-        "read_at": datetime.now()
-    })
+    result = await db.execute(
+        update(Notification).where(
+            Notification.user_id == current_user.id,
+            Notification.read == False
+        ).values(
+            read=True,
+            read_at=datetime.now()
+        )
+    )
+    count = result.rowcount
 
-    db.commit()
+    await db.commit()
 
     return {"success": True, "marked": count}
 
@@ -129,20 +141,22 @@ async def mark_all_notifications_read(
 @router.delete("/notifications/{notification_id}")
 async def delete_notification(
     notification_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a notification."""
-    notification = db.query(Notification).filter(
-        Notification.id == notification_id,
-        Notification.user_id == current_user.id
-    ).first()
+    notification = (await db.execute(
+        select(Notification).where(
+            Notification.id == notification_id,
+            Notification.user_id == current_user.id
+        )
+    )).scalar_one_or_none()
 
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
 
-    db.delete(notification)
-    db.commit()
+    await db.delete(notification)
+    await db.commit()
 
     return {"success": True}
 
@@ -151,20 +165,20 @@ async def delete_notification(
 
 @router.get("/notifications/preferences", response_model=NotificationPreferencesResponse)
 async def get_notification_preferences(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user's notification preferences."""
-    prefs = db.query(NotificationPreferences).filter(
-        NotificationPreferences.user_id == current_user.id
-    ).first()
+    prefs = (await db.execute(
+        select(NotificationPreferences).where(NotificationPreferences.user_id == current_user.id)
+    )).scalar_one_or_none()
 
     if not prefs:
         # Create default preferences
         prefs = NotificationPreferences(user_id=current_user.id)
         db.add(prefs)
-        db.commit()
-        db.refresh(prefs)
+        await db.commit()
+        await db.refresh(prefs)
 
     return prefs
 
@@ -172,13 +186,13 @@ async def get_notification_preferences(
 @router.put("/notifications/preferences", response_model=NotificationPreferencesResponse)
 async def update_notification_preferences(
     preferences: NotificationPreferencesUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update user's notification preferences."""
-    prefs = db.query(NotificationPreferences).filter(
-        NotificationPreferences.user_id == current_user.id
-    ).first()
+    prefs = (await db.execute(
+        select(NotificationPreferences).where(NotificationPreferences.user_id == current_user.id)
+    )).scalar_one_or_none()
 
     if not prefs:
         prefs = NotificationPreferences(user_id=current_user.id)
@@ -189,8 +203,8 @@ async def update_notification_preferences(
         setattr(prefs, field, value)
 
     prefs.updated_at = datetime.now()
-    db.commit()
-    db.refresh(prefs)
+    await db.commit()
+    await db.refresh(prefs)
 
     return prefs
 
@@ -200,16 +214,18 @@ async def update_notification_preferences(
 @router.post("/notifications/tokens", response_model=NotificationTokenResponse)
 async def register_push_token(
     token_data: NotificationTokenCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Register a device token for push notifications."""
-    token = push_notification_service.register_device_token(
-        db=db,
-        user_id=current_user.id,
-        device_id=token_data.device_id,
-        platform=token_data.platform,
-        token=token_data.token
+    token = await db.run_sync(
+        lambda session: push_notification_service.register_device_token(
+            db=session,
+            user_id=current_user.id,
+            device_id=token_data.device_id,
+            platform=token_data.platform,
+            token=token_data.token
+        )
     )
 
     return token
@@ -217,13 +233,14 @@ async def register_push_token(
 
 @router.get("/notifications/tokens", response_model=List[NotificationTokenResponse])
 async def get_push_tokens(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all registered device tokens."""
-    tokens = db.query(NotificationToken).filter(
-        NotificationToken.user_id == current_user.id
-    ).all()
+    result = await db.execute(
+        select(NotificationToken).where(NotificationToken.user_id == current_user.id)
+    )
+    tokens = result.scalars().all()
 
     return tokens
 
@@ -231,14 +248,16 @@ async def get_push_tokens(
 @router.delete("/notifications/tokens/{device_id}")
 async def unregister_push_token(
     device_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Unregister a device token."""
-    success = push_notification_service.unregister_device_token(
-        db=db,
-        user_id=current_user.id,
-        device_id=device_id
+    success = await db.run_sync(
+        lambda session: push_notification_service.unregister_device_token(
+            db=session,
+            user_id=current_user.id,
+            device_id=device_id
+        )
     )
 
     if not success:
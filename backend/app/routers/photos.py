@@ -0,0 +1,48 @@
+"""Photo serving endpoints (stored uploads and their resized variants)."""
+import os
+import re
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse
+
+from app.services.photo_storage import photo_storage
+
+router = APIRouter()
+
+# Stored names look like <sha256>.jpg (plant_12_<uuid>.jpg before photo_blobs); never allow paths or dotfiles (.spool, .derivatives)
+PHOTO_NAME = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9_.-]*")
+
+# Photo names are content hashes (or were unique per upload), so a name always maps to the same bytes
+CACHE_CONTROL = "public, max-age=604800"
+
+
+@router.api_route("/photos/{filename}", methods=["GET", "HEAD"])
+async def get_photo(
+    filename: str,
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, le=4096, description="Display width in pixels; picks the closest stored size")
+):
+    """
+    Serve an uploaded photo.
+
+    With `w`, the closest pre-sized variant (e.g. 128/400/1200px) is served,
+    as WebP or AVIF when the client's Accept header allows it.
+    """
+    if not PHOTO_NAME.fullmatch(filename):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Photo not found")
+
+    path, media_type = await photo_storage.get_photo(filename, w, request.headers.get("accept", ""))
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Photo not found")
+
+    headers = {"Cache-Control": CACHE_CONTROL}
+    if w:
+        headers["Vary"] = "Accept"
+    response = FileResponse(path, media_type=media_type, headers=headers, stat_result=os.stat(path))
+
+    if request.headers.get("if-none-match") == response.headers["etag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={
+            "ETag": response.headers["etag"], **headers
+        })
+    return response
@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from starlette.concurrency import run_in_threadpool
 from typing import List
-from app.database import get_db
-from app.models.user import User
+from app.database import get_async_db
+from app.models.photo import PlantPhoto
 from app.models.plant import Plant
 from app.models.enrichment import PlantEnrichment
 from app.schemas.plant import PlantCreate, PlantUpdate, PlantResponse, PlantListResponse
-from app.utils.auth import get_current_user
+from app.utils.auth import get_current_user_async
+from app.utils.user_cache import AuthenticatedUser
 from app.services.photo_storage import photo_storage
 from app.services.pet_toxicity import pet_toxicity_service
 
@@ -15,16 +19,19 @@ router = APIRouter()
 
 @router.get("", response_model=PlantListResponse)
 async def get_plants(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all plants for the current user.
     Includes enrichment data if available.
     """
-    plants = db.query(Plant).options(
-        joinedload(Plant.enrichment)
-    ).filter(Plant.user_id == current_user.id).all()
+    result = await db.execute(
+        select(Plant).options(
+            joinedload(Plant.enrichment)
+        ).where(Plant.user_id == current_user.id)
+    )
+    plants = result.unique().scalars().all()
 
     return {
         "plants": plants,
@@ -35,20 +42,23 @@ async def get_plants(
 @router.get("/{plant_id}", response_model=PlantResponse)
 async def get_plant(
     plant_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get a specific plant by ID.
     Only returns if the plant belongs to the current user.
     Includes enrichment data if available.
     """
-    plant = db.query(Plant).options(
-        joinedload(Plant.enrichment)
-    ).filter(
-        Plant.id == plant_id,
-        Plant.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Plant).options(
+            joinedload(Plant.enrichment)
+        ).where(
+            Plant.id == plant_id,
+            Plant.user_id == current_user.id
+        )
+    )
+    plant = result.unique().scalar_one_or_none()
 
     if not plant:
         raise HTTPException(
@@ -62,8 +72,8 @@ async def get_plant(
 @router.post("", response_model=PlantResponse, status_code=status.HTTP_201_CREATED)
 async def create_plant(
     plant_data: PlantCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new plant for the current user.
@@ -86,8 +96,8 @@ async def create_plant(
     )
 
     db.add(new_plant)
-    db.commit()
-    db.refresh(new_plant)
+    await db.commit()
+    await db.refresh(new_plant)
 
     return new_plant
 
@@ -96,17 +106,20 @@ async def create_plant(
 async def update_plant(
     plant_id: int,
     plant_data: PlantUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update a plant.
     Only allows updating plants that belong to the current user.
     """
-    plant = db.query(Plant).filter(
-        Plant.id == plant_id,
-        Plant.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Plant).where(
+            Plant.id == plant_id,
+            Plant.user_id == current_user.id
+        )
+    )
+    plant = result.unique().scalar_one_or_none()
 
     if not plant:
         raise HTTPException(
@@ -119,8 +132,8 @@ async def update_plant(
     for key, value in update_data.items():
         setattr(plant, key, value)
 
-    db.commit()
-    db.refresh(plant)
+    await db.commit()
+    await db.refresh(plant)
 
     return plant
 
@@ -128,17 +141,20 @@ async def update_plant(
 @router.delete("/{plant_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_plant(
     plant_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a plant.
     Only allows deleting plants that belong to the current user.
     """
-    plant = db.query(Plant).filter(
-        Plant.id == plant_id,
-        Plant.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Plant).where(
+            Plant.id == plant_id,
+            Plant.user_id == current_user.id
+        )
+    )
+    plant = result.unique().scalar_one_or_none()
 
     if not plant:
         raise HTTPException(
@@ -146,8 +162,18 @@ async def delete_plant(
             detail="Plant not found"
         )
 
-    db.delete(plant)
-    db.commit()
+    photo_urls = set((await db.execute(
+        select(PlantPhoto.photo_url).where(PlantPhoto.plant_id == plant.id)
+    )).scalars())
+    if plant.photo_url:
+        photo_urls.add(plant.photo_url)
+
+    await db.delete(plant)
+    await db.commit()
+
+    # Release photo files no other row still uses
+    for photo_url in photo_urls:
+        await run_in_threadpool(photo_storage.delete_photo, photo_url)
 
     return None
 
@@ -155,7 +181,7 @@ async def delete_plant(
 @router.post("/upload-photo", status_code=status.HTTP_201_CREATED)
 async def upload_plant_photo(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
 ):
     """
     Upload a photo for a plant.
@@ -1,10 +1,10 @@
 """Room photo management endpoints."""
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
 
 from app.database import get_db
-from app.models.user import User
 from app.models.room import RoomPhoto
 from app.schemas.room import (
     RoomPhotoResponse,
@@ -12,6 +12,7 @@ from app.schemas.room import (
     RoomPhotoUpdate
 )
 from app.utils.auth import get_current_user
+from app.utils.user_cache import AuthenticatedUser
 from app.services.photo_storage import photo_storage
 from app.services.room_analysis import room_analysis
 from app.utils.logging_config import get_logger
@@ -39,7 +40,7 @@ async def create_room(
     room_name: str = Form(...),
     user_tagged_lighting: Optional[str] = Form(None),
     user_notes: Optional[str] = Form(None),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -101,7 +102,7 @@ async def create_room(
 
 @router.get("/rooms", response_model=RoomPhotoListResponse)
 async def get_rooms(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -120,7 +121,7 @@ async def get_rooms(
 @router.get("/rooms/{room_id}", response_model=RoomPhotoResponse)
 async def get_room(
     room_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -136,7 +137,7 @@ async def get_room(
 async def update_room(
     room_id: int,
     room_update: RoomPhotoUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -164,7 +165,7 @@ async def update_room(
 @router.post("/rooms/{room_id}/reanalyze", response_model=RoomPhotoResponse)
 async def reanalyze_room(
     room_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -203,7 +204,7 @@ async def reanalyze_room(
 @router.delete("/rooms/{room_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_room(
     room_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -213,11 +214,13 @@ async def delete_room(
     """
     room = verify_room_ownership(room_id, current_user.id, db)
 
-    # Delete photo file
-    photo_storage.delete_photo(room.photo_url)
+    photo_url = room.photo_url
 
     # Delete database record
     db.delete(room)
     db.commit()
 
+    # Delete photo file (kept if another row still uses the same image)
+    await run_in_threadpool(photo_storage.delete_photo, photo_url)
+
     return None
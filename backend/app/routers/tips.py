@@ -1,17 +1,19 @@
 """Did You Know tips endpoints."""
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
-from app.database import get_db
-from app.models.user import User
+from app.database import get_async_db
 from app.models.tips import DidYouKnowTip
 from app.schemas.tips import (
     DidYouKnowTipResponse,
     DidYouKnowTipListResponse,
     DidYouKnowTipUpdate
 )
-from app.utils.auth import get_current_user
+from app.utils.auth import get_current_user_async
+from app.utils.bulk_insert import bulk_insert_returning_async
+from app.utils.user_cache import AuthenticatedUser
 from app.services.tips_generator import tips_generator
 
 router = APIRouter()
@@ -24,8 +26,8 @@ async def get_tips(
     is_favorited: Optional[bool] = Query(None, description="Filter by favorited status"),
     limit: int = Query(10, ge=1, le=100, description="Number of tips to return"),
     offset: int = Query(0, ge=0, description="Number of tips to skip"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get personalized tips for the current user.
@@ -34,21 +36,22 @@ async def get_tips(
     Returns paginated results.
     """
     # Build query
-    query = db.query(DidYouKnowTip).filter(DidYouKnowTip.user_id == current_user.id)
+    query = select(DidYouKnowTip).where(DidYouKnowTip.user_id == current_user.id)
 
     # Apply filters
     if species is not None:
-        query = query.filter(DidYouKnowTip.species == species)
+        query = query.where(DidYouKnowTip.species == species)
     if is_read is not None:
-        query = query.filter(DidYouKnowTip.is_read == is_read)
+        query = query.where(DidYouKnowTip.is_read == is_read)
     if is_favorited is not None:
-        query = query.filter(DidYouKnowTip.is_favorited == is_favorited)
+        query = query.where(DidYouKnowTip.is_favorited == is_favorited)
 
     # Get total count
-    total = query.count()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
 
     # Apply pagination and order
-    tips = query.order_by(DidYouKnowTip.created_at.desc()).offset(offset).limit(limit).all()
+    result = await db.execute(query.order_by(DidYouKnowTip.created_at.desc()).offset(offset).limit(limit))
+    tips = result.scalars().all()
 
     return DidYouKnowTipListResponse(
         tips=[DidYouKnowTipResponse.model_validate(tip) for tip in tips],
@@ -59,15 +62,16 @@ async def get_tips(
 @router.post("/tips/generate", response_model=DidYouKnowTipListResponse, status_code=status.HTTP_201_CREATED)
 async def generate_tips(
     tips_per_species: int = Query(2, ge=1, le=5, description="Tips to generate per species"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Generate new personalized tips based on user's plant collection.
 
     This endpoint:
     1. Finds all unique species in user's plant collection
-    2. Searches for interesting facts and care tips for each species
+    2. Takes facts and care tips for each species from its shared tip pool,
+       searching species that have no fresh pool
     3. Creates new tip records (avoids duplicates)
     4. Returns the newly generated tips
     """
@@ -84,18 +88,12 @@ async def generate_tips(
             total=0
         )
 
-    # Create tip records
-    created_tips = []
-    for tip_data in tip_data_list:
-        tip = DidYouKnowTip(**tip_data)
-        db.add(tip)
-        created_tips.append(tip)
+    # Create tip records; ids and timestamps come back from the insert
+    created_tips = await bulk_insert_returning_async(db, DidYouKnowTip, [
+        {**tip_data, "is_read": False, "is_favorited": False} for tip_data in tip_data_list
+    ])
 
-    db.commit()
-
-    # Refresh to get IDs and timestamps
-    for tip in created_tips:
-        db.refresh(tip)
+    await db.commit()
 
     return DidYouKnowTipListResponse(
         tips=[DidYouKnowTipResponse.model_validate(tip) for tip in created_tips],
@@ -106,18 +104,20 @@ async def generate_tips(
 @router.get("/tips/{tip_id}", response_model=DidYouKnowTipResponse)
 async def get_tip(
     tip_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get a specific tip by ID.
 
     Verifies that the tip belongs to the current user.
     """
-    tip = db.query(DidYouKnowTip).filter(
-        DidYouKnowTip.id == tip_id,
-        DidYouKnowTip.user_id == current_user.id
-    ).first()
+    tip = (await db.execute(
+        select(DidYouKnowTip).where(
+            DidYouKnowTip.id == tip_id,
+            DidYouKnowTip.user_id == current_user.id
+        )
+    )).scalar_one_or_none()
 
     if not tip:
         raise HTTPException(
@@ -132,18 +132,20 @@ async def get_tip(
 async def update_tip(
     tip_id: int,
     tip_update: DidYouKnowTipUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update a tip's read or favorited status.
 
     Allows marking tips as read or favorited.
     """
-    tip = db.query(DidYouKnowTip).filter(
-        DidYouKnowTip.id == tip_id,
-        DidYouKnowTip.user_id == current_user.id
-    ).first()
+    tip = (await db.execute(
+        select(DidYouKnowTip).where(
+            DidYouKnowTip.id == tip_id,
+            DidYouKnowTip.user_id == current_user.id
+        )
+    )).scalar_one_or_none()
 
     if not tip:
         raise HTTPException(
@@ -157,8 +159,8 @@ async def update_tip(
     if tip_update.is_favorited is not None:
         tip.is_favorited = tip_update.is_favorited
 
-    db.commit()
-    db.refresh(tip)
+    await db.commit()
+    await db.refresh(tip)
 
     return DidYouKnowTipResponse.model_validate(tip)
 
@@ -166,18 +168,20 @@ async def update_tip(
 @router.delete("/tips/{tip_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_tip(
     tip_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a tip.
 
     Verifies that the tip belongs to the current user.
     """
-    tip = db.query(DidYouKnowTip).filter(
-        DidYouKnowTip.id == tip_id,
-        DidYouKnowTip.user_id == current_user.id
-    ).first()
+    tip = (await db.execute(
+        select(DidYouKnowTip).where(
+            DidYouKnowTip.id == tip_id,
+            DidYouKnowTip.user_id == current_user.id
+        )
+    )).scalar_one_or_none()
 
     if not tip:
         raise HTTPException(
@@ -185,8 +189,8 @@ async def delete_tip(
             detail="Tip not found"
         )
 
-    db.delete(tip)
-    db.commit()
+    await db.delete(tip)
+    await db.commit()
 
     return None
 
@@ -195,18 +199,21 @@ async def delete_tip(
 async def get_tips_by_species(
     species: str,
     limit: int = Query(10, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all tips for a specific plant species.
 
     Returns tips filtered by species name.
     """
-    tips = db.query(DidYouKnowTip).filter(
-        DidYouKnowTip.user_id == current_user.id,
-        DidYouKnowTip.species == species
-    ).order_by(DidYouKnowTip.created_at.desc()).limit(limit).all()
+    result = await db.execute(
+        select(DidYouKnowTip).where(
+            DidYouKnowTip.user_id == current_user.id,
+            DidYouKnowTip.species == species
+        ).order_by(DidYouKnowTip.created_at.desc()).limit(limit)
+    )
+    tips = result.scalars().all()
 
     return DidYouKnowTipListResponse(
         tips=[DidYouKnowTipResponse.model_validate(tip) for tip in tips],
@@ -1,11 +1,11 @@
 """Watering schedule and history endpoints."""
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta, date
 from typing import List
 
-from app.database import get_db
-from app.models.user import User
+from app.database import get_async_db
 from app.models.plant import Plant
 from app.models.watering import WateringSchedule, WateringHistory
 from app.schemas.watering import (
@@ -16,14 +16,16 @@ from app.schemas.watering import (
     WateringHistoryResponse,
     WateringHistoryListResponse,
 )
-from app.utils.auth import get_current_user
+from app.utils.auth import get_current_user_async
+from app.utils.user_cache import AuthenticatedUser
 
 router = APIRouter()
 
 
-def verify_plant_ownership(plant_id: int, user_id: int, db: Session) -> Plant:
+async def verify_plant_ownership(plant_id: int, user_id: int, db: AsyncSession) -> Plant:
     """Verify that the plant belongs to the current user."""
-    plant = db.query(Plant).filter(Plant.id == plant_id, Plant.user_id == user_id).first()
+    result = await db.execute(select(Plant).where(Plant.id == plant_id, Plant.user_id == user_id))
+    plant = result.unique().scalar_one_or_none()
     if not plant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -41,15 +43,15 @@ def calculate_next_watering(last_watered: date, frequency_days: int) -> date:
 async def create_watering_schedule(
     plant_id: int,
     schedule_data: WateringScheduleCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a watering schedule for a plant."""
     # Verify plant ownership
-    verify_plant_ownership(plant_id, current_user.id, db)
+    await verify_plant_ownership(plant_id, current_user.id, db)
 
     # Check if schedule already exists
-    existing = db.query(WateringSchedule).filter(WateringSchedule.plant_id == plant_id).first()
+    existing = (await db.execute(select(WateringSchedule).where(WateringSchedule.plant_id == plant_id))).scalar_one_or_none()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -62,22 +64,22 @@ async def create_watering_schedule(
         frequency_days=schedule_data.frequency_days
     )
     db.add(schedule)
-    db.commit()
-    db.refresh(schedule)
+    await db.commit()
+    await db.refresh(schedule)
     return schedule
 
 
 @router.get("/plants/{plant_id}/watering/schedule", response_model=WateringScheduleResponse)
 async def get_watering_schedule(
     plant_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get watering schedule for a plant."""
     # Verify plant ownership
-    verify_plant_ownership(plant_id, current_user.id, db)
+    await verify_plant_ownership(plant_id, current_user.id, db)
 
-    schedule = db.query(WateringSchedule).filter(WateringSchedule.plant_id == plant_id).first()
+    schedule = (await db.execute(select(WateringSchedule).where(WateringSchedule.plant_id == plant_id))).scalar_one_or_none()
     if not schedule:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -90,14 +92,14 @@ async def get_watering_schedule(
 async def update_watering_schedule(
     plant_id: int,
     schedule_data: WateringScheduleUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update watering schedule for a plant."""
     # Verify plant ownership
-    verify_plant_ownership(plant_id, current_user.id, db)
+    await verify_plant_ownership(plant_id, current_user.id, db)
 
-    schedule = db.query(WateringSchedule).filter(WateringSchedule.plant_id == plant_id).first()
+    schedule = (await db.execute(select(WateringSchedule).where(WateringSchedule.plant_id == plant_id))).scalar_one_or_none()
     if not schedule:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -111,30 +113,30 @@ async def update_watering_schedule(
         if schedule.last_watered:
             schedule.next_watering = calculate_next_watering(schedule.last_watered, schedule.frequency_days)
 
-    db.commit()
-    db.refresh(schedule)
+    await db.commit()
+    await db.refresh(schedule)
     return schedule
 
 
 @router.delete("/plants/{plant_id}/watering/schedule", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_watering_schedule(
     plant_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete watering schedule for a plant."""
     # Verify plant ownership
-    verify_plant_ownership(plant_id, current_user.id, db)
+    await verify_plant_ownership(plant_id, current_user.id, db)
 
-    schedule = db.query(WateringSchedule).filter(WateringSchedule.plant_id == plant_id).first()
+    schedule = (await db.execute(select(WateringSchedule).where(WateringSchedule.plant_id == plant_id))).scalar_one_or_none()
     if not schedule:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Watering schedule not found for this plant"
         )
 
-    db.delete(schedule)
-    db.commit()
+    await db.delete(schedule)
+    await db.commit()
     return None
 
 
@@ -142,12 +144,12 @@ async def delete_watering_schedule(
 async def record_watering(
     plant_id: int,
     watering_data: WateringHistoryCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Record a watering event and update the schedule."""
     # Verify plant ownership
-    verify_plant_ownership(plant_id, current_user.id, db)
+    await verify_plant_ownership(plant_id, current_user.id, db)
 
     # Use provided time or current time
     watered_at = watering_data.watered_at or datetime.utcnow()
@@ -161,13 +163,13 @@ async def record_watering(
     db.add(history)
 
     # Update schedule if it exists
-    schedule = db.query(WateringSchedule).filter(WateringSchedule.plant_id == plant_id).first()
+    schedule = (await db.execute(select(WateringSchedule).where(WateringSchedule.plant_id == plant_id))).scalar_one_or_none()
     if schedule:
         schedule.last_watered = watered_at.date()
         schedule.next_watering = calculate_next_watering(watered_at.date(), schedule.frequency_days)
 
-    db.commit()
-    db.refresh(history)
+    await db.commit()
+    await db.refresh(history)
     return history
 
 
@@ -175,18 +177,20 @@ async def record_watering(
 async def get_watering_history(
     plant_id: int,
     limit: int = 50,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get watering history for a plant."""
     # Verify plant ownership
-    verify_plant_ownership(plant_id, current_user.id, db)
+    await verify_plant_ownership(plant_id, current_user.id, db)
 
-    history = db.query(WateringHistory)\
-        .filter(WateringHistory.plant_id == plant_id)\
-        .order_by(WateringHistory.watered_at.desc())\
-        .limit(limit)\
-        .all()
+    result = await db.execute(
+        select(WateringHistory)
+        .where(WateringHistory.plant_id == plant_id)
+        .order_by(WateringHistory.watered_at.desc())
+        .limit(limit)
+    )
+    history = result.scalars().all()
 
     return {
         "history": history,
@@ -27,7 +27,8 @@ class PlantCareRecommendationCreate(PlantCareRecommendationBase):
 class PlantCareRecommendationResponse(PlantCareRecommendationBase):
     """Schema for care recommendation response."""
     id: int
-    plant_id: int
+    plant_id: Optional[int] = None  # The plant asked about (shared species rows are not stored per plant)
+    profile_id: Optional[int] = None  # Shared species care profile the recommendation belongs to
     created_at: datetime
 
     class Config:
@@ -38,6 +39,7 @@ class PlantCareRecommendationListResponse(BaseModel):
     """Schema for list of care recommendations response."""
     recommendations: list[PlantCareRecommendationResponse]
     total: int
+    refreshed_at: Optional[datetime] = None  # When the species' care profile was last searched
 
 
 class CareSearchResult(BaseModel):
@@ -20,6 +20,7 @@ class PlantPhotoResponse(PlantPhotoBase):
     id: int
     plant_id: int
     photo_url: str
+    status: str = Field("complete", description="Diagnosis progress: pending, running, complete or failed")
     created_at: datetime
 
     class Config:
@@ -55,6 +56,13 @@ class DiagnosisResponse(BaseModel):
     total_solutions: int
 
 
+class DiagnosisJobResponse(BaseModel):
+    """Schema for a diagnosis accepted as a background job."""
+    job_id: int = Field(..., description="Same as the photo id; poll GET /diagnosis/{job_id}")
+    status: str
+    photo: PlantPhotoResponse
+
+
 class DiagnosisListResponse(BaseModel):
     """Schema for list of diagnoses."""
     diagnoses: List[PlantPhotoResponse]
@@ -0,0 +1,346 @@
+"""Species-level care profiles shared by every plant of the same species."""
+import asyncio
+import random
+import time
+import weakref
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import exists, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.care_recommendation import PlantCareRecommendation, SpeciesCareProfile
+from app.models.plant import Plant
+from app.services.care_search import CareSearchReport, care_search
+from app.services.google_search import normalize_query
+from app.utils.bulk_insert import bulk_insert_returning
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Recommendation column each care search category fills
+CATEGORY_FIELDS = {
+    'lighting': 'lighting',
+    'watering': 'watering',
+    'humidity': 'humidity',
+    'general': 'room_placement',
+    'room_placement': 'room_placement',
+    'seasonal': 'seasonal_care',
+}
+CATEGORY_COLUMNS = sorted(set(CATEGORY_FIELDS.values()))
+
+# Renewals must not be served the month-old search responses they are replacing
+RENEWAL_SEARCH_TTL = timedelta(days=1)
+
+# After a renewal is claimed or a search comes back empty, try again this much later
+RETRY_BACKOFF = timedelta(hours=1)
+
+
+def species_key(species: str) -> str:
+    """Case and whitespace-insensitive form of a species name."""
+    return normalize_query(species)
+
+
+def has_sources(results: Dict[str, List[Dict]]) -> bool:
+    """Whether any result came from the search API rather than its in-app fallback tips (no URLs)."""
+    return any(result.get('url') for category in results.values() for result in category)
+
+
+def recommendation_rows(results: Dict[str, List[Dict]], species: str, **owner) -> List[Dict]:
+    """
+    PlantCareRecommendation column values for categorized search results, ranked in order.
+
+    Every row sets the same columns, so bulk_insert_returning() sends them in one INSERT.
+    owner is profile_id= or plant_id=.
+    """
+    rows = []
+    for category, category_results in results.items():
+        column = CATEGORY_FIELDS.get(category)
+        for result in category_results:
+            row = {
+                **owner,
+                "species_name": species,
+                "source_url": result['url'],
+                "source_title": result['title'],
+                "rank": len(rows) + 1,
+                **dict.fromkeys(CATEGORY_COLUMNS),
+            }
+            if column:
+                row[column] = result['snippet']
+            rows.append(row)
+    return rows
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class CareProfileRefreshReport:
+    """Outcome of one background refresher run."""
+    due: int = 0
+    renewed: int = 0
+    incomplete: int = 0
+    failed: int = 0
+    elapsed_ms: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class CareProfileService:
+    """Looks up, searches and renews shared species care profiles."""
+
+    def __init__(self):
+        # In-flight searches per event loop (scheduler jobs run their own loops)
+        self._in_flight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = \
+            weakref.WeakKeyDictionary()
+        self.lookups = 0
+        self.fresh_hits = 0
+        self.stale_served = 0
+        self.coalesced = 0
+        self.searches = 0
+        self.empty_searches = 0
+        self.last_refresh: Optional[CareProfileRefreshReport] = None
+
+    def _schedule(self, now: datetime, complete: bool) -> Tuple[datetime, datetime]:
+        """Expiry and jittered background renewal time for a profile refreshed at `now`."""
+        if complete:
+            ttl = timedelta(days=settings.CARE_PROFILE_TTL_DAYS)
+        else:
+            ttl = timedelta(hours=settings.CARE_PROFILE_INCOMPLETE_TTL_HOURS)
+        window = min(timedelta(hours=settings.CARE_PROFILE_REFRESH_WINDOW_HOURS), ttl / 2)
+        expires_at = now + ttl
+        return expires_at, expires_at - window * random.random()
+
+    async def get_profile(
+        self, db: Session, species: str
+    ) -> Tuple[Optional[SpeciesCareProfile], Optional[CareSearchReport]]:
+        """
+        Return the shared care profile for a species, searching only when needed.
+
+        A fresh profile costs one indexed lookup. A missing or expired one is
+        searched once, however many requests ask for the species at the same
+        time. If that search finds nothing usable, the expired profile is
+        returned rather than nothing.
+
+        Args:
+            db: Request database session
+            species: Scientific or common name of the plant
+
+        Returns:
+            (profile, search report). The profile is None if there is none and the
+            search found nothing worth sharing; the report then holds what it did
+            find (possibly fallback tips). The report is None for a fresh profile.
+        """
+        self.lookups += 1
+        key = species_key(species)
+        profile = db.query(SpeciesCareProfile).filter(SpeciesCareProfile.species_key == key).first()
+        if profile is not None and _as_utc(profile.expires_at) > datetime.now(timezone.utc):
+            self.fresh_hits += 1
+            return profile, None
+
+        report = await self.refresh(key, species)
+        if profile is None:
+            return db.query(SpeciesCareProfile).filter(SpeciesCareProfile.species_key == key).first(), report
+
+        db.refresh(profile)
+        if not has_sources(report.results):
+            self.stale_served += 1
+        return profile, report
+
+    def get_recommendations(self, db: Session, profile_id: int) -> List[PlantCareRecommendation]:
+        """Recommendations stored for a profile, best ranked first."""
+        return db.query(PlantCareRecommendation).filter(
+            PlantCareRecommendation.profile_id == profile_id
+        ).order_by(PlantCareRecommendation.rank).all()
+
+    async def refresh(self, key: str, species: str, renewal: bool = False) -> CareSearchReport:
+        """
+        Search a species again and store the results in its profile.
+
+        Concurrent refreshes of one species share a single search. An empty
+        search, or one that only produced fallback tips without URLs, is not
+        stored: any existing profile is left untouched and retried after
+        RETRY_BACKOFF.
+
+        Args:
+            key: species_key() of the species
+            species: Name to search for
+            renewal: Ignore cached search responses older than RENEWAL_SEARCH_TTL
+
+        Returns:
+            The search's CareSearchReport; nothing was stored unless has_sources(report.results)
+        """
+        in_flight = self._in_flight.setdefault(asyncio.get_running_loop(), {})
+        pending = in_flight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        pending = asyncio.ensure_future(self._refresh(key, species, renewal))
+        in_flight[key] = pending
+        pending.add_done_callback(lambda _: in_flight.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _refresh(self, key: str, species: str, renewal: bool) -> CareSearchReport:
+        self.searches += 1
+        report = await care_search.search_full_profile(
+            species, num_results=3, ttl=RENEWAL_SEARCH_TTL if renewal else None
+        )
+        if not has_sources(report.results):
+            # Nothing found, or only the in-app tips (no URLs) google_search falls back
+            # to when the API fails: keep any existing profile and try again later
+            self.empty_searches += 1
+            await run_in_threadpool(self._postpone, key)
+            return report
+
+        await run_in_threadpool(self._store, key, species, report)
+        return report
+
+    def _store(self, key: str, species: str, report: CareSearchReport):
+        db = SessionLocal()
+        try:
+            try:
+                self._write(db, key, species, report)
+            except IntegrityError:
+                # Another worker created this species' profile first; overwrite theirs
+                db.rollback()
+                self._write(db, key, species, report)
+        finally:
+            db.close()
+
+    def _write(self, db: Session, key: str, species: str, report: CareSearchReport):
+        now = datetime.now(timezone.utc)
+        expires_at, refresh_after = self._schedule(now, report.complete)
+
+        profile = db.query(SpeciesCareProfile).filter(SpeciesCareProfile.species_key == key).first()
+        if profile is None:
+            profile = SpeciesCareProfile(species_key=key)
+            db.add(profile)
+        else:
+            db.query(PlantCareRecommendation).filter(
+                PlantCareRecommendation.profile_id == profile.id
+            ).delete(synchronize_session=False)
+
+        profile.species_name = species
+        profile.care_summary = care_search.extract_care_summary(report.results)
+        profile.incomplete = not report.complete
+        profile.refreshed_at = now
+        profile.expires_at = expires_at
+        profile.refresh_after = refresh_after
+        db.flush()
+
+        bulk_insert_returning(
+            db, PlantCareRecommendation, recommendation_rows(report.results, species, profile_id=profile.id)
+        )
+
+        db.commit()
+
+    def _postpone(self, key: str):
+        """Keep serving an existing profile for RETRY_BACKOFF after an empty search."""
+        retry_at = datetime.now(timezone.utc) + RETRY_BACKOFF
+        db = SessionLocal()
+        try:
+            profile = db.query(SpeciesCareProfile).filter(SpeciesCareProfile.species_key == key).first()
+            if profile is None:
+                return
+            if _as_utc(profile.expires_at) < retry_at:
+                profile.expires_at = retry_at
+            profile.refresh_after = retry_at
+            db.commit()
+        finally:
+            db.close()
+
+    async def refresh_due(self, limit: Optional[int] = None) -> CareProfileRefreshReport:
+        """
+        Renew profiles whose refresh_after has passed, earliest first.
+
+        Only profiles that a plant still points at are renewed; the others are
+        searched again on their next lookup. Renewal times are jittered over
+        CARE_PROFILE_REFRESH_WINDOW_HOURS before expiry and each run renews at
+        most CARE_PROFILE_REFRESH_BATCH profiles, so searches are spread over
+        the day instead of bunching up when a cohort of profiles expires.
+
+        Args:
+            limit: Most profiles to renew (defaults to CARE_PROFILE_REFRESH_BATCH)
+
+        Returns:
+            CareProfileRefreshReport for this run
+        """
+        started = time.perf_counter()
+        limit = settings.CARE_PROFILE_REFRESH_BATCH if limit is None else limit
+        due = await run_in_threadpool(self._claim_due, limit)
+
+        report = CareProfileRefreshReport(due=len(due))
+        for key, species in due:
+            try:
+                outcome = await self.refresh(key, species, renewal=True)
+            except Exception as e:
+                logger.error(f"Renewing care profile for {species} failed: {e}")
+                report.failed += 1
+                continue
+            if not has_sources(outcome.results):
+                report.failed += 1
+            else:
+                report.renewed += 1
+                if not outcome.complete:
+                    report.incomplete += 1
+
+        report.elapsed_ms = (time.perf_counter() - started) * 1000
+        self.last_refresh = report
+        return report
+
+    def _claim_due(self, limit: int) -> List[Tuple[str, str]]:
+        """
+        Pick due profiles and push their refresh_after back by RETRY_BACKOFF.
+
+        The conditional update means two workers running the refresher at the
+        same time never renew the same profile, and a renewal that crashes is
+        picked up again on a later run.
+        """
+        now = datetime.now(timezone.utc)
+        db = SessionLocal()
+        try:
+            candidates = db.query(
+                SpeciesCareProfile.id, SpeciesCareProfile.species_key, SpeciesCareProfile.species_name
+            ).filter(
+                SpeciesCareProfile.refresh_after <= now,
+                exists().where(Plant.care_profile_id == SpeciesCareProfile.id)
+            ).order_by(SpeciesCareProfile.refresh_after).limit(limit).all()
+
+            claimed = []
+            for profile_id, key, species in candidates:
+                result = db.execute(
+                    update(SpeciesCareProfile)
+                    .where(SpeciesCareProfile.id == profile_id, SpeciesCareProfile.refresh_after <= now)
+                    .values(refresh_after=now + RETRY_BACKOFF)
+                )
+                if result.rowcount:
+                    claimed.append((key, species))
+            db.commit()
+            return claimed
+        finally:
+            db.close()
+
+    def stats(self) -> Dict:
+        return {
+            "lookups": self.lookups,
+            "fresh_hits": self.fresh_hits,
+            "hit_rate": round(self.fresh_hits / self.lookups, 3) if self.lookups else 0.0,
+            "stale_served": self.stale_served,
+            "coalesced": self.coalesced,
+            "searches": self.searches,
+            "empty_searches": self.empty_searches,
+            "last_refresh": self.last_refresh.to_dict() if self.last_refresh else None,
+        }
+
+
+# Singleton instance
+care_profiles = CareProfileService()
@@ -1,6 +1,47 @@
 """Care recommendation search service using Google Custom Search."""
-from typing import Dict, List
+import asyncio
+import time
+import weakref
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict, List, Optional, Sequence
+from app.config import settings
 from app.services.google_search import google_search
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Care guides change slowly; reuse search responses for a month
+CARE_SEARCH_TTL = timedelta(days=30)
+
+# Search query per care category
+CARE_QUERIES = {
+    'lighting': "{species} lighting requirements care guide",
+    'watering': "{species} watering schedule how often",
+    'humidity': "{species} humidity temperature needs",
+    'general': "{species} plant care tips indoor",
+    'seasonal': "{species} seasonal care winter summer outdoor indoor",
+    'room_placement': "{species} best room placement indoor location house",
+}
+
+# The categories search_care_info() has always returned
+CORE_CATEGORIES = ('lighting', 'watering', 'humidity', 'general')
+
+# Everything a full care profile refresh needs
+FULL_PROFILE_CATEGORIES = tuple(CARE_QUERIES)
+
+
+@dataclass
+class CareSearchReport:
+    """Outcome of one category fan-out. Missing categories are listed, not raised."""
+    results: Dict[str, List[Dict]] = field(default_factory=dict)
+    timed_out: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def complete(self) -> bool:
+        return not self.timed_out and not self.failed
 
 
 class CareSearchService:
@@ -8,6 +49,75 @@ class CareSearchService:
 
     def __init__(self):
         self.google_search = google_search
+        self.timeout = settings.CARE_SEARCH_TIMEOUT_SECONDS
+        # One concurrency limit per event loop (scheduler jobs run their own loops)
+        self._limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+
+    def _limit(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        limit = self._limits.get(loop)
+        if limit is None:
+            limit = self._limits[loop] = asyncio.Semaphore(settings.CARE_SEARCH_CONCURRENCY)
+        return limit
+
+    async def _search_category(self, species: str, category: str, num_results: int, ttl: timedelta,
+                               timeout: float) -> List[Dict]:
+        async with self._limit():
+            # Timed from here, so time spent queued for the limit never cancels a search before it starts
+            query = CARE_QUERIES[category].format(species=species)
+            return await asyncio.wait_for(self.google_search.search_plant_problem(query, num_results, ttl=ttl), timeout)
+
+    async def search_categories(
+        self,
+        species: str,
+        categories: Sequence[str] = CORE_CATEGORIES,
+        num_results: int = 3,
+        timeout: Optional[float] = None,
+        ttl: Optional[timedelta] = None
+    ) -> CareSearchReport:
+        """
+        Search several care categories concurrently.
+
+        Every category gets its own timeout (CARE_SEARCH_TIMEOUT_SECONDS by
+        default), counted once it has a slot under the shared
+        CARE_SEARCH_CONCURRENCY limit. A
+        category that times out or fails is left out of the results and
+        listed on the report; the others are still returned. A timed-out
+        search keeps running in the background and fills the search cache.
+
+        Args:
+            species: Scientific or common name of the plant
+            categories: Keys of CARE_QUERIES to search
+            num_results: Number of results per category
+            timeout: Per-category timeout in seconds
+            ttl: Oldest cached search response to accept (defaults to CARE_SEARCH_TTL)
+
+        Returns:
+            CareSearchReport with results in the order of `categories`
+        """
+        timeout = self.timeout if timeout is None else timeout
+        ttl = CARE_SEARCH_TTL if ttl is None else ttl
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(
+            *[self._search_category(species, category, num_results, ttl, timeout) for category in categories],
+            return_exceptions=True
+        )
+
+        report = CareSearchReport()
+        for category, outcome in zip(categories, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                report.timed_out.append(category)
+            elif isinstance(outcome, Exception):
+                report.failed.append(category)
+                logger.error(f"Care search for {species} ({category}) failed: {outcome}")
+            else:
+                report.results[category] = outcome
+        report.elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if report.timed_out:
+            logger.warning(f"Care search for {species} timed out after {timeout}s: {', '.join(report.timed_out)}")
+        return report
 
     async def search_care_info(self, species: str, num_results: int = 3) -> Dict[str, List[Dict]]:
         """
@@ -24,7 +134,8 @@ class CareSearchService:
             num_results: Number of results per category (default: 3)
 
         Returns:
-            Dictionary with categorized search results:
+            Dictionary with categorized search results (categories that
+            timed out are omitted):
             {
                 "lighting": [{"title": ..., "snippet": ..., "url": ..., "rank": ...}],
                 "watering": [...],
@@ -32,21 +143,27 @@ class CareSearchService:
                 "general": [...]
             }
         """
-        # Prepare search queries for different care aspects
-        queries = {
-            'lighting': f"{species} lighting requirements care guide",
-            'watering': f"{species} watering schedule how often",
-            'humidity': f"{species} humidity temperature needs",
-            'general': f"{species} plant care tips indoor"
-        }
-
-        # Execute searches for each category
-        results = {}
-        for category, query in queries.items():
-            category_results = await self.google_search.search_plant_problem(query, num_results)
-            results[category] = category_results
-
-        return results
+        report = await self.search_categories(species, CORE_CATEGORIES, num_results)
+        return report.results
+
+    async def search_full_profile(
+        self,
+        species: str,
+        num_results: int = 3,
+        ttl: Optional[timedelta] = None
+    ) -> CareSearchReport:
+        """
+        Search every care category (core, seasonal and room placement) in one fan-out.
+
+        Args:
+            species: Scientific or common name of the plant
+            num_results: Number of results per category
+            ttl: Oldest cached search response to accept (defaults to CARE_SEARCH_TTL)
+
+        Returns:
+            CareSearchReport covering FULL_PROFILE_CATEGORIES
+        """
+        return await self.search_categories(species, FULL_PROFILE_CATEGORIES, num_results, ttl=ttl)
 
     async def search_specific_care(
         self,
@@ -66,7 +183,7 @@ class CareSearchService:
             List of search results for the specified care type
         """
         query = f"{species} {care_type} plant care guide"
-        return await self.google_search.search_plant_problem(query, num_results)
+        return await self.google_search.search_plant_problem(query, num_results, ttl=CARE_SEARCH_TTL)
 
     async def search_seasonal_care(self, species: str, num_results: int = 3) -> List[Dict]:
         """
@@ -79,8 +196,8 @@ class CareSearchService:
         Returns:
             List of search results about seasonal care
         """
-        query = f"{species} seasonal care winter summer outdoor indoor"
-        return await self.google_search.search_plant_problem(query, num_results)
+        report = await self.search_categories(species, ('seasonal',), num_results)
+        return report.results.get('seasonal', [])
 
     async def search_room_placement(self, species: str, num_results: int = 3) -> List[Dict]:
         """
@@ -93,8 +210,8 @@ class CareSearchService:
         Returns:
             List of search results about room placement
         """
-        query = f"{species} best room placement indoor location house"
-        return await self.google_search.search_plant_problem(query, num_results)
+        report = await self.search_categories(species, ('room_placement',), num_results)
+        return report.results.get('room_placement', [])
 
     def extract_care_summary(self, search_results: Dict[str, List[Dict]]) -> str:
         """
@@ -109,6 +226,8 @@ class CareSearchService:
         summary_parts = []
 
         for category, results in search_results.items():
+            if category not in CORE_CATEGORIES:
+                continue
             if results and len(results) > 0:
                 # Get the top result snippet for this category
                 top_snippet = results[0].get('snippet', '')
@@ -9,26 +9,206 @@ This service runs daily to:
 5. Track progress and stop when daily limit reached or all data fetched
 """
 import asyncio
+import time
+from dataclasses import dataclass, field, asdict
 from datetime import date, datetime, timedelta
 from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
+from sqlalchemy import or_, bindparam, text
 
+from app.config import settings
 from app.database import SessionLocal
 from app.models.plant import Plant
 from app.models.watering import WateringSchedule
-from app.models.enrichment import PlantEnrichment, EnrichmentLog, SpeciesCache
-from app.services.perenual import perenual_service
+from app.models.enrichment import PlantEnrichment, EnrichmentLog, SpeciesCache, SpeciesAlias
+from app.services.perenual import perenual_service, PerenualRateLimited
 from app.utils.logging_config import get_logger
+from app.utils.species_names import normalize_species_name
 
 logger = get_logger(__name__)
 
+# Perenual calls per search_and_get_details(): indoor search, unfiltered search, details
+REQUESTS_PER_LOOKUP = 3
+
+# Plants not yet matched to a Perenual species, paired with the species_cache row
+# check_species_cache() would pick (scientific name, then common name, then alias).
+# {scope} optionally limits the pairs to particular species_cache rows.
+BACKFILL_MATCHES = """(
+    SELECT p.id AS plant_id, COALESCE(MIN(s1.id), MIN(s2.id), MIN(a.species_cache_id)) AS cache_id
+    FROM plants p
+    LEFT JOIN plant_enrichments pe ON pe.plant_id = p.id
+    LEFT JOIN species_cache s1 ON s1.scientific_name_normalized = p.species_normalized
+    LEFT JOIN species_cache s2 ON s2.common_name_normalized = p.identified_common_name_normalized
+    LEFT JOIN species_aliases a ON a.name_normalized IN (p.identified_common_name_normalized, p.species_normalized)
+    WHERE pe.perenual_id IS NULL {scope}
+    GROUP BY p.id
+    HAVING COALESCE(MIN(s1.id), MIN(s2.id), MIN(a.species_cache_id)) IS NOT NULL
+) m"""
+
+BACKFILL_SCOPE = "AND (s1.id IN :cache_ids OR s2.id IN :cache_ids OR a.species_cache_id IN :cache_ids)"
+
+# Same rules as apply_cache_to_plant(): only empty fields are filled
+BACKFILL_PLANTS = """
+UPDATE plants SET
+    lighting_requirement = COALESCE(NULLIF(plants.lighting_requirement, ''), sc.lighting_requirement, plants.lighting_requirement),
+    pet_friendly = COALESCE(plants.pet_friendly, NOT sc.poisonous_to_pets),
+    soil_type = COALESCE(NULLIF(plants.soil_type, ''), NULLIF({soil_text}, ''), plants.soil_type),
+    care_summary = COALESCE(NULLIF(plants.care_summary, ''), NULLIF(substr(sc.description, 1, 500), ''), plants.care_summary),
+    identified_common_name = COALESCE(NULLIF(plants.identified_common_name, ''), NULLIF(sc.common_name, ''), plants.identified_common_name),
+    identified_common_name_normalized = CASE
+        WHEN NULLIF(plants.identified_common_name, '') IS NULL AND NULLIF(sc.common_name, '') IS NOT NULL
+        THEN sc.common_name_normalized ELSE plants.identified_common_name_normalized END,
+    updated_at = CURRENT_TIMESTAMP
+FROM {matches} JOIN species_cache sc ON sc.id = m.cache_id
+WHERE plants.id = m.plant_id
+"""
+
+BACKFILL_WATERING_SCHEDULES = """
+INSERT INTO watering_schedules (plant_id, frequency_days, next_watering)
+SELECT m.plant_id, sc.watering_frequency_days, {next_watering}
+FROM {matches} JOIN species_cache sc ON sc.id = m.cache_id
+WHERE sc.watering_frequency_days > 0
+  AND NOT EXISTS (SELECT 1 FROM watering_schedules ws WHERE ws.plant_id = m.plant_id)
+"""
+
+BACKFILL_NEW_ENRICHMENTS = """
+INSERT INTO plant_enrichments (
+    plant_id, error_count, has_watering_data, has_sunlight_data, has_care_level_data,
+    has_toxicity_data, has_soil_data, has_description
+)
+SELECT m.plant_id, 0, false, false, false, false, false, false
+FROM {matches}
+WHERE NOT EXISTS (SELECT 1 FROM plant_enrichments pe WHERE pe.plant_id = m.plant_id)
+"""
+
+# Same fields as apply_cache_to_enrichment()
+BACKFILL_ENRICHMENTS = """
+UPDATE plant_enrichments SET
+    perenual_id = sc.perenual_id,
+    perenual_fetched_at = sc.fetched_at,
+    perenual_query_used = substr('cache:' || COALESCE(NULLIF(p.species, ''), NULLIF(p.identified_common_name, ''), p.name), 1, 255),
+    scientific_name = sc.scientific_name,
+    common_name = sc.common_name,
+    watering_category = sc.watering,
+    care_level = sc.care_level,
+    growth_rate = sc.growth_rate,
+    maintenance = sc.maintenance,
+    cycle = sc.cycle,
+    hardiness_min = sc.hardiness_min,
+    hardiness_max = sc.hardiness_max,
+    drought_tolerant = sc.drought_tolerant,
+    soil_types = sc.soil_types,
+    poisonous_to_pets = sc.poisonous_to_pets,
+    poisonous_to_humans = sc.poisonous_to_humans,
+    description = sc.description,
+    origin = sc.origin,
+    propagation_methods = sc.propagation,
+    flowering_season = sc.flowering_season,
+    perenual_image_url = sc.image_url,
+    has_watering_data = sc.watering IS NOT NULL,
+    has_sunlight_data = sc.lighting_requirement IS NOT NULL,
+    has_care_level_data = sc.care_level IS NOT NULL,
+    has_toxicity_data = sc.poisonous_to_pets IS NOT NULL,
+    has_soil_data = NULLIF({soil_text}, '') IS NOT NULL,
+    has_description = sc.description IS NOT NULL,
+    updated_at = CURRENT_TIMESTAMP
+FROM {matches}
+JOIN species_cache sc ON sc.id = m.cache_id
+JOIN plants p ON p.id = m.plant_id
+WHERE plant_enrichments.plant_id = m.plant_id
+"""
+
+# species_cache.soil_types (a JSON list) as "a, b, c", the way apply_cache_to_plant() joins it
+SOIL_TEXT = {
+    'postgresql': (
+        "CASE WHEN json_typeof(sc.soil_types) = 'array' "
+        "THEN array_to_string(ARRAY(SELECT json_array_elements_text(sc.soil_types)), ', ') "
+        "ELSE sc.soil_types #>> '{}' END"
+    ),
+    'sqlite': (
+        "CASE WHEN json_type(sc.soil_types) = 'array' "
+        "THEN (SELECT group_concat(value, ', ') FROM json_each(sc.soil_types)) "
+        "ELSE json_extract(sc.soil_types, '$') END"
+    ),
+}
+
+# :today plus the species' watering interval
+NEXT_WATERING = {
+    'postgresql': "CAST(:today AS DATE) + sc.watering_frequency_days",
+    'sqlite': "date(:today, '+' || sc.watering_frequency_days || ' days')",
+}
+
+
+@dataclass
+class SpeciesGroup:
+    """Pending plants that share one normalized species name."""
+    key: str
+    query: str  # Name searched on Perenual
+    common_name: Optional[str]  # Cache match and search fallback
+    plants: List[Tuple[int, str, Optional[str]]] = field(default_factory=list)  # (id, name, species)
+    cache: Optional[SpeciesCache] = None
+    care_data: Optional[Dict[str, Any]] = None
+    from_api: bool = False
+    error: Optional[str] = None  # "No match found in Perenual" or the lookup error
+    skipped: bool = False  # Not looked up: quota spent or rate limited
+
+
+@dataclass
+class EnrichmentRunReport:
+    """Throughput and quota use of one enrichment run."""
+    plants: int = 0
+    species: int = 0
+    cache_hit_species: int = 0
+    api_species: int = 0
+    skipped_species: int = 0
+    plants_from_cache: int = 0
+    plants_from_api: int = 0
+    plants_not_found: int = 0
+    plants_errored: int = 0
+    plants_skipped: int = 0
+    plants_backfilled: int = 0  # Plants outside this run matched to species it fetched
+    api_requests: int = 0
+    api_requests_remaining: int = 0
+    rate_limited: int = 0
+    write_batches: int = 0
+    elapsed_ms: float = 0.0
+
+    @property
+    def plants_per_minute(self) -> float:
+        done = self.plants - self.plants_skipped
+        return round(done / (self.elapsed_ms / 60000), 1) if self.elapsed_ms else 0.0
+
+    @property
+    def requests_per_enriched_plant(self) -> float:
+        enriched = self.plants_from_cache + self.plants_from_api
+        return round(self.api_requests / enriched, 3) if enriched else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **asdict(self),
+            "plants_per_minute": self.plants_per_minute,
+            "requests_per_enriched_plant": self.requests_per_enriched_plant,
+        }
+
+
+@dataclass
+class BackfillReport:
+    """Outcome of one species_cache backfill pass."""
+    plants_enriched: int = 0
+    plants_updated: int = 0
+    enrichments_created: int = 0
+    watering_schedules_created: int = 0
+    elapsed_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
 
 class DataScraperService:
     """Service for scraping and enriching plant data from external APIs."""
 
     def __init__(self):
-        self.daily_limit = 100  # Perenual free tier limit
+        self.daily_limit = settings.PERENUAL_DAILY_LIMIT
         self.requests_used = 0
 
     def get_plants_needing_enrichment(self, db: Session, limit: int = 100) -> List[Plant]:
@@ -91,22 +271,38 @@ class DataScraperService:
         return enrichment
 
     def check_species_cache(self, db: Session, species: str, common_name: str = None) -> Optional[SpeciesCache]:
-        """Check if we have cached data for this species."""
-        # Try exact scientific name match
-        cache = db.query(SpeciesCache).filter(
-            func.lower(SpeciesCache.scientific_name) == func.lower(species)
-        ).first()
+        """
+        Check if we have cached data for this species.
+
+        Matches the scientific name, then the common name, then any alternative
+        name, all on indexed normalized columns.
+        """
+        species_key = normalize_species_name(species)
+        common_key = normalize_species_name(common_name)
 
-        if cache:
-            return cache
+        # Try exact scientific name match
+        if species_key:
+            cache = db.query(SpeciesCache).filter(
+                SpeciesCache.scientific_name_normalized == species_key
+            ).first()
+            if cache:
+                return cache
 
         # Try common name match
-        if common_name:
+        if common_key:
             cache = db.query(SpeciesCache).filter(
-                func.lower(SpeciesCache.common_name) == func.lower(common_name)
+                SpeciesCache.common_name_normalized == common_key
             ).first()
+            if cache:
+                return cache
 
-        return cache
+        # Try alternative names
+        keys = [key for key in (common_key, species_key) if key]
+        if not keys:
+            return None
+        return db.query(SpeciesCache).join(SpeciesAlias).filter(
+            SpeciesAlias.name_normalized.in_(keys)
+        ).order_by(SpeciesCache.id).first()
 
     def save_to_species_cache(self, db: Session, care_data: Dict[str, Any]) -> Optional[SpeciesCache]:
         """Save species data to cache for future reuse."""
@@ -121,7 +317,72 @@ class DataScraperService:
         if existing:
             return existing
 
-        cache = SpeciesCache(
+        cache = self.build_species_cache(care_data)
+        db.add(cache)
+        db.commit()
+        db.refresh(cache)
+
+        # Every other plant of this species can use it right away
+        self.backfill_from_species_cache(db, [cache.id])
+        return cache
+
+    def backfill_from_species_cache(self, db: Session, cache_ids: Optional[List[int]] = None) -> BackfillReport:
+        """
+        Apply species_cache to every matching plant that isn't enriched yet, in bulk.
+
+        Plants are joined to species_cache on their stored normalized
+        scientific name, or common name as a fallback, like check_species_cache(). Four set-based
+        statements in one transaction then fill the plants' empty care
+        fields, create missing watering schedules and insert or update their
+        plant_enrichments rows; no rows are loaded into Python.
+
+        Args:
+            db: Database session
+            cache_ids: Only backfill these species_cache rows (default: all)
+
+        Returns:
+            BackfillReport with the number of rows touched
+        """
+        started = time.perf_counter()
+        dialect = db.get_bind().dialect.name
+        soil_text = SOIL_TEXT.get(dialect, SOIL_TEXT['postgresql'])
+        next_watering = NEXT_WATERING.get(dialect, NEXT_WATERING['postgresql'])
+
+        params: Dict[str, Any] = {"today": date.today().isoformat()}
+        matches = BACKFILL_MATCHES.format(scope=BACKFILL_SCOPE if cache_ids is not None else "")
+        if cache_ids is not None:
+            if not cache_ids:
+                return BackfillReport()
+            params["cache_ids"] = list(cache_ids)
+
+        def run(statement: str) -> int:
+            clause = text(statement.format(matches=matches, soil_text=soil_text, next_watering=next_watering))
+            if cache_ids is not None:
+                clause = clause.bindparams(bindparam("cache_ids", expanding=True))
+            return db.execute(clause, params).rowcount
+
+        report = BackfillReport()
+        try:
+            # Order matters: the last statement sets perenual_id, which ends the match
+            report.plants_updated = run(BACKFILL_PLANTS)
+            report.watering_schedules_created = run(BACKFILL_WATERING_SCHEDULES)
+            report.enrichments_created = run(BACKFILL_NEW_ENRICHMENTS)
+            report.plants_enriched = run(BACKFILL_ENRICHMENTS)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Species cache backfill failed: {e}")
+            return BackfillReport()
+
+        report.elapsed_ms = (time.perf_counter() - started) * 1000
+        if report.plants_enriched:
+            logger.info(f"Backfilled {report.plants_enriched} plants from species cache "
+                        f"({report.watering_schedules_created} watering schedules created)")
+        return report
+
+    def build_species_cache(self, care_data: Dict[str, Any]) -> SpeciesCache:
+        """Build (but don't add) a species_cache row from extract_care_data() output."""
+        return SpeciesCache(
             perenual_id=care_data['perenual_id'],
             scientific_name=care_data.get('scientific_name'),
             common_name=care_data.get('common_name'),
@@ -145,13 +406,9 @@ class DataScraperService:
             propagation=care_data.get('propagation'),
             flowering_season=care_data.get('flowering_season'),
             image_url=care_data.get('default_image'),
+            alternative_names=care_data.get('other_names') or None,
         )
 
-        db.add(cache)
-        db.commit()
-        db.refresh(cache)
-        return cache
-
     def apply_cache_to_enrichment(
         self,
         enrichment: PlantEnrichment,
@@ -197,6 +454,11 @@ class DataScraperService:
         cache: SpeciesCache
     ):
         """Update the plant record with enriched data."""
+        self.apply_cache_to_plant(plant, cache)
+        db.commit()
+
+    def apply_cache_to_plant(self, plant: Plant, cache: SpeciesCache):
+        """Fill the plant's empty care fields from cached species data (no commit)."""
         # Update lighting if not set
         if not plant.lighting_requirement and cache.lighting_requirement:
             plant.lighting_requirement = cache.lighting_requirement
@@ -217,8 +479,6 @@ class DataScraperService:
         if not plant.identified_common_name and cache.common_name:
             plant.identified_common_name = cache.common_name
 
-        db.commit()
-
     def create_watering_schedule_if_missing(
         self,
         db: Session,
@@ -240,136 +500,267 @@ class DataScraperService:
             db.commit()
             logger.info(f"Created watering schedule for plant {plant_id}: every {frequency_days} days")
 
-    async def enrich_plant(
-        self,
-        db: Session,
-        plant: Plant,
-        log: EnrichmentLog
-    ) -> Tuple[bool, str]:
-        """
-        Enrich a single plant with data from Perenual API.
-
-        Returns:
-            Tuple of (success, message)
-        """
-        try:
-            db.rollback()  # Ensure clean state
-        except:
-            pass
-
-        enrichment = self.get_or_create_enrichment(db, plant.id)
-
-        # Build search query
-        search_query = plant.species or plant.identified_common_name or plant.name
-
-        # Check cache first
-        cache = self.check_species_cache(db, plant.species or '', plant.identified_common_name)
+    def get_or_create_daily_log(self, db: Session) -> EnrichmentLog:
+        """Get or create the enrichment log for today."""
+        today = date.today()
+        log = db.query(EnrichmentLog).filter(
+            EnrichmentLog.run_date == today
+        ).first()
 
-        if cache:
-            logger.info(f"Using cached data for plant {plant.id} ({search_query})")
-            enrichment = self.apply_cache_to_enrichment(enrichment, cache)
-            enrichment.perenual_query_used = f"cache:{search_query}"
+        if not log:
+            log = EnrichmentLog(
+                run_date=today,
+                perenual_requests_limit=self.daily_limit,
+                status="pending"
+            )
+            db.add(log)
             db.commit()
+            db.refresh(log)
 
-            # Update plant record
-            self.update_plant_from_enrichment(db, plant, enrichment, cache)
-
-            # Create watering schedule
-            if cache.watering_frequency_days:
-                self.create_watering_schedule_if_missing(db, plant.id, cache.watering_frequency_days)
+        return log
 
-            return True, "Used cached data"
+    def group_by_species(self, plants: List[Plant]) -> List[SpeciesGroup]:
+        """Stage 1: group pending plants by normalized species (or common) name."""
+        groups: Dict[str, SpeciesGroup] = {}
+        for plant in plants:
+            query = plant.species or plant.identified_common_name or plant.name
+            key = normalize_species_name(query or '')
+            if not key:
+                continue
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = SpeciesGroup(key=key, query=query, common_name=plant.identified_common_name)
+            elif not group.common_name:
+                group.common_name = plant.identified_common_name
+            group.plants.append((plant.id, plant.name, plant.species))
+        return list(groups.values())
+
+    def resolve_cached_species(self, db: Session, groups: List[SpeciesGroup]):
+        """
+        Stage 2: attach species_cache rows to groups with two bulk queries.
 
-        # Check if we have API requests remaining
-        if self.requests_used >= self.daily_limit:
-            return False, "Daily API limit reached"
+        Matches on scientific name, then common name, then alternative
+        names, like check_species_cache(), without any API calls.
+        """
+        keys = {group.key for group in groups}
+        common_keys = {normalize_species_name(group.common_name) for group in groups if group.common_name}
 
-        # Fetch from Perenual API
-        try:
-            logger.info(f"Fetching Perenual data for plant {plant.id}: {search_query}")
-            plant_data = await perenual_service.search_and_get_details(search_query)
-            self.requests_used += 2  # search + details
-            log.perenual_requests_made = self.requests_used
+        by_scientific = {
+            cache.scientific_name_normalized: cache
+            for cache in db.query(SpeciesCache).filter(SpeciesCache.scientific_name_normalized.in_(keys))
+        }
+        by_common = {}
+        if common_keys:
+            by_common = {
+                cache.common_name_normalized: cache
+                for cache in db.query(SpeciesCache).filter(SpeciesCache.common_name_normalized.in_(common_keys))
+            }
+        by_alias = {}
+        for name, cache in db.query(SpeciesAlias.name_normalized, SpeciesCache).join(SpeciesAlias.species).filter(
+            SpeciesAlias.name_normalized.in_(keys | common_keys)
+        ).order_by(SpeciesCache.id.desc()):
+            by_alias[name] = cache  # Lowest id wins, as in check_species_cache()
+
+        for group in groups:
+            common_key = normalize_species_name(group.common_name)
+            group.cache = (
+                by_scientific.get(group.key)
+                or (by_common.get(common_key) if common_key else None)
+                or (by_alias.get(common_key) if common_key else None)
+                or by_alias.get(group.key)
+            )
 
-            if not plant_data:
-                # Try with common name if we searched by species
-                if plant.identified_common_name and search_query != plant.identified_common_name:
-                    plant_data = await perenual_service.search_and_get_details(plant.identified_common_name)
-                    self.requests_used += 2
-                    log.perenual_requests_made = self.requests_used
+    async def look_up_species(self, groups: List[SpeciesGroup], budget: int) -> int:
+        """
+        Stage 3: look up each uncached species once on Perenual.
 
-            if not plant_data:
-                enrichment.last_error = "No match found in Perenual"
-                enrichment.error_count += 1
-                db.commit()
-                log.plants_not_found += 1
-                return False, "No match found"
+        Up to ENRICHMENT_CONCURRENCY lookups run at once, all paced by
+        Perenual's shared token bucket (which honours 429 Retry-After). A
+        lookup is only started if its worst-case request count still fits
+        in `budget`; once Perenual rate limits us for longer than
+        PERENUAL_MAX_RETRY_AFTER_SECONDS, no further lookups are started.
 
-            # Parse and save the data
-            care_data = perenual_service.extract_care_data(plant_data)
+        Returns:
+            Number of Perenual requests made
+        """
+        limit = asyncio.Semaphore(settings.ENRICHMENT_CONCURRENCY)
+        sent_before = perenual_service.requests_sent
+        reserved = 0
+        stopped = False
+
+        async def look_up(group: SpeciesGroup):
+            nonlocal reserved, stopped
+            async with limit:
+                fallback = group.common_name and group.common_name != group.query
+                worst_case = REQUESTS_PER_LOOKUP * (2 if fallback else 1)
+                used = perenual_service.requests_sent - sent_before
+                if stopped or used + reserved + worst_case > budget:
+                    group.skipped = True
+                    return
+
+                reserved += worst_case
+                try:
+                    plant_data = await perenual_service.search_and_get_details(group.query)
+                    if not plant_data and fallback:
+                        plant_data = await perenual_service.search_and_get_details(group.common_name)
+                    if plant_data:
+                        group.care_data = perenual_service.extract_care_data(plant_data)
+                    else:
+                        group.error = "No match found in Perenual"
+                except PerenualRateLimited as e:
+                    logger.warning(f"{e}; not starting further lookups this run")
+                    stopped = True
+                    group.skipped = True
+                except Exception as e:
+                    logger.error(f"Error looking up {group.query}: {e}")
+                    group.error = str(e)
+                finally:
+                    reserved -= worst_case
+
+        await asyncio.gather(*(look_up(group) for group in groups))
+        return perenual_service.requests_sent - sent_before
+
+    def save_species_batch(self, db: Session, groups: List[SpeciesGroup]) -> List[SpeciesCache]:
+        """
+        Store species fetched in stage 3 in species_cache with one lookup and one commit.
 
-            # Save to cache
-            cache = self.save_to_species_cache(db, care_data)
+        Returns:
+            The newly created species_cache rows
+        """
+        fetched = [group for group in groups if group.care_data]
+        for group in fetched:
+            if not group.care_data.get('perenual_id'):
+                group.error = "Failed to cache data"
+        fetched = [group for group in fetched if not group.error]
+        if not fetched:
+            return []
+
+        perenual_ids = {group.care_data['perenual_id'] for group in fetched}
+        caches = {
+            cache.perenual_id: cache
+            for cache in db.query(SpeciesCache).filter(SpeciesCache.perenual_id.in_(perenual_ids))
+        }
+        created = []
+        for group in fetched:
+            perenual_id = group.care_data['perenual_id']
+            if perenual_id not in caches:
+                caches[perenual_id] = self.build_species_cache(group.care_data)
+                db.add(caches[perenual_id])
+                created.append(caches[perenual_id])
+            group.cache = caches[perenual_id]
+            group.from_api = True
+        db.commit()
+        return created
 
-            if cache:
-                # Apply to enrichment
-                enrichment = self.apply_cache_to_enrichment(enrichment, cache)
-                enrichment.perenual_query_used = search_query
-                enrichment.error_count = 0
-                enrichment.last_error = None
-                db.commit()
+    def write_back(
+        self,
+        db: Session,
+        groups: List[SpeciesGroup],
+        log: EnrichmentLog,
+        report: EnrichmentRunReport
+    ) -> List[Dict[str, Any]]:
+        """
+        Stage 4: write enrichments, plant fields and watering schedules.
 
-                # Update plant record
-                self.update_plant_from_enrichment(db, plant, enrichment, cache)
+        Plants are loaded, updated and committed ENRICHMENT_WRITE_BATCH at a
+        time, with the daily log's counters updated in the same commit.
 
-                # Create watering schedule
-                if care_data.get('watering_frequency_days'):
-                    self.create_watering_schedule_if_missing(
-                        db, plant.id, care_data['watering_frequency_days']
-                    )
+        Returns:
+            Per-plant results
+        """
+        work = [(group, plant) for group in groups if not group.skipped for plant in group.plants]
+        report.plants_skipped = sum(len(group.plants) for group in groups if group.skipped)
+        results = []
+
+        batch_size = max(1, settings.ENRICHMENT_WRITE_BATCH)
+        for start in range(0, len(work), batch_size):
+            batch = work[start:start + batch_size]
+            plant_ids = [plant_id for _, (plant_id, _, _) in batch]
+            plants = {plant.id: plant for plant in db.query(Plant).filter(Plant.id.in_(plant_ids))}
+            scheduled = {
+                plant_id for (plant_id,) in
+                db.query(WateringSchedule.plant_id).filter(WateringSchedule.plant_id.in_(plant_ids))
+            }
 
-                log.plants_enriched += 1
-                return True, f"Enriched with Perenual ID {care_data.get('perenual_id')}"
+            for group, (plant_id, plant_name, plant_species) in batch:
+                plant = plants.get(plant_id)
+                if plant is None:
+                    continue  # Deleted since the run started
 
-            return False, "Failed to cache data"
+                enrichment = plant.enrichment
+                if enrichment is None:
+                    enrichment = plant.enrichment = PlantEnrichment(error_count=0)
 
-        except Exception as e:
-            logger.error(f"Error enriching plant {plant.id}: {e}")
-            enrichment.last_error = str(e)
-            enrichment.error_count += 1
-            db.commit()
-            log.plants_errored += 1
-            return False, f"Error: {str(e)}"
+                log.plants_processed += 1
+                if group.cache is not None:
+                    cache = group.cache
+                    self.apply_cache_to_enrichment(enrichment, cache)
+                    self.apply_cache_to_plant(plant, cache)
+                    if group.from_api:
+                        enrichment.perenual_query_used = group.query
+                        enrichment.error_count = 0
+                        enrichment.last_error = None
+                        report.plants_from_api += 1
+                        message = f"Enriched with Perenual ID {cache.perenual_id}"
+                    else:
+                        enrichment.perenual_query_used = f"cache:{group.query}"
+                        report.plants_from_cache += 1
+                        message = "Used cached data"
+                    log.plants_enriched += 1
+
+                    if cache.watering_frequency_days and plant_id not in scheduled:
+                        db.add(WateringSchedule(
+                            plant_id=plant_id,
+                            frequency_days=cache.watering_frequency_days,
+                            next_watering=date.today() + timedelta(days=cache.watering_frequency_days)
+                        ))
+                        scheduled.add(plant_id)
+                    success = True
+                else:
+                    enrichment.last_error = group.error
+                    enrichment.error_count = (enrichment.error_count or 0) + 1
+                    if group.error == "No match found in Perenual":
+                        log.plants_not_found += 1
+                        report.plants_not_found += 1
+                        message = "No match found"
+                    else:
+                        log.plants_errored += 1
+                        report.plants_errored += 1
+                        message = f"Error: {group.error}"
+                    success = False
 
-    def get_or_create_daily_log(self, db: Session) -> EnrichmentLog:
-        """Get or create the enrichment log for today."""
-        today = date.today()
-        log = db.query(EnrichmentLog).filter(
-            EnrichmentLog.run_date == today
-        ).first()
+                results.append({
+                    "plant_id": plant_id,
+                    "plant_name": plant_name,
+                    "species": plant_species,
+                    "success": success,
+                    "message": message
+                })
 
-        if not log:
-            log = EnrichmentLog(
-                run_date=today,
-                perenual_requests_limit=self.daily_limit,
-                status="pending"
-            )
-            db.add(log)
+            log.perenual_requests_made = self.requests_used
             db.commit()
-            db.refresh(log)
+            report.write_batches += 1
 
-        return log
+        return results
 
     async def run_daily_enrichment(self, max_plants: int = None) -> Dict[str, Any]:
         """
-        Run the daily enrichment process.
+        Run the daily enrichment process as a staged pipeline.
+
+        1. Group pending plants by normalized species name
+        2. Resolve species already in species_cache in bulk (no API calls)
+        3. Look up each remaining species once on Perenual, concurrently and
+           through the rate limiter, while today's quota allows
+        4. Write the results back in batches
 
         Args:
-            max_plants: Maximum number of plants to process (default: use all API calls)
+            max_plants: Maximum number of plants to process (default: ENRICHMENT_MAX_PLANTS)
 
         Returns:
-            Summary of enrichment results
+            Summary of enrichment results, including the run's throughput and
+            quota report
         """
+        started = time.perf_counter()
         db = SessionLocal()
         try:
             log = self.get_or_create_daily_log(db)
@@ -400,11 +791,8 @@ class DataScraperService:
             log.started_at = datetime.utcnow()
             db.commit()
 
-            # Calculate how many plants we can process (2 API calls each worst case)
-            plants_to_process = min(max_plants or remaining // 2, remaining // 2)
-
-            # Get plants needing enrichment
-            plants = self.get_plants_needing_enrichment(db, limit=plants_to_process)
+            # Cache hits cost no API calls, so the plant limit doesn't depend on the quota
+            plants = self.get_plants_needing_enrichment(db, limit=max_plants or settings.ENRICHMENT_MAX_PLANTS)
 
             if not plants:
                 logger.info("No plants need enrichment")
@@ -417,41 +805,38 @@ class DataScraperService:
                     "log_id": log.id
                 }
 
-            logger.info(f"Starting enrichment for {len(plants)} plants")
+            groups = self.group_by_species(plants)
+            report = EnrichmentRunReport(plants=sum(len(group.plants) for group in groups), species=len(groups))
+            logger.info(f"Starting enrichment for {report.plants} plants ({report.species} species)")
 
-            # Process each plant
-            results = []
-            for plant in plants:
-                if self.requests_used >= self.daily_limit:
-                    logger.info("Daily limit reached, stopping")
-                    break
+            self.resolve_cached_species(db, groups)
+            misses = [group for group in groups if group.cache is None]
+            report.cache_hit_species = report.species - len(misses)
 
-                # Refresh log from database
-                db.refresh(log)
-                log.plants_processed += 1
-                db.commit()
+            rate_limited_before = perenual_service.rate_limited
+            report.api_requests = await self.look_up_species(misses, budget=remaining)
+            report.rate_limited = perenual_service.rate_limited - rate_limited_before
+            report.api_species = sum(1 for group in misses if not group.skipped)
+            report.skipped_species = len(misses) - report.api_species
+            self.requests_used += report.api_requests
+            report.api_requests_remaining = max(0, self.daily_limit - self.requests_used)
+            if report.skipped_species:
+                logger.info(f"Daily limit or rate limit reached, {report.skipped_species} species left for the next run")
 
-                # Use plant ID to refetch in clean transaction
-                plant_id = plant.id
-                plant_name = plant.name
-                plant_species = plant.species
+            created = self.save_species_batch(db, misses)
+            results = self.write_back(db, groups, log, report)
 
-                success, message = await self.enrich_plant(db, plant, log)
-                results.append({
-                    "plant_id": plant_id,
-                    "plant_name": plant_name,
-                    "species": plant_species,
-                    "success": success,
-                    "message": message
-                })
-
-                # Delay between plants to avoid rate limiting (free tier has strict rate limits)
-                await asyncio.sleep(3)
+            # Plants outside this run's batch (or left over by the quota) share the new species
+            if created:
+                backfill = self.backfill_from_species_cache(db, [cache.id for cache in created])
+                report.plants_backfilled = backfill.plants_enriched
 
             # Complete the run
+            log.perenual_requests_made = self.requests_used
             log.status = "completed"
             log.completed_at = datetime.utcnow()
             db.commit()
+            report.elapsed_ms = (time.perf_counter() - started) * 1000
 
             summary = {
                 "status": "completed",
@@ -461,16 +846,18 @@ class DataScraperService:
                 "plants_not_found": log.plants_not_found,
                 "plants_errored": log.plants_errored,
                 "api_requests_used": self.requests_used,
-                "api_requests_remaining": self.daily_limit - self.requests_used,
+                "api_requests_remaining": report.api_requests_remaining,
+                "report": report.to_dict(),
                 "results": results
             }
 
-            logger.info(f"Enrichment complete: {summary}")
+            logger.info(f"Enrichment complete: {report.to_dict()}")
             return summary
 
         except Exception as e:
             logger.error(f"Enrichment run failed: {e}")
             if db:
+                db.rollback()
                 log = self.get_or_create_daily_log(db)
                 log.status = "failed"
                 log.error_message = str(e)
@@ -0,0 +1,247 @@
+"""
+Background diagnosis jobs.
+
+A diagnosis request in background mode stores its PlantPhoto row as
+"pending" and returns straight away; the analysis (vision model, or a web
+search when the plant has no photo) runs here under a per-process
+concurrency limit. When it finishes, the DiagnosisSolution rows are written
+with a short session of their own, the photo is marked "complete" (or
+"failed"), and a "diagnosis_complete" message goes out on the user's
+/ws/notifications connections. Clients connected to another worker process
+(or not connected at all) poll GET /diagnosis/{photo_id} instead.
+"""
+import asyncio
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Dict, List, Set
+
+from fastapi import HTTPException, status
+from sqlalchemy import Row, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.photo import DiagnosisSolution, PlantPhoto
+from app.services.google_search import google_search
+from app.services.image_diagnosis import image_diagnosis
+from app.services.websocket_manager import websocket_manager
+from app.utils.bulk_insert import bulk_insert_returning
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Text-only diagnosis searches are reused for a day
+DIAGNOSIS_SEARCH_TTL = timedelta(days=1)
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETE = "complete"
+FAILED = "failed"
+
+
+async def run_diagnosis(photo_url: str, plant_name: str, description: str,
+                        force_refresh: bool = False) -> List[Dict[str, Any]]:
+    """Vision analysis of the photo, or a web search for the problem when there is no photo."""
+    if photo_url:
+        return await image_diagnosis.analyze_plant_image(
+            image_path=photo_url,
+            plant_name=plant_name,
+            user_description=description,
+            force_refresh=force_refresh
+        )
+    search_query = f"{plant_name} {description} plant problem solution"
+    return await google_search.search_plant_problem(
+        search_query, ttl=timedelta(0) if force_refresh else DIAGNOSIS_SEARCH_TTL
+    )
+
+
+def save_solutions(db: Session, photo_id: int, results: List[Dict[str, Any]]) -> List[Row]:
+    """Insert the DiagnosisSolution rows for a diagnosis result in one statement (the caller commits)."""
+    return bulk_insert_returning(db, DiagnosisSolution, [
+        {
+            "photo_id": photo_id,
+            "title": result['title'],
+            "snippet": result.get('snippet'),
+            "url": result.get('url', ''),
+            "rank": result['rank'],
+        }
+        for result in results
+    ])
+
+
+@dataclass
+class DiagnosisJob:
+    """One queued diagnosis; job id is the PlantPhoto id."""
+    photo_id: int
+    user_id: int
+    plant_id: int
+    photo_url: str
+    plant_name: str
+    description: str
+    force_refresh: bool = False
+    submitted_at: float = field(default_factory=time.perf_counter)
+
+
+class DiagnosisJobQueue:
+    """Bounded background executor for diagnosis jobs."""
+
+    def __init__(self):
+        self.concurrency = max(1, settings.DIAGNOSIS_JOB_CONCURRENCY)
+        self.max_queue = max(0, settings.DIAGNOSIS_JOB_MAX_QUEUE)
+        # One concurrency limit per event loop (scheduler jobs run their own loops)
+        self._limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+        self._tasks: Set[asyncio.Task] = set()
+        self.queued = 0  # Submitted, waiting for a slot
+        self.running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.abandoned = 0  # Diagnosis deleted before its job started
+        self.notified = 0  # Completions pushed to at least one open WebSocket
+        self._wait_ms = deque(maxlen=500)
+        self._run_ms = deque(maxlen=500)
+
+    def _limit(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        limit = self._limits.get(loop)
+        if limit is None:
+            limit = self._limits[loop] = asyncio.Semaphore(self.concurrency)
+        return limit
+
+    def ensure_capacity(self):
+        """Reject with 503 and Retry-After once DIAGNOSIS_JOB_MAX_QUEUE jobs are waiting."""
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            logger.warning(f"Diagnosis job queue full ({self.queued} queued), rejecting request")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many diagnoses in progress right now, please retry shortly",
+                headers={"Retry-After": str(settings.DIAGNOSIS_JOB_RETRY_AFTER_SECONDS)},
+            )
+
+    def submit(self, job: DiagnosisJob):
+        """Schedule a job whose PlantPhoto row is already committed as pending."""
+        self.submitted += 1
+        self.queued += 1
+        task = asyncio.get_running_loop().create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job: DiagnosisJob):
+        outcome = FAILED
+        total = 0
+        waiting = True
+        try:
+            async with self._limit():
+                self.queued -= 1
+                waiting = False
+                self._wait_ms.append((time.perf_counter() - job.submitted_at) * 1000)
+                if not await run_in_threadpool(self._set_status, job.photo_id, RUNNING):
+                    # Deleted while it waited
+                    self.abandoned += 1
+                    return
+                self.running += 1
+                started = time.perf_counter()
+                try:
+                    results = await run_diagnosis(
+                        job.photo_url, job.plant_name, job.description, job.force_refresh
+                    )
+                    total = await run_in_threadpool(self._store, job.photo_id, results)
+                    outcome = COMPLETE
+                finally:
+                    self.running -= 1
+                    self._run_ms.append((time.perf_counter() - started) * 1000)
+        except asyncio.CancelledError:
+            if waiting:
+                self.queued -= 1
+            logger.warning(f"Diagnosis job {job.photo_id} cancelled")
+            await run_in_threadpool(self._set_status, job.photo_id, FAILED)
+            raise
+        except Exception as e:
+            logger.error(f"Diagnosis job {job.photo_id} failed: {e}")
+            await run_in_threadpool(self._set_status, job.photo_id, FAILED)
+
+        if outcome == COMPLETE:
+            self.completed += 1
+        else:
+            self.failed += 1
+        await self._notify(job, outcome, total)
+
+    def _set_status(self, photo_id: int, value: str) -> bool:
+        db = SessionLocal()
+        try:
+            updated = db.execute(update(PlantPhoto).where(PlantPhoto.id == photo_id).values(status=value))
+            db.commit()
+            return bool(updated.rowcount)
+        except Exception as e:
+            logger.warning(f"Could not mark diagnosis {photo_id} {value}: {e}")
+            return False
+        finally:
+            db.close()
+
+    def _store(self, photo_id: int, results: List[Dict[str, Any]]) -> int:
+        """Write the solutions and mark the photo complete; nothing if it was deleted meanwhile."""
+        db = SessionLocal()
+        try:
+            updated = db.execute(update(PlantPhoto).where(PlantPhoto.id == photo_id).values(status=COMPLETE))
+            if not updated.rowcount:
+                db.rollback()
+                return 0
+            solutions = save_solutions(db, photo_id, results)
+            db.commit()
+            return len(solutions)
+        finally:
+            db.close()
+
+    async def _notify(self, job: DiagnosisJob, outcome: str, total_solutions: int):
+        if job.user_id not in websocket_manager.active_connections:
+            return
+        await websocket_manager.send_to_user(job.user_id, {
+            "type": "diagnosis_complete",
+            "data": {
+                "job_id": job.photo_id,
+                "photo_id": job.photo_id,
+                "plant_id": job.plant_id,
+                "status": outcome,
+                "total_solutions": total_solutions,
+            }
+        })
+        self.notified += 1
+
+    async def shutdown(self, timeout: float = 5.0):
+        """Cancel unfinished jobs; their photos are marked failed."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        wait = sorted(self._wait_ms)
+        run = sorted(self._run_ms)
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "queued": self.queued,
+            "running": self.running,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "abandoned": self.abandoned,
+            "notified": self.notified,
+            "wait_p50_ms": round(wait[int(len(wait) * 0.50)], 1) if wait else 0.0,
+            "wait_p95_ms": round(wait[min(len(wait) - 1, int(len(wait) * 0.95))], 1) if wait else 0.0,
+            "run_p50_ms": round(run[int(len(run) * 0.50)], 1) if run else 0.0,
+            "run_p95_ms": round(run[min(len(run) - 1, int(len(run) * 0.95))], 1) if run else 0.0,
+        }
+
+
+# Singleton instance
+diagnosis_jobs = DiagnosisJobQueue()
@@ -1,11 +1,37 @@
 """Google Custom Search API integration."""
-import httpx
+import asyncio
+import hashlib
+import re
+import unicodedata
+import weakref
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
 from app.config import settings
+from app.database import SessionLocal
+from app.models.search_cache import SearchCacheEntry
+from app.utils.http_client import http_clients
 from app.utils.logging_config import get_logger
+from app.utils.ttl_cache import TTLCache
 
 logger = get_logger(__name__)
 
+# Purge expired search_cache rows after this many writes
+PURGE_EVERY_WRITES = 500
+
+
+def normalize_query(query: str) -> str:
+    """Case, width and whitespace-insensitive form of a query (quotes and operators are kept)."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", query)).strip().lower()
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
 
 class GoogleSearchService:
     """Service for searching plant problems using Google Custom Search API."""
@@ -15,13 +41,39 @@ class GoogleSearchService:
         self.search_engine_id = getattr(settings, 'GOOGLE_SEARCH_ENGINE_ID', None)
         self.base_url = "https://www.googleapis.com/customsearch/v1"
 
-    async def search_plant_problem(self, query: str, num_results: int = 10) -> List[Dict[str, str]]:
+        # Response cache: in-process LRU in front of the search_cache table
+        self.default_ttl = timedelta(hours=settings.SEARCH_CACHE_TTL_HOURS)
+        self.negative_ttl = timedelta(hours=settings.SEARCH_CACHE_NEGATIVE_TTL_HOURS)
+        self.memory_cache = TTLCache(max_entries=settings.SEARCH_CACHE_MAX_ENTRIES)
+        # In-flight requests per event loop (scheduler jobs run their own loops)
+        self._in_flight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = \
+            weakref.WeakKeyDictionary()
+        self._writes = 0
+        self.db_hits = 0
+        self.negative_hits = 0
+        self.coalesced = 0
+        self.api_calls = 0
+        self.api_errors = 0
+
+    async def search_plant_problem(
+        self,
+        query: str,
+        num_results: int = 10,
+        ttl: Optional[timedelta] = None
+    ) -> List[Dict[str, str]]:
         """
         Search for plant problem solutions.
 
+        Responses are cached by normalized query and result count, first in
+        process and then in the database; concurrent identical searches share
+        one API request. Searches with no results are cached for
+        SEARCH_CACHE_NEGATIVE_TTL_HOURS.
+
         Args:
             query: The search query describing the plant problem
             num_results: Number of results to return (max 10)
+            ttl: How long this caller is happy to reuse the response
+                 (defaults to SEARCH_CACHE_TTL_HOURS)
 
         Returns:
             List of search results with title, snippet, and URL
@@ -31,36 +83,161 @@ class GoogleSearchService:
             # Return mock data for testing without API keys
             return self._get_mock_results(query, num_results)
 
+        num = min(num_results, 10)  # Google API max is 10 per request
+        normalized = normalize_query(query)
+        cache_key = hashlib.sha256(f"{normalized}|{num}".encode()).hexdigest()
+
+        ttl = self.default_ttl if ttl is None else ttl
+
+        found, entry = self.memory_cache.get(cache_key)
+        if found and self._fresh_enough(entry[0], ttl):
+            if not entry[1]:
+                self.negative_hits += 1
+            return self._copy(entry[1])
+
+        in_flight = self._in_flight.setdefault(asyncio.get_running_loop(), {})
+        pending = in_flight.get(cache_key)
+        if pending is not None:
+            self.coalesced += 1
+            return self._copy(await asyncio.shield(pending))
+
+        pending = asyncio.ensure_future(self._fetch(cache_key, query, normalized, num, ttl))
+        in_flight[cache_key] = pending
+        pending.add_done_callback(lambda _: in_flight.pop(cache_key, None))
+        return self._copy(await asyncio.shield(pending))
+
+    def _fresh_enough(self, fetched_at: datetime, ttl: timedelta) -> bool:
+        return datetime.now(timezone.utc) - fetched_at < ttl
+
+    @staticmethod
+    def _copy(results: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        # Callers get their own dicts so they can't alter cached entries
+        return [dict(result) for result in results]
+
+    async def _fetch(self, cache_key: str, query: str, normalized: str, num: int,
+                     ttl: timedelta) -> List[Dict[str, str]]:
+        """Second tier (database), then the API with the query as given; fills both tiers."""
+        cached = await run_in_threadpool(self._db_get, cache_key)
+        if cached is not None and self._fresh_enough(cached[1], ttl):
+            results, fetched_at, expires_at = cached
+            self.db_hits += 1
+            if not results:
+                self.negative_hits += 1
+            remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+            self.memory_cache.set(cache_key, (fetched_at, results), remaining)
+            return results
+
+        # Only the cache key is normalized: lowercasing would turn operators like OR into plain words
+        results = await self._call_api(query, num)
+        if results is None:
+            # Error: fall back to mock data, and don't cache it
+            return self._get_mock_results(query, num)
+
+        fetched_at = datetime.now(timezone.utc)
+        ttl = ttl if results else min(ttl, self.negative_ttl)
+        self.memory_cache.set(cache_key, (fetched_at, results), ttl.total_seconds())
+        await run_in_threadpool(self._db_put, cache_key, normalized, num, results, fetched_at, fetched_at + ttl)
+        return results
+
+    async def _call_api(self, query: str, num: int) -> Optional[List[Dict[str, str]]]:
+        """One Custom Search request; None if it failed."""
+        self.api_calls += 1
         try:
-            async with httpx.AsyncClient() as client:
-                params = {
-                    'key': self.api_key,
-                    'cx': self.search_engine_id,
-                    'q': query,
-                    'num': min(num_results, 10)  # Google API max is 10 per request
-                }
-
-                response = await client.get(self.base_url, params=params, timeout=10.0)
-                response.raise_for_status()
-
-                data = response.json()
-                results = []
-
-                if 'items' in data:
-                    for idx, item in enumerate(data['items'], 1):
-                        results.append({
-                            'title': item.get('title', 'No title'),
-                            'snippet': item.get('snippet', ''),
-                            'url': item.get('link', ''),
-                            'rank': idx
-                        })
-
-                return results
+            client = http_clients.get(self.base_url)
+            params = {
+                'key': self.api_key,
+                'cx': self.search_engine_id,
+                'q': query,
+                'num': num
+            }
+
+            response = await client.get(self.base_url, params=params)
+            response.raise_for_status()
+
+            data = response.json()
+            results = []
+
+            if 'items' in data:
+                for idx, item in enumerate(data['items'], 1):
+                    results.append({
+                        'title': item.get('title', 'No title'),
+                        'snippet': item.get('snippet', ''),
+                        'url': item.get('link', ''),
+                        'rank': idx
+                    })
+
+            return results
 
         except Exception as e:
             # Fall back to mock data if API call fails
+            self.api_errors += 1
             logger.error(f"Google Search API error: {e}")
-            return self._get_mock_results(query, num_results)
+            return None
+
+    def _db_get(self, cache_key: str):
+        db = SessionLocal()
+        try:
+            entry = db.execute(
+                select(SearchCacheEntry.id, SearchCacheEntry.results,
+                       SearchCacheEntry.fetched_at, SearchCacheEntry.expires_at)
+                .where(SearchCacheEntry.cache_key == cache_key)
+            ).first()
+            if entry is None or _as_utc(entry.expires_at) <= datetime.now(timezone.utc):
+                return None
+            db.execute(
+                update(SearchCacheEntry)
+                .where(SearchCacheEntry.id == entry.id)
+                .values(hit_count=SearchCacheEntry.hit_count + 1)
+            )
+            db.commit()
+            return entry.results, _as_utc(entry.fetched_at), _as_utc(entry.expires_at)
+        except Exception as e:
+            logger.warning(f"Search cache read failed: {e}")
+            return None
+        finally:
+            db.close()
+
+    def _db_put(self, cache_key: str, query: str, num: int, results: List[Dict],
+                fetched_at: datetime, expires_at: datetime):
+        db = SessionLocal()
+        try:
+            values = {"results": results, "is_empty": not results, "fetched_at": fetched_at,
+                      "expires_at": expires_at, "hit_count": 0}
+            updated = db.execute(
+                update(SearchCacheEntry).where(SearchCacheEntry.cache_key == cache_key).values(**values)
+            )
+            if not updated.rowcount:
+                db.add(SearchCacheEntry(cache_key=cache_key, query=query, num_results=num, **values))
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()  # Another worker stored it first
+
+            self._writes += 1
+            if self._writes % PURGE_EVERY_WRITES == 0:
+                db.query(SearchCacheEntry).filter(
+                    SearchCacheEntry.expires_at < datetime.now(timezone.utc)
+                ).delete(synchronize_session=False)
+                db.commit()
+        except Exception as e:
+            logger.warning(f"Search cache write failed: {e}")
+        finally:
+            db.close()
+
+    def stats(self) -> Dict:
+        memory = self.memory_cache.stats()
+        lookups = memory["hits"] + memory["misses"]
+        saved = memory["hits"] + self.db_hits + self.coalesced
+        return {
+            "memory": memory,
+            "db_hits": self.db_hits,
+            "negative_hits": self.negative_hits,
+            "coalesced": self.coalesced,
+            "api_calls": self.api_calls,
+            "api_errors": self.api_errors,
+            "hit_rate": round(saved / lookups, 3) if lookups else 0.0,
+            "saved_quota": saved,  # Searches answered without a paid API request
+        }
 
     def _get_mock_results(self, query: str, num_results: int) -> List[Dict[str, str]]:
         """
@@ -0,0 +1,194 @@
+"""Near-duplicate photo cache in front of PlantNet identification."""
+import copy
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select, update
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.identification_cache import IdentificationCacheEntry
+from app.utils.logging_config import get_logger
+from app.utils.perceptual_hash import BKTree, dhash_file
+
+logger = get_logger(__name__)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _add_rows(trees: Dict[str, BKTree], rows):
+    """Index (id, image_hash, organ, expires_at) rows in the per-organ trees."""
+    for entry_id, image_hash, organ, expires_at in rows:
+        tree = trees.setdefault(organ, BKTree())
+        tree.add(int(image_hash, 16), (entry_id, _as_utc(expires_at)))
+
+
+class IdentificationCache:
+    """
+    PlantNet results indexed by the dHash of the photo they were for.
+
+    Rows live in the identification_cache table; each process keeps BK-trees
+    (one per organ) of the most recent IDENTIFICATION_CACHE_MAX_ENTRIES
+    hashes and picks up rows other workers added on its next lookup. A photo
+    within IDENTIFICATION_HASH_MAX_DISTANCE bits of a cached one gets that
+    photo's result. All methods block, so call them from a thread.
+    """
+
+    def __init__(self):
+        self.ttl = timedelta(days=settings.IDENTIFICATION_CACHE_TTL_DAYS)
+        self.max_distance = settings.IDENTIFICATION_HASH_MAX_DISTANCE
+        self.max_entries = settings.IDENTIFICATION_CACHE_MAX_ENTRIES
+        self._trees: Dict[str, BKTree] = {}
+        self._last_id = 0  # Highest row id in the trees
+        self._loaded = False
+        self._rebuilding = False
+        self._lock = threading.Lock()  # Guards the trees; never held across a query
+        self.lookups = 0
+        self.hits = 0
+        self.near_hits = 0  # Hits on a different but similar photo
+        self.stores = 0
+        self.hash_errors = 0
+
+    def lookup(self, image_path: str, organ: str) -> Tuple[Optional[int], Optional[Dict]]:
+        """
+        Hash a photo and look for a cached result for it.
+
+        Returns:
+            (image hash, cached result) - the hash is None if the image could
+            not be decoded, the result None on a miss
+        """
+        try:
+            image_hash = dhash_file(image_path)
+        except Exception as e:
+            self.hash_errors += 1
+            logger.warning(f"Could not hash {image_path} for the identification cache: {e}")
+            return None, None
+
+        self.lookups += 1
+        db = SessionLocal()
+        try:
+            self._sync(db)
+            with self._lock:
+                tree = self._trees.get(organ)
+                now = datetime.now(timezone.utc)
+                # Closest match, newest first among equals
+                matches = sorted(
+                    ((distance, -entry_id) for distance, (entry_id, expires_at)
+                     in (tree.search(image_hash, self.max_distance) if tree else ())
+                     if expires_at > now),
+                )
+            if not matches:
+                return image_hash, None
+
+            distance, entry_id = matches[0][0], -matches[0][1]
+            result = db.execute(
+                select(IdentificationCacheEntry.result).where(IdentificationCacheEntry.id == entry_id)
+            ).scalar_one_or_none()
+            if result is None:
+                return image_hash, None
+            db.execute(
+                update(IdentificationCacheEntry)
+                .where(IdentificationCacheEntry.id == entry_id)
+                .values(hit_count=IdentificationCacheEntry.hit_count + 1)
+            )
+            db.commit()
+
+            self.hits += 1
+            if distance:
+                self.near_hits += 1
+            return image_hash, copy.deepcopy(result)
+        except Exception as e:
+            logger.warning(f"Identification cache read failed: {e}")
+            return image_hash, None
+        finally:
+            db.close()
+
+    def store(self, image_hash: int, organ: str, result: Dict):
+        """Keep a PlantNet result for later lookups of similar photos."""
+        db = SessionLocal()
+        try:
+            db.add(IdentificationCacheEntry(
+                image_hash=f"{image_hash:016x}",
+                organ=organ,
+                result=result,
+                expires_at=datetime.now(timezone.utc) + self.ttl,
+            ))
+            db.commit()
+            self.stores += 1
+            # The row is added to the trees by the next lookup's sync
+        except Exception as e:
+            logger.warning(f"Identification cache write failed: {e}")
+        finally:
+            db.close()
+
+    def _sync(self, db):
+        """
+        Add rows written since the last sync; rebuild once the trees outgrow max_entries.
+
+        The queries run without the lock, so lookups in other threads keep
+        searching the current trees meanwhile; it is only taken to merge the
+        new rows or swap in rebuilt trees.
+        """
+        with self._lock:
+            tree_size = sum(tree.size for tree in self._trees.values())
+            rebuild = not self._rebuilding and (not self._loaded or tree_size > self.max_entries * 1.25)
+            if rebuild:
+                self._rebuilding = True
+            elif self._rebuilding:
+                # Another thread is reloading the trees; search what is there
+                return
+            last_id = self._last_id
+
+        columns = (IdentificationCacheEntry.id, IdentificationCacheEntry.image_hash,
+                   IdentificationCacheEntry.organ, IdentificationCacheEntry.expires_at)
+        if not rebuild:
+            rows = db.execute(
+                select(*columns).where(IdentificationCacheEntry.id > last_id).order_by(IdentificationCacheEntry.id)
+            ).all()
+            with self._lock:
+                # A concurrent sync may have merged some of these already
+                new_rows = [row for row in rows if row[0] > self._last_id]
+                _add_rows(self._trees, new_rows)
+                if new_rows:
+                    self._last_id = new_rows[-1][0]
+            return
+
+        try:
+            # Rebuild from the newest rows, dropping expired and old ones
+            db.query(IdentificationCacheEntry).filter(
+                IdentificationCacheEntry.expires_at < datetime.now(timezone.utc)
+            ).delete(synchronize_session=False)
+            db.commit()
+            rows = db.execute(
+                select(*columns).order_by(IdentificationCacheEntry.id.desc()).limit(self.max_entries)
+            ).all()
+            trees: Dict[str, BKTree] = {}
+            _add_rows(trees, rows)
+            with self._lock:
+                self._trees = trees
+                # Rows newer than these are picked up by the next sync
+                self._last_id = max((row[0] for row in rows), default=0)
+                self._loaded = True
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def stats(self) -> Dict:
+        return {
+            "entries": sum(tree.size for tree in self._trees.values()),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+            "saved_api_calls": self.hits,
+            "stores": self.stores,
+            "hash_errors": self.hash_errors,
+        }
+
+
+# Singleton instance
+identification_cache = IdentificationCache()
@@ -1,13 +1,44 @@
 """Image-based plant diagnosis using OpenAI Vision API."""
-import base64
-import httpx
-from pathlib import Path
+import asyncio
+import copy
+import hashlib
+import re
+import time
+import unicodedata
+import weakref
+from collections import deque
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
 from app.config import settings
+from app.database import SessionLocal
+from app.models.diagnosis_cache import DiagnosisCacheEntry
+from app.services.vision_payload import vision_payload
+from app.utils.http_client import http_clients
 from app.utils.logging_config import get_logger
+from app.utils.species_names import normalize_species_name
 
 logger = get_logger(__name__)
 
+VISION_MODEL = "gpt-4o"
+
+# Purge expired diagnosis_cache rows after this many writes
+PURGE_EVERY_WRITES = 200
+
+
+def description_fingerprint(description: str) -> str:
+    """Case, punctuation and whitespace-insensitive form of a problem description."""
+    text = unicodedata.normalize("NFKC", description).lower()
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s]", " ", text)).strip()
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
 
 class ImageDiagnosisService:
     """Service for analyzing plant images to diagnose problems."""
@@ -15,33 +46,41 @@ class ImageDiagnosisService:
     def __init__(self):
         self.api_key = getattr(settings, 'OPENAI_API_KEY', None)
         self.base_url = "https://api.openai.com/v1/chat/completions"
-
-    def _encode_image_to_base64(self, image_path: str) -> Optional[str]:
-        """Convert image file to base64 string."""
-        try:
-            # Handle relative paths from uploads directory
-            if not image_path.startswith('/'):
-                image_path = Path(settings.UPLOAD_DIR).parent.parent / image_path.lstrip('/')
-
-            with open(image_path, "rb") as image_file:
-                return base64.standard_b64encode(image_file.read()).decode("utf-8")
-        except Exception as e:
-            logger.error(f"Error encoding image: {e}")
-            return None
+        self.cache_ttl = timedelta(days=settings.DIAGNOSIS_CACHE_TTL_DAYS)
+        # In-flight analyses per event loop (scheduler jobs run their own loops)
+        self._in_flight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = \
+            weakref.WeakKeyDictionary()
+        self._writes = 0
+        self.lookups = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.forced = 0
+        self.api_calls = 0
+        self.api_errors = 0
+        self.payload_bytes = 0  # Image data URL bytes sent to the model
+        self.unscaled_payload_bytes = 0  # What those requests would have carried at full size
+        self._upstream_ms = deque(maxlen=500)
 
     async def analyze_plant_image(
         self,
         image_path: str,
         plant_name: str,
-        user_description: str
+        user_description: str,
+        force_refresh: bool = False
     ) -> List[Dict[str, str]]:
         """
         Analyze a plant image to diagnose problems.
 
+        Analyses are cached for DIAGNOSIS_CACHE_TTL_DAYS by image content,
+        plant name and description fingerprint, so retrying the same problem
+        on the same photo does not call the model again. Concurrent identical
+        requests share one call.
+
         Args:
-            image_path: Path to the plant image
+            image_path: Stored photo URL or path to the plant image
             plant_name: Name of the plant
             user_description: User's description of the problem
+            force_refresh: Ignore any cached analysis (the new one replaces it)
 
         Returns:
             List of diagnosis results with title and detailed advice
@@ -51,63 +90,174 @@ class ImageDiagnosisService:
             logger.info("OpenAI API key not configured, using fallback diagnosis")
             return self._get_fallback_diagnosis(plant_name, user_description)
 
-        # Encode image
-        base64_image = self._encode_image_to_base64(image_path)
-        if not base64_image:
+        image_hash = await vision_payload.hash_image(image_path)
+        if not image_hash:
+            return self._get_fallback_diagnosis(plant_name, user_description)
+
+        plant_key = normalize_species_name(plant_name) or ""
+        fingerprint = description_fingerprint(user_description)
+        cache_key = hashlib.sha256(f"{image_hash}|{plant_key}|{fingerprint}|{VISION_MODEL}".encode()).hexdigest()
+
+        self.lookups += 1
+        if force_refresh:
+            self.forced += 1
+        else:
+            cached = await run_in_threadpool(self._db_get, cache_key)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+
+        in_flight = self._in_flight.setdefault(asyncio.get_running_loop(), {})
+        pending = in_flight.get(cache_key)
+        if pending is not None:
+            self.coalesced += 1
+            results = await asyncio.shield(pending)
+        else:
+            pending = asyncio.ensure_future(self._analyze(image_path, image_hash, plant_name, user_description))
+            in_flight[cache_key] = pending
+            pending.add_done_callback(lambda _: in_flight.pop(cache_key, None))
+            results = await asyncio.shield(pending)
+            if results is not None:
+                await run_in_threadpool(
+                    self._db_put, cache_key, image_hash, plant_key, fingerprint, results
+                )
+
+        if results is None:
             return self._get_fallback_diagnosis(plant_name, user_description)
+        return copy.deepcopy(results)
+
+    async def _analyze(self, image_path: str, image_hash: str, plant_name: str,
+                       user_description: str) -> Optional[List[Dict[str, str]]]:
+        """One vision API call; None if it failed."""
+        image = await vision_payload.build(image_path, image_hash)
+        if image is None:
+            return None
 
+        self.api_calls += 1
+        self.payload_bytes += image.payload_bytes
+        self.unscaled_payload_bytes += image.unscaled_payload_bytes
+        started = time.perf_counter()
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.base_url,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "gpt-4o",
-                        "messages": [
-                            {
-                                "role": "system",
-                                "content": """You are an expert plant pathologist and horticulturist.
+            client = http_clients.get(self.base_url)
+            response = await client.post(
+                self.base_url,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": VISION_MODEL,
+                    "messages": [
+                        {
+                            "role": "system",
+                            "content": """You are an expert plant pathologist and horticulturist.
 Analyze the plant image and provide a diagnosis. Be specific about what you see in the image.
 Format your response as exactly 3-4 numbered tips, each with a TITLE and ADVICE.
 Format:
 1. **TITLE**: Advice text here
 2. **TITLE**: Advice text here
 etc."""
-                            },
-                            {
-                                "role": "user",
-                                "content": [
-                                    {
-                                        "type": "text",
-                                        "text": f"This is a {plant_name}. The owner says: '{user_description}'. Please analyze this plant image and tell me: 1) What problems do you see? 2) What's causing them? 3) How to fix them?"
-                                    },
-                                    {
-                                        "type": "image_url",
-                                        "image_url": {
-                                            "url": f"data:image/jpeg;base64,{base64_image}"
-                                        }
+                        },
+                        {
+                            "role": "user",
+                            "content": [
+                                {
+                                    "type": "text",
+                                    "text": f"This is a {plant_name}. The owner says: '{user_description}'. Please analyze this plant image and tell me: 1) What problems do you see? 2) What's causing them? 3) How to fix them?"
+                                },
+                                {
+                                    "type": "image_url",
+                                    "image_url": {
+                                        "url": image.data_url
                                     }
-                                ]
-                            }
-                        ],
-                        "max_tokens": 1000
-                    },
-                    timeout=30.0
-                )
+                                }
+                            ]
+                        }
+                    ],
+                    "max_tokens": 1000
+                }
+            )
 
-                response.raise_for_status()
-                data = response.json()
+            self._upstream_ms.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+            data = response.json()
 
-                # Parse the response
-                content = data['choices'][0]['message']['content']
-                return self._parse_diagnosis_response(content)
+            # Parse the response
+            content = data['choices'][0]['message']['content']
+            return self._parse_diagnosis_response(content)
 
         except Exception as e:
+            self.api_errors += 1
             logger.error(f"OpenAI Vision API error: {e}")
-            return self._get_fallback_diagnosis(plant_name, user_description)
+            return None
+
+    def _db_get(self, cache_key: str) -> Optional[List[Dict[str, str]]]:
+        db = SessionLocal()
+        try:
+            entry = db.execute(
+                select(DiagnosisCacheEntry.id, DiagnosisCacheEntry.results, DiagnosisCacheEntry.expires_at)
+                .where(DiagnosisCacheEntry.cache_key == cache_key)
+            ).first()
+            if entry is None or _as_utc(entry.expires_at) <= datetime.now(timezone.utc):
+                return None
+            db.execute(
+                update(DiagnosisCacheEntry)
+                .where(DiagnosisCacheEntry.id == entry.id)
+                .values(hit_count=DiagnosisCacheEntry.hit_count + 1)
+            )
+            db.commit()
+            return entry.results
+        except Exception as e:
+            logger.warning(f"Diagnosis cache read failed: {e}")
+            return None
+        finally:
+            db.close()
+
+    def _db_put(self, cache_key: str, image_hash: str, plant_name: str, description: str,
+                results: List[Dict[str, str]]):
+        db = SessionLocal()
+        try:
+            values = {"results": results, "expires_at": datetime.now(timezone.utc) + self.cache_ttl, "hit_count": 0}
+            updated = db.execute(
+                update(DiagnosisCacheEntry).where(DiagnosisCacheEntry.cache_key == cache_key).values(**values)
+            )
+            if not updated.rowcount:
+                db.add(DiagnosisCacheEntry(
+                    cache_key=cache_key, image_hash=image_hash, plant_name=plant_name[:255],
+                    description=description, **values
+                ))
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()  # Another worker stored it first
+
+            self._writes += 1
+            if self._writes % PURGE_EVERY_WRITES == 0:
+                db.query(DiagnosisCacheEntry).filter(
+                    DiagnosisCacheEntry.expires_at < datetime.now(timezone.utc)
+                ).delete(synchronize_session=False)
+                db.commit()
+        except Exception as e:
+            logger.warning(f"Diagnosis cache write failed: {e}")
+        finally:
+            db.close()
+
+    def stats(self) -> Dict:
+        upstream = sorted(self._upstream_ms)
+        return {
+            "lookups": self.lookups,
+            "cache_hits": self.cache_hits,
+            "hit_rate": round(self.cache_hits / self.lookups, 3) if self.lookups else 0.0,
+            "coalesced": self.coalesced,
+            "forced": self.forced,
+            "api_calls": self.api_calls,
+            "api_errors": self.api_errors,
+            "payload_bytes": self.payload_bytes,
+            "unscaled_payload_bytes": self.unscaled_payload_bytes,
+            "upstream_p50_ms": round(upstream[int(len(upstream) * 0.50)], 1) if upstream else 0.0,
+            "upstream_p95_ms": round(upstream[min(len(upstream) - 1, int(len(upstream) * 0.95))], 1) if upstream else 0.0,
+            "payload_builder": vision_payload.stats(),
+        }
 
     def _parse_diagnosis_response(self, content: str) -> List[Dict[str, str]]:
         """Parse the AI response into structured diagnosis results."""
@@ -125,7 +275,6 @@ etc."""
 
             # Check for numbered items with bold titles
             # Pattern: "1. **Title**: advice" or "1. **Title** - advice"
-            import re
             match = re.match(r'^\d+\.\s*\*\*(.+?)\*\*[:\-]?\s*(.*)$', line)
 
             if match:
@@ -1,14 +1,11 @@
 """Enhanced notification service for sending reminders via multiple channels."""
 import logging
-from datetime import datetime, date, timedelta, time as dt_time
+from datetime import datetime, time as dt_time
 from sqlalchemy.orm import Session
 from typing import Optional, Dict, Any
 
 from app.models.user import User
-from app.models.plant import Plant
-from app.models.watering import WateringSchedule
-from app.models.feeding import FeedingSchedule
-from app.models.reminder import Reminder, ReminderType
+from app.models.reminder import Reminder
 from app.models.notification import (
     Notification,
     NotificationPreferences,
@@ -21,6 +18,21 @@ from app.services.websocket_manager import websocket_manager
 logger = logging.getLogger(__name__)
 
 
+def is_quiet_hours(start: Optional[dt_time], end: Optional[dt_time], now: Optional[dt_time] = None) -> bool:
+    """Check if a time (default: now) falls within a quiet hours window."""
+    if not start or not end:
+        return False
+
+    # Get current time in user's timezone (simplified - just use UTC for now)
+    now = now or datetime.now().time()
+
+    # Handle overnight quiet hours (e.g., 22:00 - 08:00)
+    if start > end:
+        return now >= start or now < end
+    else:
+        return start <= now < end
+
+
 class NotificationService:
     """Service for managing plant care notifications across multiple channels."""
 
@@ -31,161 +43,20 @@ class NotificationService:
         """
         Check all schedules and send reminders for overdue/upcoming care tasks.
 
+        Delegates to the set-based reminder sweep engine.
+
         Returns:
             Number of reminders sent
         """
-        today = date.today()
-        tomorrow = today + timedelta(days=1)
-        reminders_sent = 0
-
-        # Check watering schedules
-        watering_schedules = db.query(WateringSchedule).filter(
-            WateringSchedule.next_watering.isnot(None),
-            WateringSchedule.next_watering <= tomorrow
-        ).all()
-
-        for schedule in watering_schedules:
-            plant = db.query(Plant).filter(Plant.id == schedule.plant_id).first()
-            if plant:
-                user = db.query(User).filter(User.id == plant.user_id).first()
-                if user:
-                    # Check if reminder already sent for this date
-                    existing = db.query(Reminder).filter(
-                        Reminder.plant_id == plant.id,
-                        Reminder.reminder_type == ReminderType.WATERING,
-                        Reminder.sent == True,
-                        Reminder.sent_at >= datetime.now() - timedelta(days=2)
-                    ).first()
-
-                    if not existing:
-                        await self._send_watering_reminder(user, plant, schedule.next_watering, db)
-                        reminders_sent += 1
-
-        # Check feeding schedules
-        feeding_schedules = db.query(FeedingSchedule).filter(
-            FeedingSchedule.next_feeding.isnot(None),
-            FeedingSchedule.next_feeding <= tomorrow
-        ).all()
-
-        for schedule in feeding_schedules:
-            plant = db.query(Plant).filter(Plant.id == schedule.plant_id).first()
-            if plant:
-                user = db.query(User).filter(User.id == plant.user_id).first()
-                if user:
-                    # Check if reminder already sent for this date
-                    existing = db.query(Reminder).filter(
-                        Reminder.plant_id == plant.id,
-                        Reminder.reminder_type == ReminderType.FEEDING,
-                        Reminder.sent == True,
-                        Reminder.sent_at >= datetime.now() - timedelta(days=2)
-                    ).first()
-
-                    if not existing:
-                        await self._send_feeding_reminder(user, plant, schedule.next_feeding, db)
-                        reminders_sent += 1
-
-        logger.info(f"Sent {reminders_sent} reminders")
-        return reminders_sent
-
-    async def _send_watering_reminder(self, user: User, plant: Plant, due_date: date, db: Session):
-        """Send a watering reminder via all enabled channels."""
-        days_overdue = (date.today() - due_date).days
+        report = await self.sweep_reminders(db)
+        logger.info(f"Sent {report.reminders_created} reminders")
+        return report.reminders_created
 
-        if days_overdue > 0:
-            title = f"Overdue: {plant.name} needs watering!"
-            message = f"Your plant '{plant.name}' was due for watering {days_overdue} day(s) ago."
-            priority = NotificationPriority.HIGH
-        elif days_overdue == 0:
-            title = f"Reminder: Water {plant.name} today"
-            message = f"Your plant '{plant.name}' needs watering today!"
-            priority = NotificationPriority.NORMAL
-        else:
-            title = f"Upcoming: {plant.name} needs watering tomorrow"
-            message = f"Your plant '{plant.name}' will need watering tomorrow."
-            priority = NotificationPriority.NORMAL
-
-        # Create reminder record
-        reminder = Reminder(
-            user_id=user.id,
-            plant_id=plant.id,
-            reminder_type=ReminderType.WATERING,
-            scheduled_for=datetime.combine(due_date, datetime.min.time()),
-            sent=True,
-            sent_at=datetime.now()
-        )
-        db.add(reminder)
-        db.flush()  # Get reminder ID
-
-        # Send notifications via enabled channels
-        await self._send_multi_channel_notification(
-            db=db,
-            user=user,
-            plant_id=plant.id,
-            notification_type=NotificationType.WATERING,
-            title=title,
-            message=message,
-            priority=priority,
-            reminder=reminder,
-            data={
-                "plant_id": plant.id,
-                "plant_name": plant.name,
-                "reminder_type": "watering",
-                "due_date": due_date.isoformat(),
-                "deep_link": f"/plants/{plant.id}"
-            }
-        )
-
-        db.commit()
-
-    async def _send_feeding_reminder(self, user: User, plant: Plant, due_date: date, db: Session):
-        """Send a feeding reminder via all enabled channels."""
-        days_overdue = (date.today() - due_date).days
-
-        if days_overdue > 0:
-            title = f"Overdue: {plant.name} needs feeding!"
-            message = f"Your plant '{plant.name}' was due for feeding {days_overdue} day(s) ago."
-            priority = NotificationPriority.HIGH
-        elif days_overdue == 0:
-            title = f"Reminder: Feed {plant.name} today"
-            message = f"Your plant '{plant.name}' needs feeding today!"
-            priority = NotificationPriority.NORMAL
-        else:
-            title = f"Upcoming: {plant.name} needs feeding tomorrow"
-            message = f"Your plant '{plant.name}' will need feeding tomorrow."
-            priority = NotificationPriority.NORMAL
-
-        # Create reminder record
-        reminder = Reminder(
-            user_id=user.id,
-            plant_id=plant.id,
-            reminder_type=ReminderType.FEEDING,
-            scheduled_for=datetime.combine(due_date, datetime.min.time()),
-            sent=True,
-            sent_at=datetime.now()
-        )
-        db.add(reminder)
-        db.flush()
-
-        # Send notifications via enabled channels
-        await self._send_multi_channel_notification(
-            db=db,
-            user=user,
-            plant_id=plant.id,
-            notification_type=NotificationType.FEEDING,
-            title=title,
-            message=message,
-            priority=priority,
-            reminder=reminder,
-            data={
-                "plant_id": plant.id,
-                "plant_name": plant.name,
-                "reminder_type": "feeding",
-                "due_date": due_date.isoformat(),
-                "deep_link": f"/plants/{plant.id}"
-            }
-        )
-
-        db.commit()
+    async def sweep_reminders(self, db: Session):
+        """Run the reminder sweep and return its SweepReport."""
+        # Imported lazily: the sweep engine imports helpers from this module
+        from app.services.reminder_sweep import reminder_sweep
+        return await reminder_sweep.run(db)
 
     async def _send_multi_channel_notification(
         self,
@@ -307,20 +178,7 @@ class NotificationService:
 
     def _is_quiet_hours(self, prefs: NotificationPreferences) -> bool:
         """Check if current time is within quiet hours."""
-        if not prefs.quiet_hours_start or not prefs.quiet_hours_end:
-            return False
-
-        # Get current time in user's timezone (simplified - just use UTC for now)
-        now = datetime.now().time()
-
-        start = prefs.quiet_hours_start
-        end = prefs.quiet_hours_end
-
-        # Handle overnight quiet hours (e.g., 22:00 - 08:00)
-        if start > end:
-            return now >= start or now < end
-        else:
-            return start <= now < end
+        return is_quiet_hours(prefs.quiet_hours_start, prefs.quiet_hours_end)
 
 
 # Singleton instance
@@ -1,11 +1,45 @@
 """Perenual API integration for plant care data enrichment."""
-import httpx
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Dict, List, Optional, Any
+
+import httpx
+
 from app.config import settings
+from app.utils.http_client import http_clients
 from app.utils.logging_config import get_logger
+from app.utils.token_bucket import TokenBucket
 
 logger = get_logger(__name__)
 
+# Wait used when a 429 response has no usable Retry-After header
+DEFAULT_RETRY_AFTER_SECONDS = 60
+
+
+class PerenualRateLimited(Exception):
+    """Perenual asked us to back off for longer than PERENUAL_MAX_RETRY_AFTER_SECONDS."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Perenual rate limited for {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return DEFAULT_RETRY_AFTER_SECONDS
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER_SECONDS
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
 
 class PerenualService:
     """Service for fetching plant data from Perenual API.
@@ -18,7 +52,40 @@ class PerenualService:
         self.api_key = getattr(settings, 'PERENUAL_API_KEY', None)
         self.base_url = "https://perenual.com/api/v2"
         self.requests_today = 0
-        self.daily_limit = 100  # Free tier limit
+        self.daily_limit = settings.PERENUAL_DAILY_LIMIT
+        # Every call goes through one limiter; 429 Retry-After pauses it for all callers
+        self.rate_limiter = TokenBucket(
+            rate=settings.PERENUAL_REQUESTS_PER_MINUTE / 60,
+            capacity=settings.PERENUAL_BURST
+        )
+        self.requests_sent = 0  # Including 429s; enrichment runs diff this for quota use
+        self.rate_limited = 0
+
+    async def _get(self, path: str, params: Dict[str, Any]) -> httpx.Response:
+        """
+        GET a Perenual endpoint through the rate limiter.
+
+        A 429 pauses the limiter for its Retry-After and is retried up to
+        PERENUAL_MAX_RETRIES times. A Retry-After longer than
+        PERENUAL_MAX_RETRY_AFTER_SECONDS (e.g. the daily quota is spent)
+        raises PerenualRateLimited instead of waiting.
+        """
+        client = http_clients.get(self.base_url)
+        for attempt in range(settings.PERENUAL_MAX_RETRIES + 1):
+            if not await self.rate_limiter.acquire(max_pause=settings.PERENUAL_MAX_RETRY_AFTER_SECONDS):
+                raise PerenualRateLimited(self.rate_limiter.paused_for())
+            response = await client.get(f"{self.base_url}{path}", params=params)
+            self.requests_sent += 1
+            if response.status_code != 429:
+                return response
+
+            self.rate_limited += 1
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            self.rate_limiter.pause(retry_after)
+            if retry_after > settings.PERENUAL_MAX_RETRY_AFTER_SECONDS:
+                raise PerenualRateLimited(retry_after)
+            logger.warning(f"Perenual API rate limit hit, retrying in {retry_after:.0f}s")
+        return response
 
     async def search_plant(self, query: str, indoor: Optional[bool] = True) -> Optional[Dict[str, Any]]:
         """
@@ -37,43 +104,28 @@ class PerenualService:
 
         try:
             logger.info(f"Searching Perenual for: {query}")
-            async with httpx.AsyncClient() as client:
-                params = {
-                    'key': self.api_key,
-                    'q': query,
-                }
-                if indoor is not None:
-                    params['indoor'] = 1 if indoor else 0
-
-                response = await client.get(
-                    f"{self.base_url}/species-list",
-                    params=params,
-                    timeout=30.0
-                )
-
-                # Handle rate limiting
-                if response.status_code == 429:
-                    logger.warning("Perenual API rate limit hit, waiting 60 seconds...")
-                    import asyncio
-                    await asyncio.sleep(60)
-                    response = await client.get(
-                        f"{self.base_url}/species-list",
-                        params=params,
-                        timeout=30.0
-                    )
-
-                response.raise_for_status()
-                self.requests_today += 1
-
-                data = response.json()
-                logger.debug(f"Perenual search response: {data}")
-
-                if data.get('data') and len(data['data']) > 0:
-                    # Return the first (best) match
-                    return data['data'][0]
-
-                return None
+            params = {
+                'key': self.api_key,
+                'q': query,
+            }
+            if indoor is not None:
+                params['indoor'] = 1 if indoor else 0
+
+            response = await self._get("/species-list", params)
+            response.raise_for_status()
+            self.requests_today += 1
+
+            data = response.json()
+            logger.debug(f"Perenual search response: {data}")
+
+            if data.get('data') and len(data['data']) > 0:
+                # Return the first (best) match
+                return data['data'][0]
+
+            return None
 
+        except PerenualRateLimited:
+            raise
         except Exception as e:
             logger.error(f"Perenual search error: {e}")
             return None
@@ -94,31 +146,16 @@ class PerenualService:
 
         try:
             logger.info(f"Fetching Perenual details for plant ID: {plant_id}")
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/species/details/{plant_id}",
-                    params={'key': self.api_key},
-                    timeout=30.0
-                )
-
-                # Handle rate limiting
-                if response.status_code == 429:
-                    logger.warning("Perenual API rate limit hit, waiting 60 seconds...")
-                    import asyncio
-                    await asyncio.sleep(60)
-                    response = await client.get(
-                        f"{self.base_url}/species/details/{plant_id}",
-                        params={'key': self.api_key},
-                        timeout=30.0
-                    )
-
-                response.raise_for_status()
-                self.requests_today += 1
-
-                data = response.json()
-                logger.debug(f"Perenual details response: {data}")
-                return data
+            response = await self._get(f"/species/details/{plant_id}", {'key': self.api_key})
+            response.raise_for_status()
+            self.requests_today += 1
 
+            data = response.json()
+            logger.debug(f"Perenual details response: {data}")
+            return data
+
+        except PerenualRateLimited:
+            raise
         except Exception as e:
             logger.error(f"Perenual details error: {e}")
             return None
@@ -168,22 +205,19 @@ class PerenualService:
             return []
 
         try:
-            async with httpx.AsyncClient() as client:
-                params = {'key': self.api_key}
-                if query:
-                    params['q'] = query
-
-                response = await client.get(
-                    f"{self.base_url}/pest-disease-list",
-                    params=params,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                self.requests_today += 1
-
-                data = response.json()
-                return data.get('data', [])
+            params = {'key': self.api_key}
+            if query:
+                params['q'] = query
+
+            response = await self._get("/pest-disease-list", params)
+            response.raise_for_status()
+            self.requests_today += 1
+
+            data = response.json()
+            return data.get('data', [])
 
+        except PerenualRateLimited:
+            raise
         except Exception as e:
             logger.error(f"Perenual pest/disease error: {e}")
             return []
@@ -257,6 +291,7 @@ class PerenualService:
         care_data = {
             'perenual_id': plant_data.get('id'),
             'common_name': plant_data.get('common_name'),
+            'other_names': [name for name in plant_data.get('other_name') or [] if isinstance(name, str)],
             'scientific_name': None,
             'watering': plant_data.get('watering'),
             'watering_frequency_days': None,
@@ -334,6 +369,13 @@ class PerenualService:
         """Reset the daily request counter (called at midnight)."""
         self.requests_today = 0
 
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests_sent": self.requests_sent,
+            "rate_limited": self.rate_limited,
+            "limiter": self.rate_limiter.stats(),
+        }
+
 
 # Singleton instance
 perenual_service = PerenualService()
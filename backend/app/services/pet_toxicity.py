@@ -1,11 +1,38 @@
 """Pet toxicity lookup service for plants."""
-from typing import Optional, Dict, Any
+import asyncio
+import weakref
+from typing import Optional, Dict, Any, List, Mapping, Sequence, Tuple
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.toxicity import ToxicityVerdict
 from app.services.google_search import google_search
+from app.utils.aho_corasick import AhoCorasick
 from app.utils.logging_config import get_logger
+from app.utils.species_names import normalize_species_name
+from app.utils.ttl_cache import TTLCache
 
 logger = get_logger(__name__)
 
+# Toxicity doesn't change; web fallback searches are reused for a month
+TOXICITY_SEARCH_TTL = timedelta(days=30)
+
+# The local tables only change with a deploy, so memoized lookups never expire
+LOOKUP_TTL_SECONDS = float("inf")
+
+# Purge expired toxicity_verdicts rows after this many writes
+PURGE_EVERY_WRITES = 200
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
 
 @dataclass
 class ToxicityInfo:
@@ -467,75 +494,193 @@ COMMON_NAME_ALIASES: Dict[str, str] = {
 }
 
 
-class PetToxicityService:
-    """Service for looking up pet toxicity information for plants."""
+def _normalize_name(name: str) -> str:
+    """Normalize a plant name for matching."""
+    return name.lower().strip()
 
-    def _normalize_name(self, name: str) -> str:
-        """Normalize a plant name for matching."""
-        return name.lower().strip()
 
-    def _lookup_in_database(
+class ToxicityMatcher:
+    """
+    The toxicity tables compiled for constant-time lookups.
+
+    Gives exactly the answers of the original linear scans: where several
+    entries match, the one earliest in its table wins.
+    """
+
+    def __init__(self, database: Dict[str, ToxicityInfo], aliases: Dict[str, str]):
+        self.database = database
+
+        # Normalized name -> first entry with that normalized name
+        self.by_normalized: Dict[str, ToxicityInfo] = {}
+        for name, info in database.items():
+            self.by_normalized.setdefault(_normalize_name(name), info)
+
+        # Single-word entries, i.e. everything a genus taken from a species name can match
+        self.genera: Dict[str, ToxicityInfo] = {
+            name: info for name, info in database.items() if name.split() == [name]
+        }
+
+        # Only aliases whose scientific name has an entry can ever match
+        self.alias_entries: List[Tuple[str, ToxicityInfo]] = [
+            (alias, database[scientific]) for alias, scientific in aliases.items() if scientific in database
+        ]
+        self.by_alias: Dict[str, ToxicityInfo] = dict(self.alias_entries)
+
+        # Partial common-name matches: aliases inside the name come from the
+        # automaton, names inside an alias from a table of every alias substring
+        self.alias_automaton = AhoCorasick([alias for alias, _ in self.alias_entries])
+        self.alias_substrings: Dict[str, int] = {}
+        for index, (alias, _) in enumerate(self.alias_entries):
+            for start in range(len(alias) + 1):
+                for stop in range(start, len(alias) + 1):
+                    self.alias_substrings.setdefault(alias[start:stop], index)
+
+    def lookup(
         self,
         species: Optional[str] = None,
         common_name: Optional[str] = None,
         genus: Optional[str] = None
     ) -> Optional[ToxicityInfo]:
-        """Look up toxicity info in the local database."""
-
-        # Try exact species match first
+        """Match species, then common name (exact, then partial), then genus."""
+        # Try exact species match first, then normalized
         if species:
-            if species in TOXICITY_DATABASE:
-                return TOXICITY_DATABASE[species]
-            # Try normalized species
-            for db_name, info in TOXICITY_DATABASE.items():
-                if self._normalize_name(species) == self._normalize_name(db_name):
-                    return info
+            info = self.database.get(species) or self.by_normalized.get(_normalize_name(species))
+            if info:
+                return info
 
         # Try common name lookup
         if common_name:
-            normalized_common = self._normalize_name(common_name)
-            if normalized_common in COMMON_NAME_ALIASES:
-                scientific = COMMON_NAME_ALIASES[normalized_common]
-                if scientific in TOXICITY_DATABASE:
-                    return TOXICITY_DATABASE[scientific]
-            # Partial match on common names
-            for alias, scientific in COMMON_NAME_ALIASES.items():
-                if alias in normalized_common or normalized_common in alias:
-                    if scientific in TOXICITY_DATABASE:
-                        return TOXICITY_DATABASE[scientific]
+            normalized_common = _normalize_name(common_name)
+            info = self.by_alias.get(normalized_common)
+            if info:
+                return info
+            # Partial match: earliest alias contained in, or containing, the name
+            matches = set(self.alias_automaton.find(normalized_common))
+            if normalized_common in self.alias_substrings:
+                matches.add(self.alias_substrings[normalized_common])
+            if matches:
+                return self.alias_entries[min(matches)][1]
 
         # Try genus match as fallback
         if genus:
-            if genus in TOXICITY_DATABASE:
-                return TOXICITY_DATABASE[genus]
-            for db_name, info in TOXICITY_DATABASE.items():
-                if self._normalize_name(genus) == self._normalize_name(db_name):
-                    return info
+            info = self.database.get(genus) or self.by_normalized.get(_normalize_name(genus))
+            if info:
+                return info
 
         # Try extracting genus from species name
         if species and " " in species:
-            extracted_genus = species.split()[0]
-            if extracted_genus in TOXICITY_DATABASE:
-                return TOXICITY_DATABASE[extracted_genus]
+            return self.genera.get(species.split()[0])
 
         return None
 
+
+# Compiled once at import
+toxicity_matcher = ToxicityMatcher(TOXICITY_DATABASE, COMMON_NAME_ALIASES)
+
+
+class PetToxicityService:
+    """Service for looking up pet toxicity information for plants."""
+
+    def __init__(self):
+        # Memoized table lookups, and web-search verdicts in front of the toxicity_verdicts table
+        self.lookup_cache = TTLCache(max_entries=settings.TOXICITY_CACHE_MAX_ENTRIES)
+        self.verdict_cache = TTLCache(max_entries=settings.TOXICITY_CACHE_MAX_ENTRIES)
+        self.verdict_ttl = timedelta(days=settings.TOXICITY_VERDICT_TTL_DAYS)
+        self.negative_ttl = timedelta(hours=settings.TOXICITY_VERDICT_NEGATIVE_TTL_HOURS)
+        # In-flight verdict lookups per event loop (scheduler jobs run their own loops)
+        self._in_flight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = \
+            weakref.WeakKeyDictionary()
+        self._writes = 0
+        self.db_hits = 0
+        self.negative_hits = 0
+        self.coalesced = 0
+        self.web_searches = 0
+
+    def _lookup_in_database(
+        self,
+        species: Optional[str] = None,
+        common_name: Optional[str] = None,
+        genus: Optional[str] = None
+    ) -> Optional[ToxicityInfo]:
+        """Look up toxicity info in the local database."""
+        key = (species, common_name, genus)
+        found, info = self.lookup_cache.get(key)
+        if found:
+            return info
+        info = toxicity_matcher.lookup(species, common_name, genus)
+        self.lookup_cache.set(key, info, LOOKUP_TTL_SECONDS)
+        return info
+
     async def _search_web_for_toxicity(
         self,
         species: Optional[str] = None,
         common_name: Optional[str] = None
     ) -> Optional[ToxicityInfo]:
-        """Search the web for toxicity information as a fallback."""
+        """
+        Search the web for toxicity information as a fallback.
+
+        Verdicts are kept per normalized name, in process and in the
+        toxicity_verdicts table, for TOXICITY_VERDICT_TTL_DAYS; searches
+        that reach no verdict are kept for TOXICITY_VERDICT_NEGATIVE_TTL_HOURS.
+        Concurrent lookups of one name share a single search.
+        """
         search_term = species or common_name
         if not search_term:
             return None
 
+        key = normalize_species_name(search_term)
+        if key is None:
+            return (await self._search_verdict(search_term))[0]
+
+        found, info = self.verdict_cache.get(key)
+        if found:
+            if info is None:
+                self.negative_hits += 1
+            return info
+
+        in_flight = self._in_flight.setdefault(asyncio.get_running_loop(), {})
+        pending = in_flight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        pending = asyncio.ensure_future(self._fetch_verdict(key, search_term))
+        in_flight[key] = pending
+        pending.add_done_callback(lambda _: in_flight.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _fetch_verdict(self, key: str, search_term: str) -> Optional[ToxicityInfo]:
+        """Second tier (database), then the web search; fills both tiers."""
+        stored = await run_in_threadpool(self._db_get, key)
+        if stored is not None:
+            info, expires_at = stored
+            self.db_hits += 1
+            if info is None:
+                self.negative_hits += 1
+            remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+            self.verdict_cache.set(key, info, remaining)
+            return info
+
+        info, confidence, cacheable = await self._search_verdict(search_term)
+        if cacheable:
+            ttl = self.verdict_ttl if info else self.negative_ttl
+            self.verdict_cache.set(key, info, ttl.total_seconds())
+            await run_in_threadpool(self._db_put, key, search_term, info, confidence, ttl)
+        return info
+
+    async def _search_verdict(self, search_term: str) -> Tuple[Optional[ToxicityInfo], Optional[float], bool]:
+        """One web search scored for toxicity: (verdict, confidence, whether to keep it)."""
         try:
             query = f"{search_term} toxic to cats dogs pets ASPCA"
-            results = await google_search.search_plant_problem(query, num_results=5)
+            results = await google_search.search_plant_problem(query, num_results=5, ttl=TOXICITY_SEARCH_TTL)
+            self.web_searches += 1
 
             if not results:
-                return None
+                return None, None, True
+
+            # Without a working search API, in-app tips (no URLs) stand in for
+            # results; score them as before but don't keep what they say
+            cacheable = any(r.get("url") for r in results)
 
             # Analyze search results for toxicity indicators
             toxic_keywords = ["toxic", "poisonous", "harmful", "dangerous", "avoid"]
@@ -548,6 +693,7 @@ class PetToxicityService:
 
             toxic_score = sum(1 for kw in toxic_keywords if kw in combined_text)
             safe_score = sum(1 for kw in safe_keywords if kw in combined_text)
+            confidence = abs(toxic_score - safe_score) / (toxic_score + safe_score) if toxic_score + safe_score else 0.0
 
             if toxic_score > safe_score:
                 return ToxicityInfo(
@@ -555,19 +701,89 @@ class PetToxicityService:
                     toxicity_level="unknown",
                     symptoms="Consult a veterinarian if ingested",
                     source="web_search"
-                )
+                ), confidence, cacheable
             elif safe_score > toxic_score:
                 return ToxicityInfo(
                     pet_friendly=True,
                     toxicity_level="safe",
                     source="web_search"
-                )
+                ), confidence, cacheable
 
-            return None
+            return None, confidence, cacheable
 
         except Exception as e:
             logger.error(f"Error searching for toxicity info: {e}")
+            return None, None, False
+
+    def _db_get(self, key: str) -> Optional[Tuple[Optional[ToxicityInfo], datetime]]:
+        """Stored (verdict or None, expires_at) for a name, or None if there is no live row."""
+        db = SessionLocal()
+        try:
+            row = db.execute(
+                select(ToxicityVerdict).where(ToxicityVerdict.name_key == key)
+            ).scalar_one_or_none()
+            if row is None or _as_utc(row.expires_at) <= datetime.now(timezone.utc):
+                return None
+            db.execute(
+                update(ToxicityVerdict)
+                .where(ToxicityVerdict.id == row.id)
+                .values(hit_count=ToxicityVerdict.hit_count + 1)
+            )
+            db.commit()
+            info = None
+            if row.has_verdict:
+                info = ToxicityInfo(
+                    pet_friendly=row.pet_friendly,
+                    toxicity_level=row.toxicity_level,
+                    toxic_parts=row.toxic_parts,
+                    symptoms=row.symptoms,
+                    source=row.source,
+                )
+            return info, _as_utc(row.expires_at)
+        except Exception as e:
+            logger.warning(f"Toxicity verdict read failed: {e}")
             return None
+        finally:
+            db.close()
+
+    def _db_put(self, key: str, name: str, info: Optional[ToxicityInfo],
+                confidence: Optional[float], ttl: timedelta):
+        db = SessionLocal()
+        try:
+            fetched_at = datetime.now(timezone.utc)
+            values = {
+                "name": name[:255],
+                "has_verdict": info is not None,
+                "pet_friendly": info.pet_friendly if info else None,
+                "toxicity_level": info.toxicity_level if info else None,
+                "toxic_parts": info.toxic_parts if info else None,
+                "symptoms": info.symptoms if info else None,
+                "source": info.source if info else "web_search",
+                "confidence": confidence,
+                "fetched_at": fetched_at,
+                "expires_at": fetched_at + ttl,
+                "hit_count": 0,
+            }
+            updated = db.execute(
+                update(ToxicityVerdict).where(ToxicityVerdict.name_key == key).values(**values)
+            )
+            if not updated.rowcount:
+                db.add(ToxicityVerdict(name_key=key, **values))
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()  # Another worker stored it first
+
+            self._writes += 1
+            if self._writes % PURGE_EVERY_WRITES == 0:
+                db.query(ToxicityVerdict).filter(
+                    ToxicityVerdict.expires_at < datetime.now(timezone.utc)
+                ).delete(synchronize_session=False)
+                db.commit()
+        except Exception as e:
+            logger.warning(f"Toxicity verdict write failed: {e}")
+        finally:
+            db.close()
 
     async def get_toxicity(
         self,
@@ -593,6 +809,47 @@ class PetToxicityService:
         if info is None:
             info = await self._search_web_for_toxicity(species, common_name)
 
+        return self._to_dict(info)
+
+    async def get_toxicity_many(self, candidates: Sequence[Mapping[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get pet toxicity information for several plants at once.
+
+        Local table hits are answered straight away; the misses share one
+        concurrent round of web lookups, one per distinct name, so the wait
+        is that of the slowest fallback rather than the sum of all of them.
+
+        Args:
+            candidates: Mappings with optional "species", "common_name" and
+                "genus" keys (e.g. PlantNet results)
+
+        Returns:
+            One toxicity dictionary (or None) per candidate, in input order
+        """
+        infos = [
+            self._lookup_in_database(c.get("species"), c.get("common_name"), c.get("genus"))
+            for c in candidates
+        ]
+
+        # The web fallback only looks at species, then common name
+        searches: Dict[Tuple[Optional[str], Optional[str]], List[int]] = {}
+        for index, (candidate, info) in enumerate(zip(candidates, infos)):
+            if info is None:
+                term = (candidate.get("species"), candidate.get("common_name"))
+                searches.setdefault(term, []).append(index)
+
+        if searches:
+            found = await asyncio.gather(*[
+                self._search_web_for_toxicity(species, common_name) for species, common_name in searches
+            ])
+            for indexes, info in zip(searches.values(), found):
+                for index in indexes:
+                    infos[index] = info
+
+        return [self._to_dict(info) for info in infos]
+
+    @staticmethod
+    def _to_dict(info: Optional[ToxicityInfo]) -> Optional[Dict[str, Any]]:
         if info is None:
             return None
 
@@ -604,6 +861,16 @@ class PetToxicityService:
             "source": info.source,
         }
 
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "lookups": self.lookup_cache.stats(),
+            "verdicts": self.verdict_cache.stats(),
+            "db_hits": self.db_hits,
+            "negative_hits": self.negative_hits,
+            "coalesced": self.coalesced,
+            "web_searches": self.web_searches,
+        }
+
 
 # Singleton instance
 pet_toxicity_service = PetToxicityService()
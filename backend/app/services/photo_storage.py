@@ -1,13 +1,69 @@
 """Photo storage service for handling image uploads."""
+import asyncio
+import hashlib
+import multiprocessing
+import re
 import os
+import time
 import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Optional
-from fastapi import UploadFile
-from PIL import Image, ImageOps
-import io
+from typing import Any, Dict, Optional, Tuple
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import delete, event, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
+from app.database import AsyncSessionLocal, SessionLocal
+from app.models.photo import PhotoBlob, PlantPhoto
+from app.models.plant import Plant
+from app.models.room import RoomPhoto
+from app.utils.disk_cache import DiskLRUCache
+from app.utils.image_processing import (
+    DERIVATIVE_FORMATS, available_formats, compress_photo, encode_vision_image, render_derivative
+)
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Bytes copied per read while spooling an upload to disk
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+STAGES = ("spool", "queue", "decode", "transform", "encode", "derivative")
+
+# An unreferenced blob this recently uploaded is kept: its URL may be about to be saved on a row
+UNREFERENCED_GRACE = timedelta(hours=1)
+
+SAFE_EXTENSION = re.compile(r"\.[A-Za-z0-9]{1,5}")
+
+
+class UploadTooLarge(Exception):
+    """Raised while spooling when an upload exceeds MAX_UPLOAD_SIZE_MB."""
+
+
+def _spool_to_disk(source, dest_path: Path, max_bytes: int) -> Tuple[int, str]:
+    """Copy an upload file object to disk in chunks, hashing it on the way. Runs in a worker thread."""
+    written = 0
+    digest = hashlib.sha256()
+    with open(dest_path, 'wb') as dest:
+        while True:
+            chunk = source.read(SPOOL_CHUNK_SIZE)
+            if not chunk:
+                break
+            written += len(chunk)
+            if written > max_bytes:
+                raise UploadTooLarge()
+            digest.update(chunk)
+            dest.write(chunk)
+    return written, digest.hexdigest()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
 
 
 class PhotoStorageService:
@@ -16,79 +72,456 @@ class PhotoStorageService:
     def __init__(self):
         self.upload_dir = Path(settings.UPLOAD_DIR)
         self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self.spool_dir = self.upload_dir / ".spool"
+        self.spool_dir.mkdir(exist_ok=True)
         self.max_size = (1200, 1200)  # Max dimensions for compression
+        self.max_upload_bytes = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+
+        # Image decode/resize/encode runs in worker processes, created on first upload
+        self.workers = max(1, settings.IMAGE_WORKERS or (os.cpu_count() or 2) - 1)
+        self.max_queue = max(0, settings.IMAGE_MAX_QUEUE)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self.rejected = 0
+        self.failed = 0
+        self.processed = 0
+        self.duplicates = 0  # Uploads answered from an existing blob without re-encoding
+        self.swept = 0  # Unreferenced photos removed by sweep_unreferenced()
+        self._storing: Dict[str, asyncio.Future] = {}
+        self._stage_ms = {stage: deque(maxlen=500) for stage in STAGES}
+
+        # Smaller sizes and WebP/AVIF variants for GET /photos/{name}?w=
+        self.derivative_widths = sorted(settings.PHOTO_DERIVATIVE_WIDTHS) or [self.max_size[0]]
+        self.derivative_formats = available_formats()
+        self.derivative_cache = DiskLRUCache(
+            self.upload_dir / ".derivatives",
+            max_bytes=settings.PHOTO_DERIVATIVE_CACHE_MB * 1024 * 1024
+        )
+        self._rendering: Dict[str, asyncio.Future] = {}
+        self.derivatives_rendered = 0
+        self.derivatives_fallback = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: don't fork the API process (scheduler threads, open connections)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _run_in_pool(self, fn, *args) -> Optional[Dict[str, Any]]:
+        """Run an image_processing function in the worker pool; None if the pool broke."""
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a decompression bomb); start a fresh pool next time
+            self._executor = None
+            return None
 
     async def save_photo(self, file: UploadFile, plant_id: int) -> str:
         """
         Save an uploaded photo with compression.
 
+        Photos are stored by content: the upload is spooled to disk in chunks
+        and hashed, and if the same bytes were uploaded before, the existing
+        photo's URL is returned without decoding anything. New content is
+        compressed in the image worker pool. When all workers are busy and
+        IMAGE_MAX_QUEUE uploads are already waiting, the request is rejected
+        with 503 and Retry-After.
+
         Args:
             file: The uploaded file
-            plant_id: ID of the plant this photo belongs to
+            plant_id: ID of the plant this photo belongs to (unused; names are content hashes)
 
         Returns:
             The URL/path to the saved photo
         """
-        # Generate unique filename
-        file_extension = os.path.splitext(file.filename)[1] if file.filename else '.jpg'
-        unique_filename = f"plant_{plant_id}_{uuid.uuid4().hex}{file_extension}"
-        file_path = self.upload_dir / unique_filename
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            logger.warning(f"Image pipeline queue full ({self.pending} pending), rejecting upload")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many photo uploads right now, please retry shortly",
+                headers={"Retry-After": str(settings.IMAGE_RETRY_AFTER_SECONDS)},
+            )
 
-        # Read the uploaded file
-        contents = await file.read()
+        file_extension = os.path.splitext(file.filename)[1] if file.filename else '.jpg'
+        if not SAFE_EXTENSION.fullmatch(file_extension):
+            file_extension = '.jpg'
+        spool_path = self.spool_dir / uuid.uuid4().hex
+        handed_off = False
 
-        # Compress and save the image
+        self.pending += 1
         try:
-            image = Image.open(io.BytesIO(contents))
+            started = time.perf_counter()
+            try:
+                size, content_hash = await run_in_threadpool(
+                    _spool_to_disk, file.file, spool_path, self.max_upload_bytes
+                )
+            except UploadTooLarge:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Photo must be smaller than {settings.MAX_UPLOAD_SIZE_MB}MB"
+                )
+            self._record("spool", started)
+
+            photo_url = await self._find_blob(content_hash)
+            if photo_url:
+                self.duplicates += 1
+                return photo_url
 
-            # Apply EXIF orientation (fixes rotation from mobile cameras)
-            image = ImageOps.exif_transpose(image)
+            # Single-flight: identical uploads arriving together are encoded once
+            storing = self._storing.get(content_hash)
+            if storing is None:
+                storing = asyncio.ensure_future(self._store_blob(spool_path, content_hash, file_extension))
+                handed_off = True  # _store_blob cleans up the spool file, even if this request goes away
+                self._storing[content_hash] = storing
+                storing.add_done_callback(lambda _: self._storing.pop(content_hash, None))
+            else:
+                self.duplicates += 1
+            return await asyncio.shield(storing)
+        finally:
+            self.pending -= 1
+            if not handed_off:
+                spool_path.unlink(missing_ok=True)
 
-            # Convert RGBA to RGB if necessary
-            if image.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', image.size, (255, 255, 255))
-                if image.mode == 'P':
-                    image = image.convert('RGBA')
-                background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-                image = background
+    async def _find_blob(self, content_hash: str) -> Optional[str]:
+        """URL of an existing blob with this content, refreshing its upload time."""
+        async with AsyncSessionLocal() as session:
+            blob = (await session.execute(
+                select(PhotoBlob.id, PhotoBlob.photo_url).where(PhotoBlob.content_hash == content_hash)
+            )).first()
+            if blob is None or not (self.upload_dir / blob.photo_url.split('/')[-1]).is_file():
+                return None
+            # Re-checked by id: a concurrent delete_photo may have just removed it
+            touched = await session.execute(
+                update(PhotoBlob).where(PhotoBlob.id == blob.id).values(last_uploaded_at=_utcnow())
+            )
+            await session.commit()
+            return blob.photo_url if touched.rowcount else None
 
-            # Resize if image is too large
-            if image.size[0] > self.max_size[0] or image.size[1] > self.max_size[1]:
-                image.thumbnail(self.max_size, Image.Resampling.LANCZOS)
+    async def _store_blob(self, spool_path: Path, content_hash: str, file_extension: str) -> str:
+        """Compress (or, failing that, keep) a spooled upload and record it as a blob."""
+        try:
+            return await self._encode_and_record(spool_path, content_hash, file_extension)
+        finally:
+            spool_path.unlink(missing_ok=True)
 
-            # Save with optimization
-            image.save(file_path, 'JPEG', quality=85, optimize=True)
+    async def _encode_and_record(self, spool_path: Path, content_hash: str, file_extension: str) -> str:
+        filename = f"{content_hash}.jpg"
+        file_path = self.upload_dir / filename
+
+        # Compress and save the image
+        derivatives = []
+        if settings.PHOTO_DERIVATIVES_ON_UPLOAD:
+            # Thumbnails for list views, in the best format this server can encode
+            fmt = self.derivative_formats[0]
+            derivatives = [
+                (width, fmt, str(self.derivative_cache.path_for(self.derivative_name(filename, width, fmt))))
+                for width in self.derivative_widths if width < self.max_size[0]
+            ]
+        submitted = time.perf_counter()
+        timings = await self._run_in_pool(
+            compress_photo, str(spool_path), str(file_path), self.max_size, 85, derivatives
+        ) or {"ok": False, "decode_ms": 0.0, "transform_ms": 0.0, "encode_ms": 0.0,
+              "error": "image worker pool broken"}
+        worker_ms = timings["decode_ms"] + timings["transform_ms"] + timings["encode_ms"]
+        self._stage_ms["queue"].append(max(0.0, (time.perf_counter() - submitted) * 1000 - worker_ms))
 
-        except Exception as e:
+        if timings["ok"]:
+            self.processed += 1
+            for stage in ("decode", "transform", "encode"):
+                self._stage_ms[stage].append(timings[stage + "_ms"])
+            for name in timings["derivatives"]:
+                self.derivative_cache.add(name)
+        else:
             # If image processing fails, save the original file
-            with open(file_path, 'wb') as f:
-                f.write(contents)
+            self.failed += 1
+            logger.warning(f"Image processing failed, storing original: {timings.get('error')}")
+            filename = f"{content_hash}{file_extension}"
+            file_path = self.upload_dir / filename
+            os.replace(spool_path, file_path)
+
+        photo_url = f"/photos/{filename}"
+        async with AsyncSessionLocal() as session:
+            session.add(PhotoBlob(
+                content_hash=content_hash,
+                photo_url=photo_url,
+                size_bytes=file_path.stat().st_size,
+                last_uploaded_at=_utcnow()
+            ))
+            try:
+                await session.commit()
+            except IntegrityError:
+                # Another process stored the same content first; its file has the same name
+                await session.rollback()
+                existing = await session.scalar(
+                    select(PhotoBlob.photo_url).where(PhotoBlob.content_hash == content_hash)
+                )
+                photo_url = existing or photo_url
 
         # Return the relative URL path
-        return f"/photos/{unique_filename}"
+        return photo_url
+
+    @staticmethod
+    def derivative_name(filename: str, width: int, fmt: str) -> str:
+        return f"{filename}.w{width}.{fmt}"
+
+    def pick_width(self, requested: int) -> int:
+        """Smallest configured width that covers the requested one."""
+        for width in self.derivative_widths:
+            if width >= requested:
+                return width
+        return self.derivative_widths[-1]
+
+    def pick_format(self, accept: str) -> str:
+        """Best available format the client says it accepts; JPEG otherwise."""
+        for fmt in self.derivative_formats:
+            if DERIVATIVE_FORMATS[fmt][0] in accept:
+                return fmt
+        return "jpeg"
+
+    async def get_photo(self, filename: str, width: Optional[int] = None,
+                        accept: str = "") -> Tuple[Optional[Path], Optional[str]]:
+        """
+        Resolve a stored photo, or a resized/re-encoded variant of it, to a file.
+
+        Without a width the stored photo is returned as-is. With one, the
+        closest configured size is served in the best format the client
+        accepts, rendered in the image worker pool on first request and kept
+        in the derivative disk cache. If rendering is not possible right now
+        (pool saturated or failed), the stored photo is returned instead.
+
+        Args:
+            filename: Stored photo name (the last segment of its /photos URL)
+            width: Requested display width in pixels
+            accept: The request's Accept header
+
+        Returns:
+            (path, media type) - media type None means guess from the name;
+            (None, None) if the photo does not exist
+        """
+        original = self.upload_dir / filename
+        if not original.is_file():
+            return None, None
+        if not width:
+            return original, None
+
+        width = self.pick_width(width)
+        fmt = self.pick_format(accept)
+        if fmt == "jpeg" and width >= self.max_size[0]:
+            # The stored photo already is the largest JPEG
+            return original, None
+
+        name = self.derivative_name(filename, width, fmt)
+        media_type = DERIVATIVE_FORMATS[fmt][0]
+        path = self.derivative_cache.get(name)
+        if path is not None:
+            return path, media_type
+
+        # Single-flight: concurrent requests for the same variant share one render
+        rendering = self._rendering.get(name)
+        if rendering is None:
+            if self.pending >= self.workers + self.max_queue:
+                self.derivatives_fallback += 1
+                return original, None
+            rendering = asyncio.ensure_future(self._render(original, name, width, fmt))
+            self._rendering[name] = rendering
+            rendering.add_done_callback(lambda _: self._rendering.pop(name, None))
+        if await asyncio.shield(rendering):
+            return self.derivative_cache.path_for(name), media_type
+        self.derivatives_fallback += 1
+        return original, None
+
+    async def _render(self, original: Path, name: str, width: int, fmt: str) -> bool:
+        self.pending += 1
+        try:
+            result = await self._run_in_pool(
+                render_derivative, str(original), str(self.derivative_cache.path_for(name)), width, fmt
+            )
+        finally:
+            self.pending -= 1
+        if not result or not result["ok"]:
+            logger.warning(f"Could not render {name}: {result.get('error') if result else 'image worker pool broken'}")
+            return False
+        self._stage_ms["derivative"].append(result["render_ms"])
+        self.derivatives_rendered += 1
+        self.derivative_cache.add(name)
+        return True
+
+    async def encode_for_vision(self, source_path: str, short_side: int, long_side: int,
+                                quality: int) -> Dict[str, Any]:
+        """Run encode_vision_image in the worker pool (see there for the result)."""
+        return await self._run_in_pool(
+            encode_vision_image, source_path, short_side, long_side, quality
+        ) or {"ok": False, "error": "image worker pool broken"}
+
+    def _record(self, stage: str, started: float):
+        self._stage_ms[stage].append((time.perf_counter() - started) * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        """Image pipeline queue counters and recent per-stage timings."""
+        stages = {}
+        for stage, samples in self._stage_ms.items():
+            ordered = sorted(samples)
+            stages[stage] = {
+                "p50_ms": round(ordered[int(len(ordered) * 0.50)], 1) if ordered else 0.0,
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1) if ordered else 0.0,
+            }
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "duplicates": self.duplicates,
+            "swept": self.swept,
+            "stages": stages,
+            "derivatives": {
+                "formats": self.derivative_formats,
+                "widths": self.derivative_widths,
+                "rendered": self.derivatives_rendered,
+                "fallback_to_original": self.derivatives_fallback,
+                "cache": self.derivative_cache.stats(),
+            },
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
 
     def delete_photo(self, photo_url: str) -> bool:
         """
-        Delete a photo from storage.
+        Release a photo after the row referencing it has been deleted.
+
+        The file is only removed once no Plant, PlantPhoto or RoomPhoto row
+        references it any more (and it was not just uploaded again). Call this
+        after committing the delete. Photos released within the grace period
+        are removed later by sweep_unreferenced().
 
         Args:
             photo_url: The URL/path of the photo to delete
 
         Returns:
-            True if deleted successfully, False otherwise
+            True if the file was deleted, False if it is still in use or missing
         """
         try:
-            # Extract filename from URL
-            filename = photo_url.split('/')[-1]
-            file_path = self.upload_dir / filename
+            db = SessionLocal()
+            try:
+                blob_id = db.scalar(select(PhotoBlob.id).where(PhotoBlob.photo_url == photo_url))
+                if blob_id is not None and not self._delete_unreferenced(db, blob_id):
+                    return False
+            finally:
+                db.close()
 
-            if file_path.exists():
-                file_path.unlink()
-                return True
-            return False
+            return self._remove_file(photo_url)
         except Exception:
             return False
 
+    def sweep_unreferenced(self, limit: Optional[int] = None) -> int:
+        """
+        Remove photos that no row references and that were not uploaded recently.
+
+        Picks up what delete_photo() had to keep: photos deleted within
+        UNREFERENCED_GRACE of their upload, and uploads never saved on a row
+        (identifications that did not become a plant). Called by the scheduler.
+
+        Args:
+            limit: Most photos to remove (defaults to PHOTO_BLOB_SWEEP_BATCH)
+
+        Returns:
+            Number of photos removed
+        """
+        limit = settings.PHOTO_BLOB_SWEEP_BATCH if limit is None else limit
+        db = SessionLocal()
+        try:
+            candidates = db.execute(
+                select(PhotoBlob.id, PhotoBlob.photo_url).where(
+                    PhotoBlob.ref_count <= 0,
+                    PhotoBlob.last_uploaded_at < _utcnow() - UNREFERENCED_GRACE
+                ).order_by(PhotoBlob.last_uploaded_at).limit(limit)
+            ).all()
+
+            removed = 0
+            for blob_id, photo_url in candidates:
+                # Re-checked per row: the photo may have been referenced or uploaded again meanwhile
+                if self._delete_unreferenced(db, blob_id):
+                    self._remove_file(photo_url)
+                    removed += 1
+            self.swept += removed
+            return removed
+        finally:
+            db.close()
+
+    def _delete_unreferenced(self, db, blob_id: int) -> bool:
+        """Delete a blob row if nothing references it and its grace period is over."""
+        deleted = db.execute(
+            delete(PhotoBlob).where(
+                PhotoBlob.id == blob_id,
+                PhotoBlob.ref_count <= 0,
+                PhotoBlob.last_uploaded_at < _utcnow() - UNREFERENCED_GRACE
+            )
+        )
+        db.commit()
+        return bool(deleted.rowcount)
+
+    def _remove_file(self, photo_url: str) -> bool:
+        """Unlink a stored photo and its cached sizes/formats."""
+        # Extract filename from URL
+        filename = photo_url.split('/')[-1]
+        file_path = self.upload_dir / filename
+
+        if file_path.exists():
+            file_path.unlink()
+            self.derivative_cache.discard_prefix(f"{filename}.w")
+            return True
+        return False
+
 
 # Singleton instance
 photo_storage = PhotoStorageService()
+
+
+# Reference counting: keep PhotoBlob.ref_count in step with the rows that point at a blob.
+# These run inside the flush, on the same connection, so counts commit or roll back with the rows.
+
+def _adjust_ref_count(connection, photo_url: Optional[str], delta: int):
+    if photo_url:
+        connection.execute(
+            update(PhotoBlob.__table__)
+            .where(PhotoBlob.__table__.c.photo_url == photo_url)
+            .values(ref_count=PhotoBlob.__table__.c.ref_count + delta)
+        )
+
+
+def _reference_added(mapper, connection, target):
+    _adjust_ref_count(connection, target.photo_url, 1)
+
+
+def _reference_changed(mapper, connection, target):
+    history = inspect(target).attrs.photo_url.history
+    for photo_url in history.deleted or ():
+        _adjust_ref_count(connection, photo_url, -1)
+    for photo_url in history.added or ():
+        _adjust_ref_count(connection, photo_url, 1)
+
+
+def _reference_removed(mapper, connection, target):
+    _adjust_ref_count(connection, target.photo_url, -1)
+
+
+for _model in (Plant, PlantPhoto, RoomPhoto):
+    event.listen(_model, "after_insert", _reference_added)
+    event.listen(_model, "after_update", _reference_changed)
+    event.listen(_model, "after_delete", _reference_removed)
+
+
+@event.listens_for(Plant, "before_delete")
+def _release_plant_photos(mapper, connection, target):
+    """plant_photos rows go with the plant via ON DELETE CASCADE, which the ORM never sees."""
+    photos = PlantPhoto.__table__
+    for (photo_url,) in connection.execute(select(photos.c.photo_url).where(photos.c.plant_id == target.id)):
+        _adjust_ref_count(connection, photo_url, -1)
@@ -1,7 +1,9 @@
 """PlantNet API integration for plant identification."""
-import httpx
 from typing import Dict, List, Optional
+from starlette.concurrency import run_in_threadpool
 from app.config import settings
+from app.services.identification_cache import identification_cache
+from app.utils.http_client import http_clients
 from app.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -14,6 +16,7 @@ class PlantNetService:
         self.api_key = getattr(settings, 'PLANTNET_API_KEY', None)
         self.base_url = "https://my-api.plantnet.org/v2"
         self.project = "all"  # Can be "all", "weurope", "k-world-flora", etc.
+        self.api_calls = 0
 
     async def identify_plant(
         self,
@@ -23,6 +26,10 @@ class PlantNetService:
         """
         Identify plant from image.
 
+        Results are cached by perceptual hash of the image, so a retry with
+        the same or a nearly identical photo is answered without calling
+        PlantNet again.
+
         Args:
             image_path: Path to the plant image file
             organ: Plant organ type ("auto", "flower", "leaf", "fruit", "bark")
@@ -43,77 +50,85 @@ class PlantNetService:
             # Return mock data for testing without API key
             return self._get_mock_identification(image_path)
 
+        image_hash, cached = await run_in_threadpool(identification_cache.lookup, image_path, organ)
+        if cached is not None:
+            logger.info(f"PlantNet result for {image_path} served from the identification cache")
+            return cached
+
         try:
+            self.api_calls += 1
             logger.info(f"Calling PlantNet API with image: {image_path}, organ: {organ}")
-            async with httpx.AsyncClient() as client:
-                # Prepare the request
-                url = f"{self.base_url}/identify/{self.project}"
-                params = {
-                    'api-key': self.api_key,
-                }
+            client = http_clients.get(self.base_url)
+            # Prepare the request
+            url = f"{self.base_url}/identify/{self.project}"
+            params = {
+                'api-key': self.api_key,
+            }
 
-                # Open and send the image file
-                with open(image_path, 'rb') as image_file:
-                    files = {'images': image_file}
-
-                    # Add organ parameter if specified
-                    if organ != "auto":
-                        files['organs'] = organ
-
-                    response = await client.post(
-                        url,
-                        params=params,
-                        files=files,
-                        timeout=30.0
-                    )
-                    response.raise_for_status()
-
-                data = response.json()
-                logger.info(f"PlantNet API response status: {response.status_code}")
-                logger.debug(f"PlantNet API response data: {data}")
-
-                # Parse the response
-                if 'results' in data and len(data['results']) > 0:
-                    # Get the top result
-                    top_result = data['results'][0]
-                    species_data = top_result.get('species', {})
-
-                    # Extract common names
-                    common_names = species_data.get('commonNames', [])
-                    common_name = common_names[0] if common_names else None
-
-                    # Build all results list
-                    all_results = []
-                    for result in data['results'][:5]:  # Top 5 results
-                        sp = result.get('species', {})
-                        sp_common_names = sp.get('commonNames', [])
-                        all_results.append({
-                            'species': sp.get('scientificNameWithoutAuthor', 'Unknown'),
-                            'common_name': sp_common_names[0] if sp_common_names else None,
-                            'confidence': result.get('score', 0.0),
-                            'family': sp.get('family', {}).get('scientificNameWithoutAuthor'),
-                            'genus': sp.get('genus', {}).get('scientificNameWithoutAuthor')
-                        })
-
-                    return {
-                        'species': species_data.get('scientificNameWithoutAuthor', 'Unknown'),
-                        'common_name': common_name,
-                        'confidence': top_result.get('score', 0.0),
-                        'family': species_data.get('family', {}).get('scientificNameWithoutAuthor'),
-                        'genus': species_data.get('genus', {}).get('scientificNameWithoutAuthor'),
-                        'all_results': all_results
-                    }
-                else:
-                    # No results found
-                    return {
-                        'species': None,
-                        'common_name': None,
-                        'confidence': 0.0,
-                        'family': None,
-                        'genus': None,
-                        'all_results': [],
-                        'error': 'No identification results found'
-                    }
+            # Open and send the image file
+            with open(image_path, 'rb') as image_file:
+                files = {'images': image_file}
+
+                # Add organ parameter if specified
+                if organ != "auto":
+                    files['organs'] = organ
+
+                response = await client.post(
+                    url,
+                    params=params,
+                    files=files
+                )
+                response.raise_for_status()
+
+            data = response.json()
+            logger.info(f"PlantNet API response status: {response.status_code}")
+            logger.debug(f"PlantNet API response data: {data}")
+
+            # Parse the response
+            if 'results' in data and len(data['results']) > 0:
+                # Get the top result
+                top_result = data['results'][0]
+                species_data = top_result.get('species', {})
+
+                # Extract common names
+                common_names = species_data.get('commonNames', [])
+                common_name = common_names[0] if common_names else None
+
+                # Build all results list
+                all_results = []
+                for result in data['results'][:5]:  # Top 5 results
+                    sp = result.get('species', {})
+                    sp_common_names = sp.get('commonNames', [])
+                    all_results.append({
+                        'species': sp.get('scientificNameWithoutAuthor', 'Unknown'),
+                        'common_name': sp_common_names[0] if sp_common_names else None,
+                        'confidence': result.get('score', 0.0),
+                        'family': sp.get('family', {}).get('scientificNameWithoutAuthor'),
+                        'genus': sp.get('genus', {}).get('scientificNameWithoutAuthor')
+                    })
+
+                result = {
+                    'species': species_data.get('scientificNameWithoutAuthor', 'Unknown'),
+                    'common_name': common_name,
+                    'confidence': top_result.get('score', 0.0),
+                    'family': species_data.get('family', {}).get('scientificNameWithoutAuthor'),
+                    'genus': species_data.get('genus', {}).get('scientificNameWithoutAuthor'),
+                    'all_results': all_results
+                }
+                if image_hash is not None:
+                    await run_in_threadpool(identification_cache.store, image_hash, organ, result)
+                return result
+            else:
+                # No results found
+                return {
+                    'species': None,
+                    'common_name': None,
+                    'confidence': 0.0,
+                    'family': None,
+                    'genus': None,
+                    'all_results': [],
+                    'error': 'No identification results found'
+                }
 
         except FileNotFoundError:
             return {
@@ -203,5 +218,12 @@ class PlantNetService:
         return result
 
 
+    def stats(self) -> Dict:
+        return {
+            "api_calls": self.api_calls,
+            "cache": identification_cache.stats(),
+        }
+
+
 # Singleton instance
 plantnet = PlantNetService()
@@ -0,0 +1,274 @@
+"""
+Concurrent push notification fan-out.
+
+A dispatch takes a list of push jobs (one per user message) and:
+
+1. coalesces several jobs for the same user into one summary push
+2. loads every recipient's active device tokens in one query
+3. groups tokens that receive an identical payload into FCM multicast
+   requests of up to PUSH_MULTICAST_SIZE tokens
+4. feeds those requests through an in-memory queue to a bounded pool of
+   PUSH_CONCURRENCY workers
+5. applies token results in bulk at the end (last_used_at for delivered
+   tokens, deactivation for NotRegistered/InvalidRegistration)
+
+Results are written back onto the PushJob objects the caller passed in.
+"""
+import asyncio
+import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.notification import NotificationToken, Platform
+from app.services.push_notification_service import (
+    INVALID_TOKEN_ERRORS,
+    MULTICAST_LIMIT,
+    push_notification_service,
+)
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Recipients per token lookup query
+USER_CHUNK_SIZE = 500
+
+# Reminder titles listed in a coalesced push body
+COALESCE_PREVIEW = 3
+
+
+@dataclass
+class PushJob:
+    """One push message for one user, plus its delivery outcome."""
+    user_id: int
+    title: str
+    body: str
+    data: Optional[Dict[str, Any]] = None
+    priority: str = "normal"
+    reminder_ids: List[int] = field(default_factory=list)
+
+    # Filled in by dispatch()
+    tokens: int = 0
+    sent: int = 0
+    failed: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+@dataclass
+class PushDispatchReport:
+    """Counters for one dispatch (or the running total across dispatches)."""
+    jobs: int = 0
+    pushes: int = 0
+    requests: int = 0
+    tokens: int = 0
+    sent: int = 0
+    failed: int = 0
+    invalid_tokens: int = 0
+    elapsed_ms: float = 0.0
+
+    def merge(self, other: "PushDispatchReport"):
+        self.jobs += other.jobs
+        self.pushes += other.pushes
+        self.requests += other.requests
+        self.tokens += other.tokens
+        self.sent += other.sent
+        self.failed += other.failed
+        self.invalid_tokens += other.invalid_tokens
+        self.elapsed_ms += other.elapsed_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "jobs": self.jobs,
+            "pushes": self.pushes,
+            "requests": self.requests,
+            "tokens": self.tokens,
+            "sent": self.sent,
+            "failed": self.failed,
+            "invalid_tokens": self.invalid_tokens,
+            "elapsed_ms": round(self.elapsed_ms, 1),
+        }
+
+
+def coalesce_jobs(jobs: List[PushJob]) -> List[Tuple[PushJob, List[PushJob]]]:
+    """
+    Merge jobs for the same user into a single summary push.
+
+    Returns:
+        (push to send, original jobs it covers) pairs
+    """
+    by_user: Dict[int, List[PushJob]] = defaultdict(list)
+    for job in jobs:
+        by_user[job.user_id].append(job)
+
+    pushes = []
+    for user_id, group in by_user.items():
+        if len(group) == 1:
+            pushes.append((group[0], group))
+            continue
+
+        preview = [job.title for job in group[:COALESCE_PREVIEW]]
+        if len(group) > COALESCE_PREVIEW:
+            preview.append(f"and {len(group) - COALESCE_PREVIEW} more")
+
+        plant_ids = [str(job.data["plant_id"]) for job in group if job.data and "plant_id" in job.data]
+        summary = PushJob(
+            user_id=user_id,
+            title=f"{len(group)} plant care reminders",
+            body="\n".join(preview),
+            data={
+                "reminder_count": len(group),
+                "plant_ids": ",".join(plant_ids),
+                "deep_link": "/plants"
+            },
+            priority="high" if any(job.priority == "high" for job in group) else "normal",
+            reminder_ids=[reminder_id for job in group for reminder_id in job.reminder_ids],
+        )
+        pushes.append((summary, group))
+    return pushes
+
+
+class PushDispatcher:
+    """Fans push jobs out to FCM with multicast batching and bounded concurrency."""
+
+    def __init__(self):
+        self.concurrency = max(1, settings.PUSH_CONCURRENCY)
+        self.multicast_size = max(1, min(settings.PUSH_MULTICAST_SIZE, MULTICAST_LIMIT))
+        self.totals = PushDispatchReport()
+
+    def _load_tokens(self, db: Session, user_ids: List[int]) -> Dict[int, List[Any]]:
+        """Active device tokens (id, user_id, platform, token rows) for all recipients, keyed by user."""
+        tokens: Dict[int, List[Any]] = defaultdict(list)
+        for start in range(0, len(user_ids), USER_CHUNK_SIZE):
+            rows = db.query(
+                NotificationToken.id, NotificationToken.user_id,
+                NotificationToken.platform, NotificationToken.token
+            ).filter(
+                NotificationToken.user_id.in_(user_ids[start:start + USER_CHUNK_SIZE]),
+                NotificationToken.active == True
+            ).all()
+            for row in rows:
+                tokens[row.user_id].append(row)
+        return tokens
+
+    def _build_requests(self, pushes: List[PushJob], tokens: Dict[int, List[Any]]) -> List[Tuple[Dict[str, Any], List[Tuple[int, str, PushJob]]]]:
+        """Group (token, push) targets by identical payload and split into multicast requests."""
+        batches: Dict[str, Tuple[Dict[str, Any], List[Tuple[int, str, PushJob]]]] = {}
+        for push in pushes:
+            payloads = {}
+            for token in tokens.get(push.user_id, []):
+                platform = Platform(token.platform)
+                if platform not in payloads:
+                    payload = push_notification_service.build_payload(
+                        push.title, push.body, push.data, platform, push.priority
+                    )
+                    payloads[platform] = (json.dumps(payload, sort_keys=True), payload)
+                key, payload = payloads[platform]
+                batches.setdefault(key, (payload, []))[1].append((token.id, token.token, push))
+                push.tokens += 1
+
+        requests = []
+        for payload, targets in batches.values():
+            for start in range(0, len(targets), self.multicast_size):
+                requests.append((payload, targets[start:start + self.multicast_size]))
+        return requests
+
+    async def _worker(self, queue: asyncio.Queue, delivered: List[int], invalid: List[int]):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+
+            payload, targets = item
+            try:
+                errors = await push_notification_service.send_multicast(
+                    [token for _, token, _ in targets], payload
+                )
+            except Exception as e:
+                logger.error(f"Exception sending FCM notification: {e}")
+                errors = [str(e)] * len(targets)
+
+            for (token_id, _, push), error in zip(targets, errors):
+                if error is None:
+                    push.sent += 1
+                    delivered.append(token_id)
+                    continue
+                push.failed += 1
+                if error not in push.errors:
+                    push.errors.append(error)
+                if error in INVALID_TOKEN_ERRORS:
+                    invalid.append(token_id)
+
+    async def dispatch(self, db: Session, jobs: List[PushJob], coalesce: bool = True) -> PushDispatchReport:
+        """
+        Send a batch of push jobs.
+
+        Args:
+            db: Database session
+            jobs: Jobs to send; delivery results are written onto them
+            coalesce: Merge jobs for the same user into one push
+
+        Returns:
+            PushDispatchReport for this dispatch
+        """
+        started = time.perf_counter()
+        report = PushDispatchReport(jobs=len(jobs))
+        if not jobs:
+            return report
+
+        pushes = coalesce_jobs(jobs) if coalesce else [(job, [job]) for job in jobs]
+        report.pushes = len(pushes)
+
+        tokens = self._load_tokens(db, list({push.user_id for push, _ in pushes}))
+        requests = self._build_requests([push for push, _ in pushes], tokens)
+        report.requests = len(requests)
+
+        if not settings.FCM_SERVER_KEY and requests:
+            logger.warning("FCM_SERVER_KEY not configured, skipping push notifications")
+
+        delivered: List[int] = []
+        invalid: List[int] = []
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        workers = [
+            asyncio.create_task(self._worker(queue, delivered, invalid))
+            for _ in range(min(self.concurrency, len(requests)))
+        ]
+        for request in requests:
+            await queue.put(request)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+
+        if delivered or invalid:
+            push_notification_service.update_token_states(db, delivered, invalid)
+
+        # Copy coalesced results back onto the jobs the caller holds
+        for push, group in pushes:
+            report.tokens += push.tokens
+            report.sent += push.sent
+            report.failed += push.failed
+            for job in group:
+                if job is not push:
+                    job.tokens, job.sent, job.failed, job.errors = push.tokens, push.sent, push.failed, list(push.errors)
+        report.invalid_tokens = len(invalid)
+        report.elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self.totals.merge(report)
+        if len(jobs) > 1:
+            logger.info(f"Push dispatch complete: {report.to_dict()}")
+        return report
+
+    def stats(self) -> Dict[str, Any]:
+        """Running totals across all dispatches in this process."""
+        return {
+            "concurrency": self.concurrency,
+            "multicast_size": self.multicast_size,
+            **self.totals.to_dict(),
+        }
+
+
+# Singleton instance
+push_dispatcher = PushDispatcher()
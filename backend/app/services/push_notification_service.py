@@ -1,14 +1,20 @@
 """Push notification service using Firebase Cloud Messaging."""
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
-import httpx
 from app.models.notification import NotificationToken, Platform
 from app.config import settings
+from app.utils.http_client import http_clients
 
 logger = logging.getLogger(__name__)
 
+# Legacy FCM accepts at most 1000 registration_ids per request
+MULTICAST_LIMIT = 1000
+
+# FCM error codes meaning the token will never work again
+INVALID_TOKEN_ERRORS = {"NotRegistered", "InvalidRegistration"}
+
 
 class PushNotificationService:
     """Service for sending push notifications via Firebase Cloud Messaging."""
@@ -16,7 +22,7 @@ class PushNotificationService:
     def __init__(self):
         # Using legacy FCM API for simplicity
         # For production, consider using Firebase Admin SDK with service account
-        self.legacy_fcm_url = "https://fcm.googleapis.com/fcm/send"
+        self.legacy_fcm_url = settings.FCM_SEND_URL
 
     async def send_push_notification(
         self,
@@ -41,69 +47,32 @@ class PushNotificationService:
         Returns:
             Dictionary with send results
         """
-        # Get all active tokens for user
-        tokens = db.query(NotificationToken).filter(
-            NotificationToken.user_id == user_id,
-            NotificationToken.active == True
-        ).all()
+        # Imported here to avoid a circular import (push_dispatch uses this service)
+        from app.services.push_dispatch import PushJob, push_dispatcher
+
+        job = PushJob(user_id=user_id, title=title, body=body, data=data, priority=priority)
+        await push_dispatcher.dispatch(db, [job], coalesce=False)
 
-        if not tokens:
+        if not job.tokens:
             logger.warning(f"No active tokens found for user {user_id}")
             return {"success": False, "error": "No active devices"}
 
-        results = {
-            "success": 0,
-            "failed": 0,
-            "errors": []
+        return {
+            "success": job.sent,
+            "failed": job.failed,
+            "errors": job.errors
         }
 
-        for token_obj in tokens:
-            try:
-                success = await self._send_to_token(
-                    token=token_obj.token,
-                    title=title,
-                    body=body,
-                    data=data,
-                    platform=Platform(token_obj.platform),
-                    priority=priority
-                )
-
-                if success:
-                    results["success"] += 1
-                    # Update last_used_at
-                    token_obj.last_used_at = func.now()
-                else:
-                    results["failed"] += 1
-
-            except Exception as e:
-                logger.error(f"Error sending push to token {token_obj.id}: {e}")
-                results["failed"] += 1
-                results["errors"].append(str(e))
-                # Deactivate token if it's invalid
-                if "invalid" in str(e).lower() or "not registered" in str(e).lower():
-                    token_obj.active = False
-
-        db.commit()
-        return results
-
-    async def _send_to_token(
+    def build_payload(
         self,
-        token: str,
         title: str,
         body: str,
         data: Optional[Dict[str, Any]],
         platform: Platform,
         priority: str
-    ) -> bool:
-        """Send notification to a single FCM token."""
-
-        if not settings.FCM_SERVER_KEY:
-            logger.warning("FCM_SERVER_KEY not configured, skipping push notification")
-            return False
-
-        # Build FCM payload
+    ) -> Dict[str, Any]:
+        """Build the FCM payload (without recipients) for one platform."""
         payload = {
-            "to": token,
             "priority": priority,
             "notification": {
                 "title": title,
@@ -136,33 +105,64 @@ class PushNotificationService:
         if data:
             payload["data"] = {k: str(v) for k, v in data.items()}
 
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.legacy_fcm_url,
-                    json=payload,
-                    headers={
-                        "Authorization": f"key={settings.FCM_SERVER_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    timeout=10.0
-                )
-
-                if response.status_code == 200:
-                    result = response.json()
-                    if result.get("success", 0) > 0:
-                        logger.info(f"Successfully sent push notification via FCM")
-                        return True
-                    else:
-                        logger.error(f"FCM send failed: {result}")
-                        return False
-                else:
-                    logger.error(f"FCM request failed: {response.status_code} - {response.text}")
-                    return False
-
-        except Exception as e:
-            logger.error(f"Exception sending FCM notification: {e}")
-            raise
+        return payload
+
+    async def send_multicast(self, tokens: List[str], payload: Dict[str, Any]) -> List[Optional[str]]:
+        """
+        Send one payload to up to MULTICAST_LIMIT tokens in a single FCM request.
+
+        Args:
+            tokens: Device tokens (all sharing the payload's platform)
+            payload: Payload from build_payload()
+
+        Returns:
+            Per-token error code, in token order (None when delivered)
+        """
+        if not settings.FCM_SERVER_KEY:
+            return ["FCM_SERVER_KEY not configured"] * len(tokens)
+
+        body = dict(payload)
+        if len(tokens) == 1:
+            body["to"] = tokens[0]
+        else:
+            body["registration_ids"] = tokens
+
+        client = http_clients.get(self.legacy_fcm_url)
+        response = await client.post(
+            self.legacy_fcm_url,
+            json=body,
+            headers={
+                "Authorization": f"key={settings.FCM_SERVER_KEY}",
+                "Content-Type": "application/json"
+            }
+        )
+
+        if response.status_code != 200:
+            logger.error(f"FCM request failed: {response.status_code} - {response.text}")
+            return [f"HTTP {response.status_code}"] * len(tokens)
+
+        results = response.json().get("results") or []
+        if len(results) != len(tokens):
+            logger.error(f"FCM returned {len(results)} results for {len(tokens)} tokens")
+            return ["Malformed FCM response"] * len(tokens)
+
+        return [result.get("error") if "message_id" not in result else None for result in results]
+
+    def update_token_states(self, db: Session, delivered_ids: List[int], invalid_ids: List[int]):
+        """Bulk-update last_used_at for delivered tokens and deactivate invalid ones."""
+        for start in range(0, len(delivered_ids), 500):
+            db.query(NotificationToken).filter(
+                NotificationToken.id.in_(delivered_ids[start:start + 500])
+            ).update({NotificationToken.last_used_at: func.now()}, synchronize_session=False)
+
+        for start in range(0, len(invalid_ids), 500):
+            db.query(NotificationToken).filter(
+                NotificationToken.id.in_(invalid_ids[start:start + 500])
+            ).update({NotificationToken.active: False}, synchronize_session=False)
+
+        if invalid_ids:
+            logger.info(f"Deactivated {len(invalid_ids)} invalid device token(s)")
+        db.commit()
 
     def register_device_token(
         self,
@@ -0,0 +1,222 @@
+"""
+Sharded, resumable reminder dispatch.
+
+Every uvicorn worker runs the daily reminder job. In sharded mode the due
+schedules are split into REMINDER_SHARD_COUNT shards by user_id
+(user_id % shard_count), and each worker claims shards from the
+reminder_sweep_shards table with SELECT ... FOR UPDATE SKIP LOCKED. A claim
+is a time-limited lease that is renewed at every checkpoint, and every third
+of the lease while a batch is being delivered, so a shard held by a crashed
+worker becomes claimable again once its lease expires but a slow batch keeps
+it.
+
+Progress is checkpointed as the last fully processed user_id. Reminders are
+committed before the checkpoint moves, and the sweep's dedupe window skips
+plants reminded in the last two days, so a resumed shard never re-sends.
+"""
+import asyncio
+import os
+import socket
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, List, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.reminder import ReminderSweepShard
+from app.services.reminder_sweep import CHUNK_SIZE, SweepReport, reminder_sweep
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _user_batches(rows: List[Any], size: int = CHUNK_SIZE):
+    """Split scan rows (ordered by user_id) into batches that never split a user."""
+    batch = []
+    for row in rows:
+        if len(batch) >= size and row.user_id != batch[-1].user_id:
+            yield batch
+            batch = []
+        batch.append(row)
+    if batch:
+        yield batch
+
+
+class ReminderDispatcher:
+    """Claims reminder sweep shards and runs them with checkpointing."""
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.shard_count = settings.REMINDER_SHARD_COUNT
+        self.lease = timedelta(seconds=settings.REMINDER_SHARD_LEASE_SECONDS)
+
+    def ensure_shards(self, db: Session, run_date: date):
+        """Create the shard rows for a run if no worker has done so yet."""
+        existing = {
+            shard for (shard,) in db.query(ReminderSweepShard.shard).filter(
+                ReminderSweepShard.run_date == run_date
+            )
+        }
+        missing = [shard for shard in range(self.shard_count) if shard not in existing]
+        if not missing:
+            return
+
+        db.add_all([
+            ReminderSweepShard(run_date=run_date, shard=shard, shard_count=self.shard_count)
+            for shard in missing
+        ])
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another worker created them first
+            db.rollback()
+
+    def claim(self, db: Session, run_date: date) -> Optional[ReminderSweepShard]:
+        """Take the lease on the next pending or abandoned shard, if any."""
+        now = _utcnow()
+        shard = db.query(ReminderSweepShard).filter(
+            ReminderSweepShard.run_date == run_date,
+            ReminderSweepShard.status != "completed",
+            or_(
+                ReminderSweepShard.status == "pending",
+                ReminderSweepShard.lease_expires_at < now
+            )
+        ).order_by(ReminderSweepShard.shard).with_for_update(skip_locked=True).first()
+
+        if not shard:
+            db.rollback()
+            return None
+
+        if shard.status == "running":
+            logger.warning(
+                f"Taking over reminder shard {shard.shard} from {shard.owner} "
+                f"(lease expired, resuming after user {shard.last_user_id})"
+            )
+
+        shard.status = "running"
+        shard.owner = self.worker_id
+        shard.lease_expires_at = now + self.lease
+        shard.attempts += 1
+        db.commit()
+        return shard
+
+    def checkpoint(self, db: Session, shard_id: int, last_user_id: int, created: int, completed: bool = False) -> bool:
+        """
+        Record progress and renew the lease.
+
+        Returns:
+            False if the lease was lost to another worker
+        """
+        values = {
+            ReminderSweepShard.last_user_id: last_user_id,
+            ReminderSweepShard.reminders_created: ReminderSweepShard.reminders_created + created,
+            ReminderSweepShard.lease_expires_at: _utcnow() + self.lease,
+        }
+        if completed:
+            values[ReminderSweepShard.status] = "completed"
+
+        updated = db.query(ReminderSweepShard).filter(
+            ReminderSweepShard.id == shard_id,
+            ReminderSweepShard.owner == self.worker_id
+        ).update(values, synchronize_session=False)
+        db.commit()
+        return updated == 1
+
+    def renew(self, shard_id: int) -> bool:
+        """Extend the lease on a shard this worker holds, in a session of its own. False if it was lost."""
+        db = SessionLocal()
+        try:
+            updated = db.query(ReminderSweepShard).filter(
+                ReminderSweepShard.id == shard_id,
+                ReminderSweepShard.owner == self.worker_id
+            ).update({ReminderSweepShard.lease_expires_at: _utcnow() + self.lease}, synchronize_session=False)
+            db.commit()
+            return updated == 1
+        finally:
+            db.close()
+
+    async def _keep_lease(self, shard_id: int, number: int):
+        """Renew the lease every third of its length until cancelled, so slow deliveries don't lose the shard."""
+        interval = self.lease.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await run_in_threadpool(self.renew, shard_id):
+                    # The checkpoint after this batch notices and stops the shard
+                    logger.warning(f"Lost lease on reminder shard {number} during delivery")
+                    return
+            except Exception as e:
+                logger.warning(f"Could not renew lease on reminder shard {number}: {e}")
+
+    async def run_shard(self, db: Session, shard: ReminderSweepShard, report: SweepReport) -> bool:
+        """Sweep one claimed shard from its checkpoint. Returns True when completed."""
+        shard_id = shard.id
+        number, count, last_user_id = shard.shard, shard.shard_count, shard.last_user_id
+        today = date.today()
+        now = datetime.now()
+
+        started = time.perf_counter()
+        rows = reminder_sweep.scan(
+            db, today, now,
+            where=lambda due: and_(due.c.user_id % count == number, due.c.user_id > last_user_id)
+        )
+        report.rows_scanned += len(rows)
+        report.add_phase("scan", started)
+
+        for batch in _user_batches(rows):
+            batch_report = SweepReport()
+            heartbeat = asyncio.ensure_future(self._keep_lease(shard_id, number))
+            try:
+                await reminder_sweep.process(db, batch, batch_report, today, now)
+            finally:
+                heartbeat.cancel()
+            report.merge(batch_report)
+            last_user_id = batch[-1].user_id
+
+            if not self.checkpoint(db, shard_id, last_user_id, batch_report.reminders_created):
+                logger.warning(f"Lost lease on reminder shard {number}, stopping")
+                return False
+
+        if not self.checkpoint(db, shard_id, last_user_id, 0, completed=True):
+            logger.warning(f"Lost lease on reminder shard {number} before completion")
+            return False
+        return True
+
+    async def run_worker(self, db: Session, create_shards: bool = True) -> SweepReport:
+        """
+        Claim and run shards of today's sweep until none are left to claim.
+
+        Args:
+            db: Database session
+            create_shards: Create today's shard rows if missing. Reclaim passes
+                use False so they only pick up abandoned shards of a started run.
+        """
+        run_date = date.today()
+        if create_shards:
+            self.ensure_shards(db, run_date)
+
+        report = SweepReport()
+        shards_completed = 0
+        while True:
+            shard = self.claim(db, run_date)
+            if shard is None:
+                break
+            if await self.run_shard(db, shard, report):
+                shards_completed += 1
+
+        if shards_completed:
+            logger.info(f"Worker {self.worker_id} completed {shards_completed} reminder shard(s): {report.to_dict()}")
+        return report
+
+
+# Singleton instance
+reminder_dispatcher = ReminderDispatcher()
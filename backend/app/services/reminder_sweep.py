@@ -0,0 +1,357 @@
+"""
+Set-based reminder sweep engine.
+
+Replaces the per-schedule loop that used to live in
+NotificationService.check_and_send_reminders. A sweep runs in three phases:
+
+1. scan    - one joined query finds every due (plant, reminder type) pair that
+             has not been reminded within the dedupe window, together with the
+             owner's notification preferences
+2. insert  - Reminder and Notification rows are bulk-inserted in chunks
+3. deliver - WebSocket and push delivery happen after the rows are committed
+             (pushes go through the concurrent push dispatcher), and delivery
+             results are written back in bulk
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import exists, insert, literal, select, union_all, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.feeding import FeedingSchedule
+from app.models.notification import (
+    Notification,
+    NotificationPreferences,
+    NotificationPriority,
+    NotificationType,
+)
+from app.models.plant import Plant
+from app.models.reminder import Reminder, ReminderType
+from app.models.user import User
+from app.models.watering import WateringSchedule
+from app.services.notification_service import is_quiet_hours
+from app.services.push_dispatch import PushJob, push_dispatcher
+from app.services.websocket_manager import websocket_manager
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Reminders already sent within this window suppress a new one
+DEDUPE_WINDOW = timedelta(days=2)
+
+# Rows per bulk INSERT/UPDATE statement
+CHUNK_SIZE = 500
+
+
+@dataclass
+class SweepReport:
+    """Counters and per-phase wall time for a single reminder sweep."""
+    rows_scanned: int = 0
+    reminders_created: int = 0
+    notifications_created: int = 0
+    pushes_attempted: int = 0
+    pushes_sent: int = 0
+    phase_ms: Dict[str, float] = field(default_factory=dict)
+
+    def add_phase(self, name: str, started: float):
+        """Add wall time since a perf_counter() start to a phase."""
+        self.phase_ms[name] = self.phase_ms.get(name, 0.0) + (time.perf_counter() - started) * 1000
+
+    def merge(self, other: "SweepReport"):
+        """Fold another report's counters and timings into this one."""
+        self.rows_scanned += other.rows_scanned
+        self.reminders_created += other.reminders_created
+        self.notifications_created += other.notifications_created
+        self.pushes_attempted += other.pushes_attempted
+        self.pushes_sent += other.pushes_sent
+        for name, ms in other.phase_ms.items():
+            self.phase_ms[name] = self.phase_ms.get(name, 0.0) + ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows_scanned": self.rows_scanned,
+            "reminders_created": self.reminders_created,
+            "notifications_created": self.notifications_created,
+            "pushes_attempted": self.pushes_attempted,
+            "pushes_sent": self.pushes_sent,
+            "phase_ms": {name: round(ms, 1) for name, ms in self.phase_ms.items()},
+        }
+
+
+def build_reminder_content(
+    reminder_type: ReminderType,
+    plant_name: str,
+    due_date: date,
+    today: Optional[date] = None
+) -> Dict[str, Any]:
+    """Build the title, message and priority for a watering/feeding reminder."""
+    days_overdue = ((today or date.today()) - due_date).days
+    noun, verb = ("watering", "Water") if reminder_type == ReminderType.WATERING else ("feeding", "Feed")
+
+    if days_overdue > 0:
+        title = f"Overdue: {plant_name} needs {noun}!"
+        message = f"Your plant '{plant_name}' was due for {noun} {days_overdue} day(s) ago."
+        priority = NotificationPriority.HIGH
+    elif days_overdue == 0:
+        title = f"Reminder: {verb} {plant_name} today"
+        message = f"Your plant '{plant_name}' needs {noun} today!"
+        priority = NotificationPriority.NORMAL
+    else:
+        title = f"Upcoming: {plant_name} needs {noun} tomorrow"
+        message = f"Your plant '{plant_name}' will need {noun} tomorrow."
+        priority = NotificationPriority.NORMAL
+
+    return {"title": title, "message": message, "priority": priority}
+
+
+def _chunks(items: List[Any], size: int = CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class ReminderSweepService:
+    """Finds due care tasks in bulk and creates/delivers their reminders."""
+
+    def __init__(self):
+        self.websocket_manager = websocket_manager
+
+    def _due_query(self, reminder_type: ReminderType, schedule_model, due_column, horizon: date, cutoff: datetime):
+        """Select due (plant, type) pairs with no reminder sent inside the dedupe window."""
+        already_reminded = exists().where(
+            Reminder.plant_id == Plant.id,
+            Reminder.reminder_type == reminder_type,
+            Reminder.sent == True,
+            Reminder.sent_at >= cutoff
+        )
+
+        return select(
+            Plant.id.label("plant_id"),
+            Plant.name.label("plant_name"),
+            Plant.user_id.label("user_id"),
+            due_column.label("due_date"),
+            literal(reminder_type.value).label("reminder_type"),
+        ).select_from(Plant).join(
+            schedule_model, schedule_model.plant_id == Plant.id
+        ).join(
+            User, User.id == Plant.user_id
+        ).where(
+            due_column.isnot(None),
+            due_column <= horizon,
+            ~already_reminded
+        )
+
+    def scan(self, db: Session, today: date, now: datetime, where=None) -> List[Any]:
+        """
+        Run the single joined scan query.
+
+        Args:
+            db: Database session
+            today: Reference date; schedules due up to tomorrow are included
+            now: Reference time for the dedupe window
+            where: Optional extra predicate on the due rows (e.g. a user shard)
+
+        Returns:
+            Rows of (plant, type, due date, owner preferences)
+        """
+        horizon = today + timedelta(days=1)
+        cutoff = now - DEDUPE_WINDOW
+
+        due = union_all(
+            self._due_query(ReminderType.WATERING, WateringSchedule, WateringSchedule.next_watering, horizon, cutoff),
+            self._due_query(ReminderType.FEEDING, FeedingSchedule, FeedingSchedule.next_feeding, horizon, cutoff),
+        ).subquery("due")
+
+        stmt = select(
+            due,
+            NotificationPreferences.in_app_enabled,
+            NotificationPreferences.push_enabled,
+            NotificationPreferences.watering_reminders,
+            NotificationPreferences.feeding_reminders,
+            NotificationPreferences.quiet_hours_start,
+            NotificationPreferences.quiet_hours_end,
+        ).outerjoin(
+            NotificationPreferences, NotificationPreferences.user_id == due.c.user_id
+        )
+        if where is not None:
+            stmt = stmt.where(where(due))
+        stmt = stmt.order_by(due.c.user_id, due.c.plant_id)
+
+        return db.execute(stmt).all()
+
+    def _plan(self, row, today: date, now: datetime) -> Dict[str, Any]:
+        """Turn a scan row into the reminder to create and the channels to use."""
+        reminder_type = ReminderType(row.reminder_type)
+        notification_type = NotificationType.WATERING if reminder_type == ReminderType.WATERING else NotificationType.FEEDING
+        content = build_reminder_content(reminder_type, row.plant_name, row.due_date, today)
+
+        # Missing preferences rows fall back to the model defaults
+        type_enabled = row.watering_reminders if reminder_type == ReminderType.WATERING else row.feeding_reminders
+        deliver = type_enabled is not False and not is_quiet_hours(
+            row.quiet_hours_start, row.quiet_hours_end, now.time()
+        )
+
+        return {
+            "user_id": row.user_id,
+            "plant_id": row.plant_id,
+            "reminder_type": reminder_type,
+            "notification_type": notification_type,
+            "due_date": row.due_date,
+            "in_app": deliver and row.in_app_enabled is not False,
+            "push": deliver and row.push_enabled is not False,
+            "data": {
+                "plant_id": row.plant_id,
+                "plant_name": row.plant_name,
+                "reminder_type": reminder_type.value,
+                "due_date": row.due_date.isoformat(),
+                "deep_link": f"/plants/{row.plant_id}"
+            },
+            **content,
+        }
+
+    def _insert_chunk(self, db: Session, plans: List[Dict[str, Any]], now: datetime) -> int:
+        """Bulk-insert Notification and Reminder rows for one chunk of plans."""
+        in_app = [plan for plan in plans if plan["in_app"]]
+        if in_app:
+            created = db.execute(
+                insert(Notification).returning(
+                    Notification.id, Notification.created_at, sort_by_parameter_order=True
+                ),
+                [
+                    {
+                        "user_id": plan["user_id"],
+                        "plant_id": plan["plant_id"],
+                        "notification_type": plan["notification_type"].value,
+                        "title": plan["title"],
+                        "message": plan["message"],
+                        "priority": plan["priority"].value,
+                        "data": plan["data"],
+                        "read": False,
+                    }
+                    for plan in in_app
+                ]
+            ).all()
+            for plan, row in zip(in_app, created):
+                plan["notification_id"] = row.id
+                plan["created_at"] = row.created_at
+
+        reminder_ids = db.execute(
+            insert(Reminder).returning(Reminder.id, sort_by_parameter_order=True),
+            [
+                {
+                    "user_id": plan["user_id"],
+                    "plant_id": plan["plant_id"],
+                    "reminder_type": plan["reminder_type"],
+                    "scheduled_for": datetime.combine(plan["due_date"], datetime.min.time()),
+                    "sent": True,
+                    "sent_at": now,
+                    "push_sent": False,
+                    "in_app_notification_id": plan.get("notification_id"),
+                }
+                for plan in plans
+            ]
+        ).scalars().all()
+        for plan, reminder_id in zip(plans, reminder_ids):
+            plan["reminder_id"] = reminder_id
+
+        db.commit()
+        return len(in_app)
+
+    async def _deliver(self, db: Session, plans: List[Dict[str, Any]], report: SweepReport):
+        """Push reminders to connected clients and devices, then record results in bulk."""
+        updates = []
+
+        for plan in plans:
+            if plan.get("notification_id"):
+                try:
+                    await self.websocket_manager.send_notification_to_user(
+                        user_id=plan["user_id"],
+                        notification={
+                            "id": plan["notification_id"],
+                            "type": plan["notification_type"].value,
+                            "title": plan["title"],
+                            "message": plan["message"],
+                            "priority": plan["priority"].value,
+                            "data": plan["data"],
+                            "created_at": (plan.get("created_at") or datetime.now()).isoformat()
+                        }
+                    )
+                except Exception as e:
+                    logger.error(f"Error sending WebSocket notification: {e}")
+
+        jobs = [
+            PushJob(
+                user_id=plan["user_id"],
+                title=plan["title"],
+                body=plan["message"],
+                data=plan["data"],
+                priority="high" if plan["priority"] == NotificationPriority.HIGH else "normal",
+                reminder_ids=[plan["reminder_id"]],
+            )
+            for plan in plans if plan["push"]
+        ]
+        report.pushes_attempted += len(jobs)
+        try:
+            await push_dispatcher.dispatch(db, jobs, coalesce=settings.PUSH_COALESCE_REMINDERS)
+        except Exception as e:
+            logger.error(f"Error sending push notifications: {e}")
+            for job in jobs:
+                job.errors = [str(e)]
+
+        now = datetime.now()
+        for job in jobs:
+            if job.sent > 0:
+                report.pushes_sent += 1
+                updates.append({"id": job.reminder_ids[0], "push_sent": True, "push_sent_at": now})
+            else:
+                error = str(job.errors) if job.tokens else "No active devices"
+                updates.append({"id": job.reminder_ids[0], "delivery_error": error})
+
+        for chunk in _chunks(updates):
+            db.execute(update(Reminder), chunk)
+        db.commit()
+
+    async def process(self, db: Session, rows: List[Any], report: SweepReport, today: date, now: datetime):
+        """Create and deliver reminders for a batch of scan rows."""
+        started = time.perf_counter()
+        plans = [self._plan(row, today, now) for row in rows]
+        for chunk in _chunks(plans):
+            report.notifications_created += self._insert_chunk(db, chunk, now)
+        report.reminders_created += len(plans)
+        report.add_phase("insert", started)
+
+        started = time.perf_counter()
+        if plans:
+            await self._deliver(db, plans, report)
+        report.add_phase("deliver", started)
+
+    async def run(self, db: Session, where=None) -> SweepReport:
+        """
+        Run a full sweep: scan, bulk insert, deliver.
+
+        Args:
+            db: Database session
+            where: Optional extra predicate on the due rows, see scan()
+
+        Returns:
+            SweepReport with counters and per-phase timings
+        """
+        report = SweepReport()
+        today = date.today()
+        now = datetime.now()
+
+        started = time.perf_counter()
+        rows = self.scan(db, today, now, where=where)
+        report.rows_scanned = len(rows)
+        report.add_phase("scan", started)
+
+        await self.process(db, rows, report, today, now)
+
+        logger.info(f"Reminder sweep complete: {report.to_dict()}")
+        return report
+
+
+# Singleton instance
+reminder_sweep = ReminderSweepService()
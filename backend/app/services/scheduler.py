@@ -3,11 +3,33 @@ import logging
 import asyncio
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from app.config import settings
 from app.database import SessionLocal
+from app.services.care_profiles import care_profiles
 from app.services.notification_service import notification_service
+from app.services.photo_storage import photo_storage
+from app.services.reminder_dispatch import reminder_dispatcher
+from app.utils.http_client import http_clients
 
 logger = logging.getLogger(__name__)
 
+
+def run_job(coro):
+    """
+    Run a coroutine from a scheduler thread in its own event loop.
+
+    Outbound HTTP clients are bound to the loop that created them, so the
+    ones opened during the job are closed before the loop goes away.
+    """
+    async def _run():
+        try:
+            return await coro
+        finally:
+            await http_clients.aclose()
+
+    return asyncio.run(_run())
+
 # Import data scraper lazily to avoid circular imports
 _data_scraper = None
 
@@ -41,6 +63,17 @@ class SchedulerService:
         )
         logger.info("Reminder job scheduled for 9:00 AM daily")
 
+        if settings.REMINDER_DISPATCH_MODE == "sharded":
+            # Pick up shards abandoned by crashed workers once their lease expires
+            self.scheduler.add_job(
+                func=self.reclaim_reminder_shards,
+                trigger=IntervalTrigger(seconds=settings.REMINDER_SHARD_LEASE_SECONDS),
+                id='reclaim_reminder_shards',
+                name='Resume abandoned reminder sweep shards',
+                replace_existing=True
+            )
+            logger.info(f"Sharded reminder dispatch enabled ({settings.REMINDER_SHARD_COUNT} shards)")
+
     def start_enrichment_job(self):
         """Start the daily plant data enrichment job."""
         # Run daily at 2:00 AM to maximize API calls
@@ -53,12 +86,53 @@ class SchedulerService:
         )
         logger.info("Enrichment job scheduled for 2:00 AM daily")
 
+    def start_care_profile_job(self):
+        """Start the species care profile refresher."""
+        # Renewal times are jittered per profile, so small frequent batches spread the searches over the day
+        self.scheduler.add_job(
+            func=self.refresh_care_profiles,
+            trigger=IntervalTrigger(minutes=settings.CARE_PROFILE_REFRESH_INTERVAL_MINUTES),
+            id='refresh_care_profiles',
+            name='Renew shared species care profiles',
+            replace_existing=True
+        )
+        logger.info(f"Care profile refresher scheduled every {settings.CARE_PROFILE_REFRESH_INTERVAL_MINUTES} minutes")
+
+    def start_photo_sweep_job(self):
+        """Start the unreferenced photo sweep."""
+        self.scheduler.add_job(
+            func=self.sweep_photos,
+            trigger=IntervalTrigger(minutes=settings.PHOTO_BLOB_SWEEP_INTERVAL_MINUTES),
+            id='sweep_photos',
+            name='Remove unreferenced photo files',
+            replace_existing=True
+        )
+        logger.info(f"Photo sweep scheduled every {settings.PHOTO_BLOB_SWEEP_INTERVAL_MINUTES} minutes")
+
+    def sweep_photos(self):
+        """Remove photos no row references any more - called by scheduler."""
+        try:
+            removed = photo_storage.sweep_unreferenced()
+            if removed:
+                logger.info(f"Photo sweep: removed {removed} unreferenced photos")
+        except Exception as e:
+            logger.error(f"Error in photo sweep: {e}")
+
+    def refresh_care_profiles(self):
+        """Renew species care profiles that are due - called by scheduler."""
+        try:
+            report = run_job(care_profiles.refresh_due())
+            if report.due:
+                logger.info(f"Care profile refresh: {report.renewed}/{report.due} renewed, {report.failed} failed")
+        except Exception as e:
+            logger.error(f"Error in care profile refresh: {e}")
+
     def run_daily_enrichment(self):
         """Run daily plant data enrichment - called by scheduler."""
         logger.info("Running scheduled plant data enrichment...")
         try:
             scraper = get_data_scraper()
-            result = asyncio.run(scraper.run_daily_enrichment())
+            result = run_job(scraper.run_daily_enrichment())
             logger.info(f"Enrichment complete: {result.get('plants_enriched', 0)} plants enriched")
         except Exception as e:
             logger.error(f"Error in enrichment job: {e}")
@@ -69,20 +143,33 @@ class SchedulerService:
         db = SessionLocal()
         try:
             # Run async function in sync context
-            count = asyncio.run(notification_service.check_and_send_reminders(db))
+            if settings.REMINDER_DISPATCH_MODE == "sharded":
+                count = run_job(reminder_dispatcher.run_worker(db)).reminders_created
+            else:
+                count = run_job(notification_service.check_and_send_reminders(db))
             logger.info(f"Reminder check complete. Sent {count} reminders.")
         except Exception as e:
             logger.error(f"Error in reminder check: {e}")
         finally:
             db.close()
 
+    def reclaim_reminder_shards(self):
+        """Resume any of today's reminder shards whose lease has expired - called by scheduler."""
+        db = SessionLocal()
+        try:
+            run_job(reminder_dispatcher.run_worker(db, create_shards=False))
+        except Exception as e:
+            logger.error(f"Error reclaiming reminder shards: {e}")
+        finally:
+            db.close()
+
     async def trigger_reminder_check_now(self):
         """Manually trigger reminder check (for testing)."""
         logger.info("Manual reminder check triggered")
         db = SessionLocal()
         try:
-            count = await notification_service.check_and_send_reminders(db)
-            return {"success": True, "reminders_sent": count}
+            report = await notification_service.sweep_reminders(db)
+            return {"success": True, "reminders_sent": report.reminders_created, "report": report.to_dict()}
         except Exception as e:
             logger.error(f"Error in manual reminder check: {e}")
             return {"success": False, "error": str(e)}
@@ -1,78 +1,230 @@
 """Tips generator service for personalized plant care tips."""
-from typing import List, Dict
+import asyncio
+import weakref
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import AsyncSessionLocal
 from app.models.plant import Plant
-from app.models.tips import DidYouKnowTip
+from app.models.tips import DidYouKnowTip, SpeciesTipPool
+from app.services.care_profiles import species_key
 from app.services.google_search import google_search
+from app.utils.logging_config import get_logger
 from urllib.parse import urlparse
 
+logger = get_logger(__name__)
+
+# Tips should vary over time, so searches are reused for two weeks at most
+TIPS_SEARCH_TTL = timedelta(days=14)
+
+# Search queries for interesting facts and tips
+TIP_QUERIES = [
+    "{species} interesting facts did you know",
+    "{species} plant care secrets tips tricks",
+    "{species} common mistakes avoid care",
+]
+
+# Results per query when filling a species pool: enough for the largest tips_per_species (5)
+POOL_RESULTS_PER_QUERY = 5
+
+
+def _has_urls(tips: List[Dict]) -> bool:
+    """Whether any tip came from a real search result rather than the no-API fallback."""
+    return any(tip.get('url') for tip in tips)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
 
 class TipsGeneratorService:
     """Service for generating personalized plant care tips."""
 
     def __init__(self):
         self.google_search = google_search
+        self.pool_ttl = timedelta(days=settings.TIPS_POOL_TTL_DAYS)
+        # One concurrency limit per event loop (scheduler jobs run their own loops)
+        self._limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+        # In-flight pool fills per event loop
+        self._in_flight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = \
+            weakref.WeakKeyDictionary()
+        self.lookups = 0
+        self.pool_hits = 0
+        self.stale_served = 0
+        self.coalesced = 0
+        self.searches = 0
+        self.empty_searches = 0
+        self.failed_queries = 0
+
+    def _limit(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        limit = self._limits.get(loop)
+        if limit is None:
+            limit = self._limits[loop] = asyncio.Semaphore(settings.TIPS_SEARCH_CONCURRENCY)
+        return limit
 
     async def generate_tips_for_user(
         self,
         user_id: int,
-        db: Session,
+        db: AsyncSession,
         tips_per_species: int = 2
     ) -> List[Dict]:
         """
         Generate personalized tips based on user's plant collection.
 
+        Tips come from the shared species tip pools; species without a fresh
+        pool are searched concurrently (TIPS_SEARCH_CONCURRENCY searches at a
+        time across all requests). Tips the user already has are skipped with
+        one query over all candidate URLs.
+
         Args:
             user_id: User ID to generate tips for
-            db: Database session
+            db: Async database session
             tips_per_species: Number of tips to generate per unique species
 
         Returns:
             List of generated tip dictionaries
         """
         # Get unique species from user's plants
-        user_plants = db.query(Plant).filter(Plant.user_id == user_id).all()
+        result = await db.execute(
+            select(Plant.species, Plant.identified_common_name).where(Plant.user_id == user_id)
+        )
+        user_plants = result.all()
 
         if not user_plants:
             return []
 
-        # Get unique species (filter out None/empty)
-        species_set = set()
+        # Get unique species (filter out None/empty), one name per species key
+        species_names: Dict[str, str] = {}
         for plant in user_plants:
-            if plant.species:
-                species_set.add(plant.species)
-            elif plant.identified_common_name:
-                species_set.add(plant.identified_common_name)
+            name = plant.species or plant.identified_common_name
+            if name:
+                species_names.setdefault(species_key(name), name)
+
+        if not species_names:
+            return []
+
+        pools = await self.species_tips(db, species_names)
+
+        # Candidate tips in species order, without URLs repeated across species
+        candidates = []
+        seen_urls = set()
+        for key, species in species_names.items():
+            for tip in pools.get(key, [])[:tips_per_species * 2]:
+                if tip['url'] not in seen_urls:
+                    seen_urls.add(tip['url'])
+                    candidates.append((species, tip))
 
-        if not species_set:
+        if not candidates:
             return []
 
-        # Generate tips for each species
-        generated_tips = []
-        for species in species_set:
-            tips = await self.search_species_tips(species, tips_per_species)
-
-            # Convert search results to tip format
-            for tip in tips:
-                # Check if this tip already exists for the user
-                existing_tip = db.query(DidYouKnowTip).filter(
-                    DidYouKnowTip.user_id == user_id,
-                    DidYouKnowTip.url == tip['url']
-                ).first()
-
-                if not existing_tip:
-                    tip_data = {
-                        'user_id': user_id,
-                        'species': species,
-                        'plant_id': None,  # General species tip, not plant-specific
-                        'title': tip['title'],
-                        'content': tip['snippet'],
-                        'url': tip['url'],
-                        'source_domain': self._extract_domain(tip['url'])
-                    }
-                    generated_tips.append(tip_data)
-
-        return generated_tips
+        # Skip tips the user already has
+        existing_urls = set((await db.execute(
+            select(DidYouKnowTip.url).where(
+                DidYouKnowTip.user_id == user_id,
+                DidYouKnowTip.url.in_(seen_urls)
+            )
+        )).scalars())
+
+        return [
+            {
+                'user_id': user_id,
+                'species': species,
+                'plant_id': None,  # General species tip, not plant-specific
+                'title': tip['title'],
+                'content': tip['snippet'],
+                'url': tip['url'],
+                'source_domain': self._extract_domain(tip['url'])
+            }
+            for species, tip in candidates
+            if tip['url'] not in existing_urls
+        ]
+
+    async def species_tips(self, db: AsyncSession, species_names: Dict[str, str]) -> Dict[str, List[Dict]]:
+        """
+        Tip pools for several species, searching only those without a fresh one.
+
+        Args:
+            db: Async database session (pools are read with one query)
+            species_names: Species name to use for searching, by species_key()
+
+        Returns:
+            Pooled search results by species key; species with nothing found are left out
+        """
+        self.lookups += len(species_names)
+        now = datetime.now(timezone.utc)
+        rows = (await db.execute(
+            select(SpeciesTipPool.species_key, SpeciesTipPool.tips, SpeciesTipPool.expires_at)
+            .where(SpeciesTipPool.species_key.in_(list(species_names)))
+        )).all()
+
+        pools: Dict[str, List[Dict]] = {}
+        stale: Dict[str, List[Dict]] = {}
+        for row in rows:
+            if _as_utc(row.expires_at) > now:
+                pools[row.species_key] = row.tips
+            else:
+                stale[row.species_key] = row.tips
+        self.pool_hits += len(pools)
+
+        missing = [key for key in species_names if key not in pools]
+        filled = await asyncio.gather(*(self._fill(key, species_names[key]) for key in missing))
+        for key, tips in zip(missing, filled):
+            if not _has_urls(tips) and stale.get(key):
+                # The search found nothing real; keep serving the expired pool
+                self.stale_served += 1
+                pools[key] = stale[key]
+            elif tips:
+                pools[key] = tips
+        return pools
+
+    async def _fill(self, key: str, species: str) -> List[Dict]:
+        """Search a species and store its pool; concurrent fills of one species share the search."""
+        in_flight = self._in_flight.setdefault(asyncio.get_running_loop(), {})
+        pending = in_flight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        pending = asyncio.ensure_future(self._search_and_store(key, species))
+        in_flight[key] = pending
+        pending.add_done_callback(lambda _: in_flight.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _search_and_store(self, key: str, species: str) -> List[Dict]:
+        self.searches += 1
+        tips = await self.search_species_tips(species, POOL_RESULTS_PER_QUERY)
+        if not _has_urls(tips):
+            # Nothing found, or only the in-app tips (no URLs) google_search falls
+            # back to when the API fails: hand those out, but don't pool them
+            self.empty_searches += 1
+            return tips
+
+        values = {"species_name": species[:255], "tips": tips, "expires_at": datetime.now(timezone.utc) + self.pool_ttl}
+        try:
+            async with AsyncSessionLocal() as session:
+                updated = await session.execute(
+                    update(SpeciesTipPool).where(SpeciesTipPool.species_key == key).values(**values)
+                )
+                if not updated.rowcount:
+                    session.add(SpeciesTipPool(species_key=key, **values))
+                try:
+                    await session.commit()
+                except IntegrityError:
+                    await session.rollback()  # Another worker stored it first
+        except Exception as e:
+            logger.warning(f"Storing tip pool for {species} failed: {e}")
+        return tips
+
+    async def _search(self, query: str, num_results: int) -> List[Dict]:
+        async with self._limit():
+            return await self.google_search.search_plant_problem(query, num_results, ttl=TIPS_SEARCH_TTL)
 
     async def search_species_tips(
         self,
@@ -82,6 +234,9 @@ class TipsGeneratorService:
         """
         Search for interesting facts and tips about a species.
 
+        The queries run concurrently; results are interleaved by rank so the
+        first few cover every query.
+
         Args:
             species: Plant species name
             num_results: Number of tips to find
@@ -89,25 +244,26 @@ class TipsGeneratorService:
         Returns:
             List of search results formatted as tips
         """
-        # Create search queries for interesting facts and tips
-        queries = [
-            f"{species} interesting facts did you know",
-            f"{species} plant care secrets tips tricks",
-            f"{species} common mistakes avoid care",
-        ]
-
-        all_results = []
-        for query in queries:
-            results = await self.google_search.search_plant_problem(query, num_results)
-            all_results.extend(results)
-
-        # Remove duplicates by URL
+        responses = await asyncio.gather(
+            *(self._search(query.format(species=species), num_results) for query in TIP_QUERIES),
+            return_exceptions=True
+        )
+        per_query = []
+        for query, response in zip(TIP_QUERIES, responses):
+            if isinstance(response, BaseException):
+                self.failed_queries += 1
+                logger.warning(f"Tip search '{query.format(species=species)}' failed: {response}")
+                continue
+            per_query.append(response)
+
+        # Remove duplicates by URL, best ranked results of each query first
         seen_urls = set()
         unique_results = []
-        for result in all_results:
-            if result['url'] not in seen_urls:
-                seen_urls.add(result['url'])
-                unique_results.append(result)
+        for position in range(max((len(results) for results in per_query), default=0)):
+            for results in per_query:
+                if position < len(results) and results[position]['url'] not in seen_urls:
+                    seen_urls.add(results[position]['url'])
+                    unique_results.append(results[position])
 
         # Return requested number
         return unique_results[:num_results * 2]  # Get a few extra for variety
@@ -128,7 +284,7 @@ class TipsGeneratorService:
             List of seasonal care tips
         """
         query = f"{species} seasonal care tips winter summer spring fall"
-        return await self.google_search.search_plant_problem(query, num_results)
+        return await self.google_search.search_plant_problem(query, num_results, ttl=TIPS_SEARCH_TTL)
 
     async def search_beginner_tips(
         self,
@@ -146,7 +302,7 @@ class TipsGeneratorService:
             List of beginner tips
         """
         query = f"{species} beginner guide easy care tips first time"
-        return await self.google_search.search_plant_problem(query, num_results)
+        return await self.google_search.search_plant_problem(query, num_results, ttl=TIPS_SEARCH_TTL)
 
     async def search_problem_prevention_tips(
         self,
@@ -164,7 +320,7 @@ class TipsGeneratorService:
             List of problem prevention tips
         """
         query = f"{species} prevent common problems pests diseases yellowing"
-        return await self.google_search.search_plant_problem(query, num_results)
+        return await self.google_search.search_plant_problem(query, num_results, ttl=TIPS_SEARCH_TTL)
 
     def _extract_domain(self, url: str) -> str:
         """
@@ -230,6 +386,18 @@ class TipsGeneratorService:
         db.commit()
         return created_tips
 
+    def stats(self) -> Dict:
+        return {
+            "lookups": self.lookups,
+            "pool_hits": self.pool_hits,
+            "hit_rate": round(self.pool_hits / self.lookups, 3) if self.lookups else 0.0,
+            "stale_served": self.stale_served,
+            "coalesced": self.coalesced,
+            "searches": self.searches,
+            "empty_searches": self.empty_searches,
+            "failed_queries": self.failed_queries,
+        }
+
 
 # Singleton instance
 tips_generator = TipsGeneratorService()
@@ -0,0 +1,119 @@
+"""Builds the image part of vision model requests."""
+import base64
+import hashlib
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.services.photo_storage import photo_storage
+from app.utils.logging_config import get_logger
+from app.utils.ttl_cache import TTLCache
+
+logger = get_logger(__name__)
+
+DATA_URL_PREFIX = "data:image/jpeg;base64,"
+
+
+@dataclass
+class VisionImage:
+    """A photo ready to embed in a vision request."""
+    image_hash: str  # sha256 of the original file
+    data_url: str  # data:image/jpeg;base64,...
+    width: int
+    height: int
+    source_bytes: int
+
+    @property
+    def payload_bytes(self) -> int:
+        return len(self.data_url)
+
+    @property
+    def unscaled_payload_bytes(self) -> int:
+        """Size of the data URL for the original file, as sent before downscaling."""
+        return len(DATA_URL_PREFIX) + 4 * math.ceil(self.source_bytes / 3)
+
+
+def _file_sha256(path: Path) -> str:
+    """Hash a file in chunks instead of reading it into memory. Runs in a worker thread."""
+    with open(path, "rb") as source:
+        return hashlib.file_digest(source, "sha256").hexdigest()
+
+
+class VisionPayloadBuilder:
+    """
+    Turns stored photos into downscaled, base64-encoded data URLs.
+
+    Photos are resized to the resolution the model works at and re-encoded
+    once; the result is kept in an in-process LRU keyed by the sha256 of the
+    original file, so repeat analyses of a photo (other descriptions, forced
+    refreshes, retries) only hash the file.
+    """
+
+    def __init__(self):
+        self.short_side = settings.VISION_IMAGE_SHORT_SIDE
+        self.long_side = settings.VISION_IMAGE_LONG_SIDE
+        self.quality = settings.VISION_JPEG_QUALITY
+        # Keyed by content hash, so entries never go stale
+        self.cache = TTLCache(max_entries=settings.VISION_PAYLOAD_CACHE_ENTRIES)
+        self.builds = 0
+        self.errors = 0
+        self.render_ms = 0.0
+
+    def resolve_path(self, image_path: str) -> Path:
+        """Map a stored photo URL ("/photos/<name>") or a path to a file on disk."""
+        if image_path.startswith("/photos/"):
+            return photo_storage.upload_dir / image_path.split('/')[-1]
+        if not image_path.startswith('/'):
+            # Handle relative paths from uploads directory
+            return Path(settings.UPLOAD_DIR).parent.parent / image_path.lstrip('/')
+        return Path(image_path)
+
+    async def hash_image(self, image_path: str) -> Optional[str]:
+        """sha256 of a photo's file; None if it cannot be read."""
+        try:
+            return await run_in_threadpool(_file_sha256, self.resolve_path(image_path))
+        except OSError as e:
+            self.errors += 1
+            logger.error(f"Error reading image: {e}")
+            return None
+
+    async def build(self, image_path: str, image_hash: str) -> Optional[VisionImage]:
+        """Downscaled data URL for a photo (image_hash from hash_image); None if it cannot be encoded."""
+        found, image = self.cache.get(image_hash)
+        if not found:
+            path = self.resolve_path(image_path)
+            rendered = await photo_storage.encode_for_vision(
+                str(path), self.short_side, self.long_side, self.quality
+            )
+            if not rendered["ok"]:
+                self.errors += 1
+                logger.error(f"Error encoding image {path.name}: {rendered.get('error')}")
+                return None
+
+            self.builds += 1
+            self.render_ms += rendered["render_ms"]
+            image = VisionImage(
+                image_hash=image_hash,
+                data_url=DATA_URL_PREFIX + base64.b64encode(rendered["data"]).decode("ascii"),
+                width=rendered["size"][0],
+                height=rendered["size"][1],
+                source_bytes=rendered["source_bytes"],
+            )
+            self.cache.set(image_hash, image, math.inf)
+        return image
+
+    def stats(self) -> Dict:
+        return {
+            "cache": self.cache.stats(),
+            "builds": self.builds,
+            "errors": self.errors,
+            "avg_render_ms": round(self.render_ms / self.builds, 1) if self.builds else 0.0,
+        }
+
+
+# Singleton instance
+vision_payload = VisionPayloadBuilder()
@@ -36,21 +36,23 @@ class WebSocketManager:
 
     async def send_notification_to_user(self, user_id: int, notification: dict):
         """Send a notification to all connected clients for a user."""
+        await self.send_to_user(user_id, {
+            "type": "notification",
+            "data": notification
+        })
+
+    async def send_to_user(self, user_id: int, message: dict):
+        """Send a typed message ({"type": ..., "data": ...}) to all connected clients for a user."""
         if user_id not in self.active_connections:
             logger.debug(f"No active connections for user {user_id}")
             return
 
-        message = {
-            "type": "notification",
-            "data": notification
-        }
-
         # Send to all connections for this user
         disconnected = set()
-        for websocket in self.active_connections[user_id]:
+        for websocket in list(self.active_connections[user_id]):
             try:
                 await websocket.send_json(message)
-                logger.debug(f"Sent notification to user {user_id} via WebSocket")
+                logger.debug(f"Sent {message.get('type')} to user {user_id} via WebSocket")
             except Exception as e:
                 logger.error(f"Error sending WebSocket message: {e}")
                 disconnected.add(websocket)
@@ -0,0 +1,59 @@
+"""
+Aho-Corasick automaton for finding which of a fixed set of patterns occur in a text.
+
+Built once from the pattern list; each search is a single pass over the text,
+however many patterns there are.
+"""
+from collections import deque
+from typing import Dict, FrozenSet, List, Sequence
+
+
+class AhoCorasick:
+    """Reports the indexes of every pattern that occurs somewhere in a text."""
+
+    def __init__(self, patterns: Sequence[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        outputs: List[set] = [set()]
+
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append(set())
+                state = next_state
+            outputs[state].add(index)
+
+        # Breadth-first, so every fail target is finished before it is used
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                outputs[next_state] |= outputs[self._fail[next_state]]
+
+        self._outputs: List[FrozenSet[int]] = [frozenset(output) for output in outputs]
+        # The empty pattern occurs in every text
+        self._always: FrozenSet[int] = self._outputs[0]
+
+    def find(self, text: str) -> FrozenSet[int]:
+        """Indexes of the patterns that occur in `text`."""
+        found = set(self._always)
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            if self._outputs[state]:
+                found |= self._outputs[state]
+        return frozenset(found)
@@ -1,13 +1,17 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.config import settings
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.user import User
+from app.utils.password_hashing import PasswordHashingBusy, password_hash_pool
+from app.utils.user_cache import AuthenticatedUser, principal_cache
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -26,9 +30,48 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create a JWT access token."""
+def _password_service_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in requests right now, please retry shortly",
+        headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+    )
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the password hashing pool, off the event loop.
+    Raises a 503 HTTPException with Retry-After if the pool is saturated.
+    """
+    try:
+        return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+    except PasswordHashingBusy:
+        raise _password_service_busy()
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password on the password hashing pool, off the event loop.
+    Raises a 503 HTTPException with Retry-After if the pool is saturated.
+    """
+    try:
+        return await password_hash_pool.run(get_password_hash, password)
+    except PasswordHashingBusy:
+        raise _password_service_busy()
+
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None, user_id: Optional[int] = None) -> str:
+    """
+    Create a JWT access token.
+
+    When AUTH_TOKEN_USER_ID is enabled and user_id is given, it is carried as
+    the "uid" claim so requests can be authenticated without a users lookup.
+    Nothing revokes such a token early: the User update/delete invalidation in
+    user_cache never sees it, so it is honoured until it expires.
+    """
     to_encode = data.copy()
+    if settings.AUTH_TOKEN_USER_ID and user_id is not None:
+        to_encode["uid"] = user_id
 
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -50,56 +93,91 @@ def decode_access_token(token: str) -> Optional[dict]:
         return None
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """
-    Dependency to get the current authenticated user from JWT token.
-    Raises HTTPException if token is invalid or user not found.
-    """
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    # Decode token
+
+def _principal_from_token(token: str) -> Tuple[Optional[str], Optional[AuthenticatedUser]]:
+    """
+    Resolve a token without touching the database.
+
+    Returns:
+        (subject email, principal) - principal is None when the users table
+        must be consulted; subject is None when the token is invalid
+    """
     payload = decode_access_token(token)
     if payload is None:
-        raise credentials_exception
+        return None, None
+
+    email = payload.get("sub")
+    if email is None:
+        return None, None
+
+    user_id = payload.get("uid")
+    if settings.AUTH_TOKEN_USER_ID and isinstance(user_id, int):
+        principal_cache.token_claims += 1
+        return email, AuthenticatedUser(id=user_id, email=email)
+
+    return email, principal_cache.get(email)
 
-    # Get user email from token
-    email: str = payload.get("sub")
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> AuthenticatedUser:
+    """
+    Dependency to get the current authenticated user from JWT token.
+    Raises HTTPException if token is invalid or user not found.
+    """
+    email, principal = _principal_from_token(token)
     if email is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    if principal is not None:
+        return principal
 
-    # Get user from database
+    # Cache miss: get user from database
     user = db.query(User).filter(User.email == email).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    principal = AuthenticatedUser.from_user(user)
+    principal_cache.put(email, principal)
+    return principal
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> AuthenticatedUser:
+    """
+    Async-session variant of get_current_user for routers on the async database layer.
+    Raises HTTPException if token is invalid or user not found.
+    """
+    email, principal = _principal_from_token(token)
+    if email is None:
+        raise _credentials_exception()
+    if principal is not None:
+        return principal
+
+    user = (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
+    if user is None:
+        raise _credentials_exception()
 
-    return user
+    principal = AuthenticatedUser.from_user(user)
+    principal_cache.put(email, principal)
+    return principal
 
 
-async def get_websocket_user(token: str, db: Session) -> Optional[User]:
+async def get_websocket_user(token: str, db: AsyncSession) -> Optional[AuthenticatedUser]:
     """
     Authenticate user from WebSocket token.
     Returns None if authentication fails.
     """
     try:
-        # Decode token
-        payload = decode_access_token(token)
-        if payload is None:
-            return None
-
-        # Get user email from token
-        email: str = payload.get("sub")
-        if email is None:
-            return None
-
-        # Get user from database
-        user = db.query(User).filter(User.email == email).first()
-        return user
+        return await get_current_user_async(token, db)
     except Exception:
         return None
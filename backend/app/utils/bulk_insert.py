@@ -0,0 +1,58 @@
+"""
+Multi-row INSERT ... RETURNING for request paths that create several rows.
+
+Adding ORM objects one by one and refreshing each after the commit costs a
+round trip per row just to learn ids and server defaults. These helpers send
+one INSERT for all rows (SQLAlchemy's insertmanyvalues batching) and return
+every column of the new rows, in input order, as Row objects; Pydantic
+schemas with from_attributes validate them directly.
+"""
+from operator import attrgetter
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import Row, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+def _statement(db, model: Type) -> Tuple[Any, Optional[str]]:
+    """INSERT ... RETURNING every column, and the column to sort the result on (None if already in order)."""
+    table = model.__table__
+    # None is written as NULL instead of dropping the key, which would split the
+    # batch into one INSERT per distinct set of keys
+    statement = insert(model).execution_options(render_nulls=True)
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite can't batch an order-preserving RETURNING (it falls back to one
+        # INSERT per row), but it assigns rowids in VALUES order: sort on the key
+        return statement.returning(*table.c), table.primary_key.columns[0].name
+    return statement.returning(*table.c, sort_by_parameter_order=True), None
+
+
+def _in_order(rows: List[Row], sort_key: Optional[str]) -> List[Row]:
+    return sorted(rows, key=attrgetter(sort_key)) if sort_key else rows
+
+
+def bulk_insert_returning(db: Session, model: Type, rows: Sequence[Dict[str, Any]]) -> List[Row]:
+    """
+    Insert rows of a mapped class in one statement (the caller commits).
+
+    Args:
+        db: Session to execute in
+        model: Mapped class with an integer primary key, e.g. DiagnosisSolution
+        rows: Column values per row; omitted columns get their defaults, None is NULL
+
+    Returns:
+        The inserted rows with all columns (ids, server defaults), in input order
+    """
+    if not rows:
+        return []
+    statement, sort_key = _statement(db, model)
+    return _in_order(db.execute(statement, list(rows)).all(), sort_key)
+
+
+async def bulk_insert_returning_async(db: AsyncSession, model: Type, rows: Sequence[Dict[str, Any]]) -> List[Row]:
+    """bulk_insert_returning() for an AsyncSession."""
+    if not rows:
+        return []
+    statement, sort_key = _statement(db, model)
+    return _in_order((await db.execute(statement, list(rows))).all(), sort_key)
@@ -0,0 +1,106 @@
+"""
+Size-bounded LRU cache of files in a single directory.
+
+Used for photo derivatives (thumbnails and alternate formats), which can be
+regenerated from the original at any time, so evicting them is always safe.
+Recency is kept in memory and mirrored to file mtimes, which lets a restart
+rebuild the LRU order from a directory scan.
+"""
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class DiskLRUCache:
+    """LRU over the files in `directory`, evicting oldest-used files past `max_bytes`."""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load()
+
+    def _load(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".part"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._sizes[name] = size
+            self.total_bytes += size
+
+    def path_for(self, name: str) -> Path:
+        return self.directory / name
+
+    def get(self, name: str) -> Optional[Path]:
+        """Return the cached file's path and mark it recently used, or None."""
+        with self._lock:
+            if name not in self._sizes:
+                self.misses += 1
+                return None
+            self._sizes.move_to_end(name)
+            self.hits += 1
+        path = self.path_for(name)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Removed behind our back; forget it
+            self.discard(name)
+            return None
+        return path
+
+    def add(self, name: str):
+        """Register a file that was just written into the cache directory."""
+        try:
+            size = self.path_for(name).stat().st_size
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self.total_bytes -= self._sizes.pop(name, 0)
+            self._sizes[name] = size
+            self.total_bytes += size
+            evicted = self._evict()
+        for victim in evicted:
+            self.path_for(victim).unlink(missing_ok=True)
+
+    def _evict(self):
+        evicted = []
+        while self.total_bytes > self.max_bytes and len(self._sizes) > 1:
+            victim, size = self._sizes.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            evicted.append(victim)
+        return evicted
+
+    def discard(self, name: str):
+        with self._lock:
+            self.total_bytes -= self._sizes.pop(name, 0)
+        self.path_for(name).unlink(missing_ok=True)
+
+    def discard_prefix(self, prefix: str):
+        """Drop every cached file whose name starts with `prefix`."""
+        with self._lock:
+            names = [name for name in self._sizes if name.startswith(prefix)]
+        for name in names:
+            self.discard(name)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "files": len(self._sizes),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,166 @@
+"""
+Shared outbound HTTP clients for external integrations.
+
+One pooled httpx.AsyncClient is kept per (event loop, host) so keep-alive
+connections, DNS results and TLS sessions are reused across requests. Each
+host gets its own connection limits and timeouts, HTTP/2 is negotiated when
+the h2 package is installed, and every request is counted so pool saturation
+can be reported.
+
+Clients are bound to the event loop that created them. The app's loop gets
+its clients on startup and closes them on shutdown; scheduler jobs that run
+in their own loop should close theirs with aclose() before the loop ends.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+import httpx
+
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass(frozen=True)
+class HostProfile:
+    """Connection pool limits and timeouts for one outbound host."""
+    max_connections: int = 10
+    max_keepalive: int = 5
+    timeout: float = 30.0
+    connect_timeout: float = 5.0
+
+
+DEFAULT_PROFILE = HostProfile()
+
+HOST_PROFILES: Dict[str, HostProfile] = {
+    "perenual.com": HostProfile(max_connections=4, max_keepalive=2, timeout=30.0),
+    "my-api.plantnet.org": HostProfile(max_connections=10, max_keepalive=5, timeout=30.0),
+    "www.googleapis.com": HostProfile(max_connections=20, max_keepalive=10, timeout=10.0),
+    "api.openai.com": HostProfile(max_connections=10, max_keepalive=5, timeout=30.0),
+    "fcm.googleapis.com": HostProfile(max_connections=50, max_keepalive=20, timeout=10.0),
+}
+
+
+class HostStats:
+    """Request counters for one host's connection pool."""
+
+    def __init__(self, max_connections: int):
+        self.max_connections = max_connections
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.saturated = 0  # Requests that started with every pooled connection busy
+        self.total_ms = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "max_connections": self.max_connections,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "saturated_requests": self.saturated,
+            "saturation": round(self.peak_in_flight / self.max_connections, 2),
+            "avg_ms": round(self.total_ms / self.requests, 1) if self.requests else 0.0,
+        }
+
+
+class MeteredTransport(httpx.AsyncHTTPTransport):
+    """Connection-pooling transport that records in-flight and saturation counters."""
+
+    def __init__(self, stats: HostStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        stats = self.stats
+        if stats.in_flight >= stats.max_connections:
+            stats.saturated += 1
+        stats.in_flight += 1
+        stats.requests += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        started = time.perf_counter()
+        try:
+            return await super().handle_async_request(request)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+            stats.total_ms += (time.perf_counter() - started) * 1000
+
+
+class OutboundClientRegistry:
+    """Application-scoped registry of pooled outbound HTTP clients."""
+
+    def __init__(self):
+        self._clients: Dict[Tuple[int, str], httpx.AsyncClient] = {}
+        self._stats: Dict[str, HostStats] = {}
+
+    def _profile(self, host: str) -> HostProfile:
+        return HOST_PROFILES.get(host, DEFAULT_PROFILE)
+
+    def get(self, url: str) -> httpx.AsyncClient:
+        """
+        Get the shared client for the host of a URL.
+
+        Args:
+            url: Any URL (or base URL) on the target host
+
+        Returns:
+            A pooled AsyncClient bound to the current event loop
+        """
+        host = httpx.URL(url).host
+        key = (id(asyncio.get_running_loop()), host)
+
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            profile = self._profile(host)
+            stats = self._stats.setdefault(host, HostStats(profile.max_connections))
+            transport = MeteredTransport(
+                stats,
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=profile.max_connections,
+                    max_keepalive_connections=profile.max_keepalive,
+                ),
+            )
+            client = httpx.AsyncClient(
+                transport=transport,
+                timeout=httpx.Timeout(profile.timeout, connect=profile.connect_timeout),
+            )
+            self._clients[key] = client
+        return client
+
+    async def start(self):
+        """Create clients for all known hosts on the current event loop."""
+        for host in HOST_PROFILES:
+            self.get(f"https://{host}")
+        logger.info(f"Outbound HTTP clients ready ({len(HOST_PROFILES)} hosts, http2={HTTP2_AVAILABLE})")
+
+    async def aclose(self):
+        """Close every client bound to the current event loop."""
+        loop_id = id(asyncio.get_running_loop())
+        for key in [key for key in self._clients if key[0] == loop_id]:
+            client = self._clients.pop(key)
+            await client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-host pool usage counters."""
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "hosts": {host: stats.to_dict() for host, stats in self._stats.items()},
+        }
+
+
+# Singleton instance
+http_clients = OutboundClientRegistry()
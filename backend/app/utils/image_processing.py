@@ -0,0 +1,191 @@
+"""
+Image pipeline functions that run inside the image worker processes.
+
+Kept free of app imports (settings, database, services) so spawned workers
+start quickly and never open connections of their own.
+"""
+import io
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from PIL import Image, ImageOps
+
+try:
+    import pillow_avif  # noqa: F401  Registers the AVIF codec on older Pillow
+except ImportError:
+    pass
+
+# Derivative format -> (media type, PIL save options)
+DERIVATIVE_FORMATS = {
+    "avif": ("image/avif", {"format": "AVIF", "quality": 55}),
+    "webp": ("image/webp", {"format": "WEBP", "quality": 80, "method": 4}),
+    "jpeg": ("image/jpeg", {"format": "JPEG", "quality": 80, "optimize": True, "progressive": True}),
+}
+
+
+def available_formats() -> List[str]:
+    """Derivative formats this Pillow build can encode, best compression first."""
+    Image.init()
+    return [name for name, (_, options) in DERIVATIVE_FORMATS.items() if options["format"] in Image.SAVE]
+
+
+def _ms_since(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
+
+
+def _save_atomic(image: Image.Image, dest_path: str, **options):
+    tmp_path = f"{dest_path}.part"
+    image.save(tmp_path, **options)
+    os.replace(tmp_path, dest_path)
+
+
+def _save_derivatives(image: Image.Image, derivatives: Sequence[Tuple[int, str, str]]) -> List[str]:
+    """Write (width, format, path) derivatives from an already decoded image."""
+    written = []
+    for width, fmt, path in sorted(derivatives, reverse=True):
+        # Largest first, so each thumbnail is resampled from the previous one
+        if image.size[0] > width or image.size[1] > width:
+            image = image.copy()
+            image.thumbnail((width, width), Image.Resampling.LANCZOS)
+        _save_atomic(image, path, **DERIVATIVE_FORMATS[fmt][1])
+        written.append(os.path.basename(path))
+    return written
+
+
+def compress_photo(
+    source: Union[str, Any],
+    dest_path: str,
+    max_size: Tuple[int, int] = (1200, 1200),
+    quality: int = 85,
+    derivatives: Optional[Sequence[Tuple[int, str, str]]] = None
+) -> Dict[str, Any]:
+    """
+    Decode, orient, flatten, downscale and JPEG-encode one photo.
+
+    Args:
+        source: Path (or file object) of the original upload
+        dest_path: Where to write the compressed JPEG
+        max_size: Bounding box for the stored image
+        quality: JPEG quality
+        derivatives: Optional (width, format, path) thumbnails to write as well
+
+    Returns:
+        {"ok": bool, "decode_ms", "transform_ms", "encode_ms", "derivatives", "error"}
+    """
+    timings = {"ok": False, "decode_ms": 0.0, "transform_ms": 0.0, "encode_ms": 0.0, "derivatives": []}
+    try:
+        started = time.perf_counter()
+        image = Image.open(source)
+        # Shrink during decode when the JPEG decoder supports it (DCT scaling)
+        image.draft(None, (max_size[0] * 2, max_size[1] * 2))
+        image.load()
+        timings["decode_ms"] = _ms_since(started)
+
+        started = time.perf_counter()
+        # Apply EXIF orientation (fixes rotation from mobile cameras)
+        image = ImageOps.exif_transpose(image)
+
+        # Convert RGBA to RGB if necessary
+        if image.mode in ('RGBA', 'LA', 'P'):
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            if image.mode == 'P':
+                image = image.convert('RGBA')
+            background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
+            image = background
+
+        # Resize if image is too large
+        if image.size[0] > max_size[0] or image.size[1] > max_size[1]:
+            image.thumbnail(max_size, Image.Resampling.LANCZOS)
+        timings["transform_ms"] = _ms_since(started)
+
+        started = time.perf_counter()
+        _save_atomic(image, dest_path, format='JPEG', quality=quality, optimize=True)
+        if derivatives:
+            timings["derivatives"] = _save_derivatives(image, derivatives)
+        timings["encode_ms"] = _ms_since(started)
+
+        timings["ok"] = True
+    except Exception as e:
+        timings["error"] = str(e)
+    return timings
+
+
+def render_derivative(source_path: str, dest_path: str, width: int, fmt: str) -> Dict[str, Any]:
+    """
+    Render one derivative (at most `width` px on the long side) of a stored photo.
+
+    Returns:
+        {"ok": bool, "render_ms", "error"}
+    """
+    result = {"ok": False, "render_ms": 0.0}
+    started = time.perf_counter()
+    try:
+        image = Image.open(source_path)
+        image.draft('RGB', (width, width))
+        image = image.convert('RGB')
+        _save_derivatives(image, [(width, fmt, dest_path)])
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = str(e)
+    result["render_ms"] = _ms_since(started)
+    return result
+
+
+def vision_size(size: Tuple[int, int], short_side: int, long_side: int) -> Tuple[int, int]:
+    """Largest size within long_side x long_side whose short side is at most short_side."""
+    width, height = size
+    scale = min(1.0, long_side / max(width, height), short_side / min(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def encode_vision_image(
+    source_path: str,
+    short_side: int = 768,
+    long_side: int = 2048,
+    quality: int = 80
+) -> Dict[str, Any]:
+    """
+    Downscale and JPEG-encode a photo for a vision model request.
+
+    The model resamples anything larger to fit long_side and then short_side
+    before looking at it, so extra pixels only cost upload time. An upright
+    JPEG that already fits is sent unchanged unless re-encoding shrinks it.
+
+    Returns:
+        {"ok": bool, "data": JPEG bytes, "size": (w, h), "source_bytes", "render_ms", "error"}
+    """
+    result = {"ok": False, "data": b"", "size": (0, 0), "source_bytes": 0, "render_ms": 0.0}
+    started = time.perf_counter()
+    try:
+        result["source_bytes"] = os.path.getsize(source_path)
+        with Image.open(source_path) as original:
+            image = original
+            target = vision_size(image.size, short_side, long_side)
+            passthrough = image.format == "JPEG" and target == image.size and image.getexif().get(0x0112, 1) == 1
+
+            # Shrink during decode when the JPEG decoder supports it (DCT scaling)
+            image.draft('RGB', target)
+            image = ImageOps.exif_transpose(image)
+            if image.mode in ('RGBA', 'LA', 'P'):
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                image = image.convert('RGBA')
+                background.paste(image, mask=image.split()[-1])
+                image = background
+            elif image.mode != 'RGB':
+                image = image.convert('RGB')
+            size = vision_size(image.size, short_side, long_side)
+            if size != image.size:
+                image = image.resize(size, Image.Resampling.LANCZOS)
+
+            buffer = io.BytesIO()
+            image.save(buffer, format='JPEG', quality=quality, optimize=True)
+            data = buffer.getvalue()
+            if passthrough and result["source_bytes"] <= len(data):
+                with open(source_path, "rb") as source:
+                    data = source.read()
+            result.update(ok=True, data=data, size=image.size)
+    except Exception as e:
+        result["error"] = str(e)
+    result["render_ms"] = _ms_since(started)
+    return result
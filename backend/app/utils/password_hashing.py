@@ -0,0 +1,105 @@
+"""
+Bounded executor for bcrypt work.
+
+A bcrypt hash or verify takes a couple of hundred milliseconds of CPU. Run
+inline in an async handler it stalls every other request on the worker, so
+password work is sent to a small dedicated thread pool (bcrypt releases the
+GIL while hashing). Admission is bounded: once PASSWORD_HASH_WORKERS jobs are
+running (by default one per CPU, minus one for the event loop) and
+PASSWORD_HASH_MAX_QUEUE more are waiting, new jobs are rejected
+immediately with PasswordHashingBusy instead of piling up.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from app.config import settings
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+def _percentile(samples, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class PasswordHashPool:
+    """Size-limited thread pool with admission control and latency counters."""
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        self.pending = 0  # Running + queued jobs
+        self.peak_queue_depth = 0
+        self.completed = 0
+        self.rejected = 0
+        self._latency_ms = deque(maxlen=1000)  # Submit to result, including queue wait
+        self._hash_ms = deque(maxlen=1000)  # Time spent in bcrypt itself
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.pending - self.workers)
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """
+        Run a blocking password function on the pool.
+
+        Raises:
+            PasswordHashingBusy: If the queue is already full
+        """
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            logger.warning(f"Password hashing queue full ({self.pending} pending), rejecting request")
+            raise PasswordHashingBusy()
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self._hash_ms.append((time.perf_counter() - started) * 1000)
+
+        self.pending += 1
+        self.peak_queue_depth = max(self.peak_queue_depth, self.queue_depth)
+        submitted = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            self._latency_ms.append((time.perf_counter() - submitted) * 1000)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": min(self.pending, self.workers),
+            "queue_depth": self.queue_depth,
+            "peak_queue_depth": self.peak_queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "latency_p50_ms": round(_percentile(self._latency_ms, 0.50), 1),
+            "latency_p99_ms": round(_percentile(self._latency_ms, 0.99), 1),
+            "hash_p50_ms": round(_percentile(self._hash_ms, 0.50), 1),
+        }
+
+
+# Singleton instance
+password_hash_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS or (os.cpu_count() or 2) - 1,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
@@ -0,0 +1,79 @@
+"""
+Perceptual image hashing and a BK-tree for near-duplicate lookups.
+
+dHash compares neighbouring pixels of a tiny grayscale thumbnail, so
+re-encoding, resizing and small exposure changes flip only a few of its
+64 bits. Similar images are found by Hamming distance between hashes.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+
+HASH_SIZE = 8  # 8x8 comparisons -> 64-bit hash
+
+
+def dhash(image: Image.Image, hash_size: int = HASH_SIZE) -> int:
+    """Difference hash of an image as a hash_size**2-bit integer."""
+    thumbnail = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = np.asarray(thumbnail, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def dhash_file(path: str, hash_size: int = HASH_SIZE) -> int:
+    """dHash of an image file, decoding JPEGs at reduced size where possible."""
+    with Image.open(path) as image:
+        image.draft("L", (hash_size * 16, hash_size * 16))
+        return dhash(ImageOps.exif_transpose(image), hash_size)
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over integer hashes with Hamming distance.
+
+    A search within distance d only descends into children whose edge
+    distance lies within d of the query's distance to the node, which skips
+    most of the tree for small d.
+    """
+
+    def __init__(self):
+        # Node: (hash, items stored under that exact hash, children by edge distance)
+        self._root: Optional[Tuple[int, List[Any], Dict[int, tuple]]] = None
+        self.size = 0
+
+    def add(self, value: int, item: Any):
+        self.size += 1
+        if self._root is None:
+            self._root = (value, [item], {})
+            return
+        node = self._root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, [item], {})
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> Iterator[Tuple[int, Any]]:
+        """Yield (distance, item) for every item within max_distance of value."""
+        if self._root is None:
+            return
+        stack = [self._root]
+        while stack:
+            node_value, items, children = stack.pop()
+            distance = hamming(value, node_value)
+            if distance <= max_distance:
+                for item in items:
+                    yield distance, item
+            for edge, child in children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
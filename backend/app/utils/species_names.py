@@ -0,0 +1,18 @@
+"""Species name normalization shared by cache writes, lookups and migrations."""
+import re
+import unicodedata
+from typing import Optional
+
+
+def normalize_species_name(name: Optional[str]) -> Optional[str]:
+    """Case, width and whitespace-insensitive form of a species or common name (None if blank)."""
+    if not name:
+        return None
+    normalized = re.sub(r"\s+", " ", unicodedata.normalize("NFKC", name)).strip().lower()
+    return normalized or None
+
+
+def contains_pattern(term: str) -> str:
+    """LIKE pattern matching `term` anywhere, with wildcards in the term escaped (ESCAPE '\\')."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
@@ -0,0 +1,73 @@
+"""
+Async token-bucket rate limiter for outbound API calls.
+
+State is kept behind a thread lock rather than in asyncio primitives, so one
+limiter can be shared by the request loop and the scheduler's job loops.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class TokenBucket:
+    """Allow `rate` calls per second on average, with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = max(rate, 1e-6)
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.waited_seconds = 0.0
+        self.pauses = 0
+
+    def _reserve(self) -> float:
+        """Take a token, borrowing against future refills; return how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = max(-self._tokens / self.rate, self._paused_until - now, 0.0)
+            self.acquired += 1
+            self.waited_seconds += wait
+            return wait
+
+    async def acquire(self, max_pause: Optional[float] = None) -> bool:
+        """
+        Wait until a call may be made.
+
+        Returns False instead of waiting if the limiter is paused for longer
+        than `max_pause` seconds (checked again after every sleep).
+        """
+        wait = self._reserve()
+        while wait > 0:
+            if max_pause is not None and self.paused_for() > max_pause:
+                return False
+            await asyncio.sleep(wait)
+            # A pause (e.g. a 429) may have started while we slept
+            wait = self._paused_until - time.monotonic()
+        return True
+
+    def pause(self, seconds: float):
+        """Hold every caller for `seconds`, e.g. for a 429 response's Retry-After."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self.pauses += 1
+
+    def paused_for(self) -> float:
+        """Seconds left on the current pause (0 if not paused)."""
+        return max(0.0, self._paused_until - time.monotonic())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate_per_second": round(self.rate, 3),
+            "capacity": self.capacity,
+            "acquired": self.acquired,
+            "waited_seconds": round(self.waited_seconds, 1),
+            "pauses": self.pauses,
+            "paused_for_seconds": round(self.paused_for(), 1),
+        }
@@ -0,0 +1,133 @@
+"""
+Authenticated-user (principal) cache.
+
+get_current_user used to load the full User row on every authenticated
+request. Routes only need the caller's id (and occasionally email), so the
+auth dependencies now resolve the token subject to an immutable
+AuthenticatedUser snapshot, cached in-process with a TTL and LRU eviction.
+
+Entries are dropped explicitly on password reset and whenever a User row is
+updated or deleted through the ORM (see the mapper listeners at the bottom).
+The TTL bounds staleness for changes made outside this process.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.config import settings
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Lightweight, immutable snapshot of the authenticated user."""
+    id: int
+    email: str
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthenticatedUser":
+        return cls(id=user.id, email=user.email)
+
+
+class PrincipalCache:
+    """Thread-safe TTL + LRU cache of AuthenticatedUser keyed by token subject (email)."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, AuthenticatedUser]]" = OrderedDict()
+        self._keys_by_id: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.token_claims = 0  # Requests resolved from a user_id claim without any lookup
+
+    def get(self, subject: str) -> Optional[AuthenticatedUser]:
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, principal = entry
+            if expires_at <= time.monotonic():
+                self._remove(subject)
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(subject)
+            self.hits += 1
+            return principal
+
+    def put(self, subject: str, principal: AuthenticatedUser):
+        with self._lock:
+            self._remove(subject)
+            self._entries[subject] = (time.monotonic() + self.ttl_seconds, principal)
+            self._keys_by_id[principal.id] = subject
+            while len(self._entries) > self.max_entries:
+                oldest, (_, evicted) = self._entries.popitem(last=False)
+                if self._keys_by_id.get(evicted.id) == oldest:
+                    del self._keys_by_id[evicted.id]
+                self.evictions += 1
+
+    def invalidate(self, subject: str):
+        """Drop the entry for a token subject (email)."""
+        with self._lock:
+            if self._remove(subject):
+                self.invalidations += 1
+
+    def invalidate_user(self, user_id: int):
+        """Drop the entry for a user id, whatever subject it was cached under."""
+        with self._lock:
+            subject = self._keys_by_id.get(user_id)
+            if subject is not None and self._remove(subject):
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_id.clear()
+
+    def _remove(self, subject: str) -> bool:
+        entry = self._entries.pop(subject, None)
+        if entry is None:
+            return False
+        if self._keys_by_id.get(entry[1].id) == subject:
+            del self._keys_by_id[entry[1].id]
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "token_claims": self.token_claims,
+        }
+
+
+# Singleton instance
+principal_cache = PrincipalCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    principal_cache.invalidate_user(target.id)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the legacy FCM send endpoint.
+
+Accepts the same requests PushNotificationService sends to
+https://fcm.googleapis.com/fcm/send ("to" or "registration_ids") and answers
+with FCM-shaped per-token results, after an artificial latency. Tokens that
+start with "invalid-" get NotRegistered, so token cleanup can be exercised.
+
+Usage:
+    python benchmarks/fcm_stub.py                     # Listen on 127.0.0.1:8765
+    python benchmarks/fcm_stub.py --latency-ms 80     # Slower "network"
+
+Then point the API at it:
+    FCM_SEND_URL=http://127.0.0.1:8765/fcm/send FCM_SERVER_KEY=stub
+
+GET /stats returns request and token counters; POST /stats/reset clears them.
+"""
+import argparse
+import asyncio
+import itertools
+
+import uvicorn
+from fastapi import FastAPI, Header, HTTPException, Request
+
+DEFAULT_PORT = 8765
+
+
+def create_app(latency_ms: float = 40.0) -> FastAPI:
+    """Build the stub app. Latency is applied once per request, not per token."""
+    app = FastAPI(title="FCM stub")
+    message_ids = itertools.count(1)
+    stats = {"requests": 0, "tokens": 0, "in_flight": 0, "peak_in_flight": 0}
+
+    @app.post("/fcm/send")
+    async def send(request: Request, authorization: str = Header(None)):
+        if not authorization or not authorization.startswith("key="):
+            raise HTTPException(status_code=401, detail="Missing server key")
+
+        body = await request.json()
+        tokens = body.get("registration_ids") or ([body["to"]] if body.get("to") else [])
+        if not tokens or len(tokens) > 1000:
+            raise HTTPException(status_code=400, detail="Expected 1-1000 recipients")
+
+        stats["requests"] += 1
+        stats["tokens"] += len(tokens)
+        stats["in_flight"] += 1
+        stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(latency_ms / 1000)
+        finally:
+            stats["in_flight"] -= 1
+
+        results = [
+            {"error": "NotRegistered"} if token.startswith("invalid-") else {"message_id": f"0:{next(message_ids)}"}
+            for token in tokens
+        ]
+        return {
+            "multicast_id": next(message_ids),
+            "success": sum(1 for result in results if "message_id" in result),
+            "failure": sum(1 for result in results if "error" in result),
+            "canonical_ids": 0,
+            "results": results,
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        stats.update(requests=0, tokens=0, in_flight=0, peak_in_flight=0)
+        return stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in FCM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="Delay per request")
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args.latency_ms), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Login storm benchmark: latency of non-auth endpoints while bcrypt is busy.
+
+Runs the real app in-process (httpx ASGITransport) against a scratch SQLite
+database, fires a burst of concurrent logins, and meanwhile polls GET /api/v1/health
+at a steady rate. Reports /health p50/p99 and login outcomes for:
+
+- inline: the old behaviour, bcrypt called directly in the login handler
+- pool:   verify_password_async on the bounded password hashing pool
+
+Usage:
+    python benchmarks/login_storm.py
+    python benchmarks/login_storm.py --logins 100 --health 400
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Login storm benchmark")
+    parser.add_argument("--logins", type=int, default=40, help="Concurrent login attempts")
+    parser.add_argument("--health", type=int, default=200, help="Health checks sent during the storm")
+    parser.add_argument("--health-interval-ms", type=float, default=10.0)
+    parser.add_argument("--database-url", default=f"sqlite:///{tempfile.gettempdir()}/login_storm_bench.db")
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ["DATABASE_URL"] = args.database_url
+os.environ["DEBUG"] = "false"  # Keep SQL echo off
+
+import httpx  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.routers import auth as auth_router  # noqa: E402
+from app.utils.auth import get_password_hash, verify_password, verify_password_async  # noqa: E402
+from app.utils.password_hashing import password_hash_pool  # noqa: E402
+from app.utils.rate_limit import limiter  # noqa: E402
+
+EMAIL = "storm@example.com"
+PASSWORD = "correct horse battery staple"
+
+
+async def verify_inline(plain_password: str, hashed_password: str) -> bool:
+    return verify_password(plain_password, hashed_password)
+
+
+def seed():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(email=EMAIL, password_hash=get_password_hash(PASSWORD)))
+    db.commit()
+    db.close()
+
+
+async def login(client: httpx.AsyncClient, statuses: list):
+    response = await client.post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD})
+    statuses.append(response.status_code)
+
+
+async def health(client: httpx.AsyncClient, latencies: list, arrival: float):
+    await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+    response = await client.get("/api/v1/health")
+    response.raise_for_status()
+    latencies.append((time.perf_counter() - arrival) * 1000)
+
+
+async def run(client: httpx.AsyncClient, mode: str):
+    auth_router.verify_password_async = verify_inline if mode == "inline" else verify_password_async
+
+    statuses, latencies = [], []
+    started = time.perf_counter()
+    interval = args.health_interval_ms / 1000
+    await asyncio.gather(
+        *[login(client, statuses) for _ in range(args.logins)],
+        *[health(client, latencies, started + i * interval) for i in range(args.health)],
+    )
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    outcomes = {code: statuses.count(code) for code in sorted(set(statuses))}
+    print(
+        f"{mode:>6}: {elapsed:.2f}s | /health p50={statistics.median(latencies):.0f}ms "
+        f"p99={latencies[int(len(latencies) * 0.99) - 1]:.0f}ms | logins {outcomes}"
+    )
+
+
+async def main():
+    seed()
+    limiter.enabled = False
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{args.logins} concurrent logins + {args.health} health checks every {args.health_interval_ms}ms")
+        await run(client, "inline")
+        await run(client, "pool")
+    print(f"pool stats: {password_hash_pool.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
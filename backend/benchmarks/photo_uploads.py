@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Concurrent photo upload benchmark: throughput, event-loop latency and memory.
+
+Generates large synthetic camera-style JPEGs, then runs the real app in-process
+(httpx ASGITransport) against a scratch SQLite database and uploads them
+concurrently to POST /api/v1/plants/upload-photo while polling GET /api/v1/health.
+Each mode runs in its own subprocess so peak RSS figures are not shared:
+
+- inline: the old behaviour, whole upload read into memory and PIL run on the event loop
+- pool:   upload spooled to disk in chunks, compression in the image worker processes
+
+Reports uploads/s, /health p50/p99, upload outcomes, peak RSS of the API
+process and of the worker processes, and per-stage timings for the pool. The
+client runs in the API process, so its multipart request bodies are included
+in the API peak RSS for both modes.
+
+Usage:
+    python benchmarks/photo_uploads.py
+    python benchmarks/photo_uploads.py --uploads 48 --width 4032 --height 3024
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Concurrent photo upload benchmark")
+    parser.add_argument("--uploads", type=int, default=24, help="Concurrent uploads")
+    parser.add_argument("--distinct", type=int, default=4, help="Distinct source images to generate")
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    parser.add_argument("--health", type=int, default=200, help="Health checks sent during the uploads")
+    parser.add_argument("--health-interval-ms", type=float, default=20.0)
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "photo_upload_bench"))
+    parser.add_argument("--mode", choices=["inline", "pool"], help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+args = parse_args()
+
+
+def generate_images():
+    """Write --distinct noisy JPEGs (noise keeps them realistically large)."""
+    import numpy as np
+    from PIL import Image
+
+    sources = os.path.join(args.workdir, "sources")
+    os.makedirs(sources, exist_ok=True)
+    paths = []
+    rng = np.random.default_rng(42)
+    for i in range(args.distinct):
+        path = os.path.join(sources, f"photo_{args.width}x{args.height}_{i}.jpg")
+        if not os.path.exists(path):
+            gradient = np.linspace(0, 255, args.width, dtype=np.float32)[None, :, None]
+            noise = rng.normal(0, 40, (args.height, args.width, 3)).astype(np.float32)
+            pixels = np.clip(gradient + noise + i * 20, 0, 255).astype(np.uint8)
+            Image.fromarray(pixels, "RGB").save(path, "JPEG", quality=92)
+        paths.append(path)
+    return paths
+
+
+def peak_rss_mb(who) -> float:
+    return resource.getrusage(who).ru_maxrss / 1024  # KiB on Linux
+
+
+def reset_peak_rss():
+    """Reset VmHWM to the current RSS so the run's own high-water mark is measured."""
+    with open("/proc/self/clear_refs", "w") as refs:
+        refs.write("5")
+
+
+def current_peak_rss_mb() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_child(mode: str, paths):
+    """Run one mode in this (fresh) process and print a JSON result line."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{args.workdir}/photo_upload_bench.db"
+    os.environ["UPLOAD_DIR"] = os.path.join(args.workdir, f"photos_{mode}")
+    os.environ["DEBUG"] = "false"  # Keep SQL echo off
+
+    import httpx
+    from PIL import Image, ImageOps
+
+    from app.database import Base, SessionLocal, engine
+    from app.main import app
+    from app.models.user import User
+    from app.services.photo_storage import photo_storage
+    from app.utils.auth import create_access_token, get_password_hash
+    from app.utils.rate_limit import limiter
+
+    async def save_photo_inline(file, plant_id: int) -> str:
+        """The pre-pool implementation: read everything, process on the loop."""
+        unique_filename = f"plant_{plant_id}_{uuid.uuid4().hex}.jpg"
+        file_path = photo_storage.upload_dir / unique_filename
+        contents = await file.read()
+        image = Image.open(io.BytesIO(contents))
+        image = ImageOps.exif_transpose(image)
+        if image.size[0] > photo_storage.max_size[0] or image.size[1] > photo_storage.max_size[1]:
+            image.thumbnail(photo_storage.max_size, Image.Resampling.LANCZOS)
+        image.save(file_path, "JPEG", quality=85, optimize=True)
+        return f"/photos/{unique_filename}"
+
+    if mode == "inline":
+        photo_storage.save_photo = save_photo_inline
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(email="uploads@example.com", password_hash=get_password_hash("bench-password")))
+    db.commit()
+    db.close()
+    token = create_access_token({"sub": "uploads@example.com"})
+    limiter.enabled = False
+
+    payloads = [open(path, "rb").read() for path in paths]
+    payload_bytes = sum(len(payloads[i % len(payloads)]) for i in range(args.uploads))
+    reset_peak_rss()
+    baseline_rss = current_peak_rss_mb()
+
+    async def upload(client, i, statuses):
+        body = payloads[i % len(payloads)]
+        response = await client.post(
+            "/api/v1/plants/upload-photo",
+            files={"file": (f"upload_{i}.jpg", body, "image/jpeg")},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        statuses.append(response.status_code)
+
+    async def health(client, latencies, arrival):
+        await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+        response = await client.get("/api/v1/health")
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - arrival) * 1000)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+            if mode == "pool":
+                # Warm the worker processes so spawn cost is not counted
+                await upload(client, 0, [])
+            statuses, latencies = [], []
+            interval = args.health_interval_ms / 1000
+            started = time.perf_counter()
+            await asyncio.gather(
+                *[upload(client, i, statuses) for i in range(args.uploads)],
+                *[health(client, latencies, started + i * interval) for i in range(args.health)],
+            )
+            return time.perf_counter() - started, statuses, latencies
+
+    elapsed, statuses, latencies = asyncio.run(main())
+    stats = photo_storage.stats()
+    if photo_storage._executor is not None:
+        photo_storage._executor.shutdown(wait=True)  # Reap workers so RUSAGE_CHILDREN covers them
+    latencies.sort()
+    print(json.dumps({
+        "mode": mode,
+        "elapsed": elapsed,
+        "payload_mb": payload_bytes / 1024 / 1024,
+        "statuses": {str(code): statuses.count(code) for code in sorted(set(statuses))},
+        "health_p50": statistics.median(latencies),
+        "health_p99": latencies[int(len(latencies) * 0.99) - 1],
+        "baseline_rss_mb": baseline_rss,
+        "peak_rss_mb": current_peak_rss_mb(),
+        "worker_peak_rss_mb": peak_rss_mb(resource.RUSAGE_CHILDREN) if mode == "pool" else 0.0,
+        "stages": stats["stages"] if mode == "pool" else None,
+    }))
+
+
+def main():
+    os.makedirs(args.workdir, exist_ok=True)
+    paths = generate_images()
+
+    if args.mode:
+        run_child(args.mode, paths)
+        return
+
+    print(
+        f"{args.uploads} concurrent uploads of {args.width}x{args.height} JPEGs "
+        f"+ {args.health} health checks every {args.health_interval_ms}ms"
+    )
+    for mode in ("inline", "pool"):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), *sys.argv[1:], "--mode", mode],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{mode:>6}: {result['elapsed']:.2f}s ({args.uploads / result['elapsed']:.1f} uploads/s, "
+            f"{result['payload_mb']:.0f}MB in) | /health p50={result['health_p50']:.0f}ms "
+            f"p99={result['health_p99']:.0f}ms | uploads {result['statuses']} | "
+            f"API peak RSS {result['peak_rss_mb']:.0f}MB (+{result['peak_rss_mb'] - result['baseline_rss_mb']:.0f}MB)"
+            + (f", worker peak RSS {result['worker_peak_rss_mb']:.0f}MB" if mode == "pool" else "")
+        )
+        if result["stages"]:
+            print("        stages: " + ", ".join(
+                f"{stage} p50={timing['p50_ms']}ms p95={timing['p95_ms']}ms"
+                for stage, timing in result["stages"].items()
+            ))
+
+
+if __name__ == "__main__":
+    main()
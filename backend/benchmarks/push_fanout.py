@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Load test for push notification fan-out against the local FCM stub.
+
+Seeds a scratch database with users and device tokens, starts
+benchmarks/fcm_stub.py in-process, and compares:
+
+- sequential: the old path, one FCM request per token per reminder, awaited
+  one after another (run on a sample of jobs and extrapolated)
+- dispatcher: push_dispatcher.dispatch() with coalescing, multicast and the
+  bounded worker pool
+
+Usage:
+    python benchmarks/push_fanout.py
+    python benchmarks/push_fanout.py --users 5000 --reminders-per-user 3 --latency-ms 60
+
+Never point --database-url at a real database; the script drops and recreates
+its tables.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Push fan-out load test")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--tokens-per-user", type=int, default=2)
+    parser.add_argument("--reminders-per-user", type=int, default=2)
+    parser.add_argument("--invalid-ratio", type=float, default=0.05, help="Share of tokens the stub rejects")
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--sequential-sample", type=int, default=100, help="Jobs sent the old way")
+    parser.add_argument("--database-url", default=f"sqlite:///{tempfile.gettempdir()}/push_fanout_bench.db")
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ["DATABASE_URL"] = args.database_url
+os.environ["FCM_SEND_URL"] = f"http://127.0.0.1:{args.port}/fcm/send"
+os.environ["FCM_SERVER_KEY"] = "stub"
+os.environ["DEBUG"] = "false"  # Keep SQL echo off
+
+import uvicorn  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import (  # noqa: E402,F401
+    care_recommendation, enrichment, feeding, notification, password_reset, photo,
+    plant, reminder, room, tips, user, watering,
+)
+from app.models.notification import NotificationToken, Platform  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.push_dispatch import PushJob, push_dispatcher  # noqa: E402
+from app.services.push_notification_service import push_notification_service  # noqa: E402
+from app.utils.http_client import HOST_PROFILES, HostProfile, http_clients  # noqa: E402
+
+from fcm_stub import create_app  # noqa: E402
+
+# Let the local pool open as many connections as the dispatcher has workers
+HOST_PROFILES["127.0.0.1"] = HostProfile(max_connections=push_dispatcher.concurrency, max_keepalive=push_dispatcher.concurrency)
+
+
+def seed(db):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    invalid_every = int(1 / args.invalid_ratio) if args.invalid_ratio > 0 else 0
+    users = [
+        {"email": f"bench{i}@example.com", "password_hash": "x"}
+        for i in range(args.users)
+    ]
+    db.bulk_insert_mappings(User, users)
+    user_ids = [user_id for (user_id,) in db.query(User.id).order_by(User.id)]
+
+    tokens = []
+    for user_id in user_ids:
+        for n in range(args.tokens_per_user):
+            index = len(tokens)
+            prefix = "invalid-" if invalid_every and index % invalid_every == 0 else "tok-"
+            tokens.append({
+                "user_id": user_id,
+                "device_id": f"device-{n}",
+                "platform": Platform.ANDROID.value if n % 2 == 0 else Platform.IOS.value,
+                "token": f"{prefix}{user_id}-{n}",
+                "active": True,
+            })
+    db.bulk_insert_mappings(NotificationToken, tokens)
+    db.commit()
+    return user_ids
+
+
+def make_jobs(user_ids):
+    return [
+        PushJob(
+            user_id=user_id,
+            title=f"Reminder: Water plant {n} today",
+            body=f"Your plant 'plant {n}' needs watering today!",
+            data={"plant_id": user_id * 100 + n, "deep_link": f"/plants/{user_id * 100 + n}"},
+            priority="normal",
+        )
+        for user_id in user_ids
+        for n in range(args.reminders_per_user)
+    ]
+
+
+async def run_sequential(db, jobs):
+    """The pre-dispatcher path: one awaited FCM request per token per reminder."""
+    started = time.perf_counter()
+    requests = 0
+    for job in jobs:
+        for token in db.query(NotificationToken).filter(
+            NotificationToken.user_id == job.user_id, NotificationToken.active == True
+        ):
+            payload = push_notification_service.build_payload(
+                job.title, job.body, job.data, Platform(token.platform), job.priority
+            )
+            await push_notification_service.send_multicast([token.token], payload)
+            requests += 1
+    return time.perf_counter() - started, requests
+
+
+async def stub_stats():
+    client = http_clients.get(os.environ["FCM_SEND_URL"])
+    base = f"http://127.0.0.1:{args.port}"
+    stats = (await client.get(f"{base}/stats")).json()
+    await client.post(f"{base}/stats/reset")
+    return stats
+
+
+async def main():
+    db = SessionLocal()
+    try:
+        user_ids = seed(db)
+        jobs = make_jobs(user_ids)
+        print(f"Seeded {len(user_ids)} users, {len(user_ids) * args.tokens_per_user} tokens, {len(jobs)} reminders")
+
+        sample = jobs[:args.sequential_sample]
+        seconds, requests = await run_sequential(db, sample)
+        await stub_stats()
+        estimate = seconds / max(len(sample), 1) * len(jobs)
+        print(f"sequential: {len(sample)} jobs, {requests} requests in {seconds:.2f}s "
+              f"-> ~{estimate:.1f}s for all {len(jobs)} jobs")
+
+        started = time.perf_counter()
+        report = await push_dispatcher.dispatch(db, jobs, coalesce=True)
+        seconds = time.perf_counter() - started
+        stats = await stub_stats()
+        print(f"dispatcher: {len(jobs)} jobs in {seconds:.2f}s ({estimate / seconds:.0f}x faster)")
+        print(f"  report: {report.to_dict()}")
+        print(f"  stub:   requests={stats['requests']} tokens={stats['tokens']} peak_in_flight={stats['peak_in_flight']}")
+
+        inactive = db.query(NotificationToken).filter(NotificationToken.active == False).count()
+        print(f"  tokens deactivated: {inactive}")
+    finally:
+        db.close()
+        await http_clients.aclose()
+
+
+if __name__ == "__main__":
+    server = uvicorn.Server(uvicorn.Config(
+        create_app(args.latency_ms), host="127.0.0.1", port=args.port, log_level="warning"
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    asyncio.run(main())
+    server.should_exit = True
+    thread.join()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Pet toxicity lookup benchmark: linear table scans vs the compiled ToxicityMatcher.
+
+First runs a differential check: every entry and alias of TOXICITY_DATABASE
+and COMMON_NAME_ALIASES (as-is, re-cased, padded, embedded in longer names,
+and every alias substring), plus random combinations of species, common
+name and genus, are looked up with both implementations, which must return
+the very same ToxicityInfo object or raise the same exception (a
+whitespace-only species raises IndexError in both). Any difference is
+printed and the script exits with status 1.
+
+Then times both on a mix like /plants/identify produces (five candidates per
+request, a third of them not in the tables).
+
+Usage:
+    python benchmarks/toxicity_lookup.py
+    python benchmarks/toxicity_lookup.py --iterations 20000 --random-cases 50000
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.pet_toxicity import (  # noqa: E402
+    COMMON_NAME_ALIASES, TOXICITY_DATABASE, toxicity_matcher,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Pet toxicity lookup benchmark")
+    parser.add_argument("--iterations", type=int, default=5000, help="Timed passes over the lookup mix")
+    parser.add_argument("--random-cases", type=int, default=20000, help="Random lookups in the differential check")
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+def legacy_normalize(name):
+    return name.lower().strip()
+
+
+def legacy_lookup(species=None, common_name=None, genus=None):
+    """PetToxicityService._lookup_in_database before the tables were compiled."""
+    if species:
+        if species in TOXICITY_DATABASE:
+            return TOXICITY_DATABASE[species]
+        for db_name, info in TOXICITY_DATABASE.items():
+            if legacy_normalize(species) == legacy_normalize(db_name):
+                return info
+
+    if common_name:
+        normalized_common = legacy_normalize(common_name)
+        if normalized_common in COMMON_NAME_ALIASES:
+            scientific = COMMON_NAME_ALIASES[normalized_common]
+            if scientific in TOXICITY_DATABASE:
+                return TOXICITY_DATABASE[scientific]
+        for alias, scientific in COMMON_NAME_ALIASES.items():
+            if alias in normalized_common or normalized_common in alias:
+                if scientific in TOXICITY_DATABASE:
+                    return TOXICITY_DATABASE[scientific]
+
+    if genus:
+        if genus in TOXICITY_DATABASE:
+            return TOXICITY_DATABASE[genus]
+        for db_name, info in TOXICITY_DATABASE.items():
+            if legacy_normalize(genus) == legacy_normalize(db_name):
+                return info
+
+    if species and " " in species:
+        extracted_genus = species.split()[0]
+        if extracted_genus in TOXICITY_DATABASE:
+            return TOXICITY_DATABASE[extracted_genus]
+
+    return None
+
+
+def variants(name):
+    return [name, name.upper(), name.title(), f"  {name} ", f"{name}\t", f"my {name}", f"{name} plant", f"{name}s"]
+
+
+def name_pool(rng):
+    """Names built from the tables, plus near misses and junk."""
+    pool = [None, "", " ", "plant", "xyz", "Unknown species", "Ficus", "ficus"]
+    for name in list(TOXICITY_DATABASE) + list(COMMON_NAME_ALIASES):
+        pool.extend(variants(name))
+        pool.append(f"{name.split()[0]} sp.")
+    for alias in COMMON_NAME_ALIASES:
+        pool.extend(alias[start:stop] for start in range(len(alias)) for stop in range(start + 1, len(alias) + 1))
+    for _ in range(200):
+        pool.append("".join(rng.choice(string.ascii_lowercase + " -") for _ in range(rng.randint(1, 12))))
+    return pool
+
+
+def outcome(lookup, species, common_name, genus):
+    try:
+        return lookup(species, common_name, genus)
+    except Exception as e:
+        return type(e)
+
+
+def differential_check(rng, random_cases):
+    pool = name_pool(rng)
+    cases = [(name, None, None) for name in pool]
+    cases += [(None, name, None) for name in pool]
+    cases += [(None, None, name) for name in pool]
+    cases += [(rng.choice(pool), rng.choice(pool), rng.choice(pool)) for _ in range(random_cases)]
+
+    mismatches = 0
+    for species, common_name, genus in cases:
+        expected = outcome(legacy_lookup, species, common_name, genus)
+        actual = outcome(toxicity_matcher.lookup, species, common_name, genus)
+        if actual is not expected:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"MISMATCH species={species!r} common_name={common_name!r} genus={genus!r}: "
+                      f"expected {expected}, got {actual}")
+    print(f"Differential check: {len(cases)} lookups, {mismatches} mismatches")
+    return mismatches == 0
+
+
+def identify_mix(rng):
+    """(species, common_name, genus) triples like the ones PlantNet candidates produce."""
+    hits = [
+        ("Monstera deliciosa", "Swiss cheese plant", "Monstera"),
+        ("Epipremnum aureum", "Golden pothos", "Epipremnum"),
+        ("Chlorophytum comosum", "Spider plant", "Chlorophytum"),
+        ("Ficus lyrata", "Fiddle-leaf fig", "Ficus"),
+        ("Sansevieria trifasciata", "Snake plant", "Sansevieria"),
+        ("Dracaena marginata", "Madagascar dragon tree", "Dracaena"),
+    ]
+    misses = [
+        ("Alocasia zebrina", "Zebrina elephant ear", "Alocasia"),
+        ("Begonia maculata", "Polka dot begonia", "Begonia"),
+        ("Strelitzia nicolai", "Giant white bird of paradise", "Strelitzia"),
+    ]
+    return [rng.choice(hits if rng.random() < 2 / 3 else misses) for _ in range(5)]
+
+
+def timed(label, lookup, mix, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        for species, common_name, genus in mix:
+            lookup(species, common_name, genus)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    timings.sort()
+    p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+    print(f"{label:>9}: per request (5 candidates) p50={statistics.median(timings):7.1f}us  p95={p95:7.1f}us")
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    if not differential_check(rng, args.random_cases):
+        sys.exit(1)
+
+    mix = identify_mix(rng)
+    print(f"{len(TOXICITY_DATABASE)} entries, {len(COMMON_NAME_ALIASES)} aliases; mix: {[m[0] for m in mix]}")
+    timed("legacy", legacy_lookup, mix, args.iterations)
+    timed("compiled", toxicity_matcher.lookup, mix, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Vision request payload benchmark: bytes sent and upstream latency.
+
+Serves a stand-in for the OpenAI chat completions endpoint on localhost
+(uvicorn in a background thread). Like the real API it reads the whole
+body, decodes the base64 photo and decodes the image before answering.
+Loopback is far faster than a phone-to-cloud uplink, so --uplink-mbps delays
+each response by the time the body would take to upload at that rate (0
+turns it off).
+
+Each photo set is sent three ways, one request at a time:
+
+- legacy:  the old behaviour, whole file read and base64-encoded on every request
+- cold:    VisionPayloadBuilder with an empty cache (downscale + re-encode each time)
+- warm:    VisionPayloadBuilder with the encoded payload already cached
+
+for two photo sets: full-size camera JPEGs and photos as the upload pipeline
+stores them (compress_photo, 1200 px). Reports request body size, payload
+preparation time and upstream round trip (p50/p95).
+
+Usage:
+    python benchmarks/vision_payload.py
+    python benchmarks/vision_payload.py --requests 40 --uplink-mbps 20
+"""
+import argparse
+import asyncio
+import base64
+import io
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Vision request payload benchmark")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per mode and photo set")
+    parser.add_argument("--distinct", type=int, default=4, help="Distinct photos per set")
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    parser.add_argument("--uplink-mbps", type=float, default=10.0, help="Emulated client uplink; 0 = loopback speed")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "vision_payload_bench"))
+    return parser.parse_args()
+
+
+args = parse_args()
+os.makedirs(args.workdir, exist_ok=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{args.workdir}/vision_payload_bench.db"
+os.environ["UPLOAD_DIR"] = os.path.join(args.workdir, "photos")
+os.environ["DEBUG"] = "false"  # Keep SQL echo off
+
+import uvicorn  # noqa: E402
+from PIL import Image  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from app.services.image_diagnosis import VISION_MODEL, image_diagnosis  # noqa: E402
+from app.services.vision_payload import vision_payload  # noqa: E402
+from app.utils.http_client import http_clients  # noqa: E402
+from app.utils.image_processing import compress_photo  # noqa: E402
+
+COMPLETION = "1. **Overwatering**: Let the top inch of soil dry out.\n2. **Low light**: Move it closer to a window."
+
+body_sizes = []
+
+
+async def chat_completions(request: Request):
+    body = await request.body()
+    body_sizes.append(len(body))
+    if args.uplink_mbps > 0:
+        await asyncio.sleep(len(body) * 8 / (args.uplink_mbps * 1_000_000))
+    payload = json.loads(body)
+    data_url = payload["messages"][1]["content"][1]["image_url"]["url"]
+    Image.open(io.BytesIO(base64.b64decode(data_url.split(",", 1)[1]))).load()
+    return JSONResponse({"choices": [{"message": {"content": COMPLETION}}]})
+
+
+def start_standin() -> str:
+    """Run the stand-in endpoint on a free localhost port; returns its URL."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    app = Starlette(routes=[Route("/v1/chat/completions", chat_completions, methods=["POST"])])
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}/v1/chat/completions"
+
+
+def generate_photos():
+    """Write --distinct noisy camera JPEGs and their stored (compressed) versions."""
+    import numpy as np
+
+    camera_dir = os.path.join(args.workdir, "camera")
+    stored_dir = os.path.join(args.workdir, "stored")
+    os.makedirs(camera_dir, exist_ok=True)
+    os.makedirs(stored_dir, exist_ok=True)
+    camera, stored = [], []
+    rng = np.random.default_rng(42)
+    for i in range(args.distinct):
+        path = os.path.join(camera_dir, f"photo_{args.width}x{args.height}_{i}.jpg")
+        if not os.path.exists(path):
+            gradient = np.linspace(0, 255, args.width, dtype=np.float32)[None, :, None]
+            noise = rng.normal(0, 40, (args.height, args.width, 3)).astype(np.float32)
+            pixels = np.clip(gradient + noise + i * 20, 0, 255).astype(np.uint8)
+            Image.fromarray(pixels, "RGB").save(path, "JPEG", quality=92)
+        camera.append(path)
+
+        stored_path = os.path.join(stored_dir, f"stored_{i}.jpg")
+        if not os.path.exists(stored_path):
+            compress_photo(path, stored_path)
+        stored.append(stored_path)
+    return {"camera": camera, "stored": stored}
+
+
+async def legacy_analyze(path: str):
+    """The pre-builder request: whole file base64-encoded on every call. Returns (prepare_ms, upstream_ms)."""
+    started = time.perf_counter()
+    with open(path, "rb") as image_file:
+        base64_image = base64.standard_b64encode(image_file.read()).decode("utf-8")
+    body = {
+        "model": VISION_MODEL,
+        "messages": [
+            {"role": "system", "content": "You are an expert plant pathologist and horticulturist."},
+            {"role": "user", "content": [
+                {"type": "text", "text": "This is a Fern. The owner says: 'yellow leaves'."},
+                {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}},
+            ]},
+        ],
+        "max_tokens": 1000,
+    }
+    prepared = time.perf_counter()
+    client = http_clients.get(image_diagnosis.base_url)
+    response = await client.post(
+        image_diagnosis.base_url,
+        headers={"Authorization": f"Bearer {image_diagnosis.api_key}", "Content-Type": "application/json"},
+        json=body,
+    )
+    response.raise_for_status()
+    return (prepared - started) * 1000, (time.perf_counter() - prepared) * 1000
+
+
+async def builder_analyze(path: str, image_hash: str, cold: bool):
+    """The current request path. Returns (prepare_ms, upstream_ms)."""
+    if cold:
+        vision_payload.cache.clear()
+    started = time.perf_counter()
+    results = await image_diagnosis._analyze(path, image_hash, "Fern", "yellow leaves")
+    total_ms = (time.perf_counter() - started) * 1000
+    if results is None:
+        raise RuntimeError("Stand-in request failed")
+    upstream_ms = image_diagnosis._upstream_ms[-1]
+    return total_ms - upstream_ms, upstream_ms
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_mode(mode: str, paths):
+    hashes = {path: await vision_payload.hash_image(path) for path in paths}
+    if mode == "warm":
+        for path in paths:
+            await vision_payload.build(path, hashes[path])
+
+    body_sizes.clear()
+    prepare, upstream = [], []
+    for i in range(args.requests):
+        path = paths[i % len(paths)]
+        if mode == "legacy":
+            prepare_ms, upstream_ms = await legacy_analyze(path)
+        else:
+            prepare_ms, upstream_ms = await builder_analyze(path, hashes[path], cold=(mode == "cold"))
+        prepare.append(prepare_ms)
+        upstream.append(upstream_ms)
+    return {
+        "body_kb": statistics.mean(body_sizes) / 1024,
+        "prepare_p50": percentile(prepare, 0.50),
+        "upstream_p50": percentile(upstream, 0.50),
+        "upstream_p95": percentile(upstream, 0.95),
+        "total_p50": percentile([p + u for p, u in zip(prepare, upstream)], 0.50),
+    }
+
+
+async def main():
+    photo_sets = generate_photos()
+    image_diagnosis.base_url = start_standin()
+    image_diagnosis.api_key = "bench"
+
+    uplink = f"{args.uplink_mbps:g} Mbit/s uplink" if args.uplink_mbps > 0 else "loopback speed"
+    print(f"{args.requests} sequential requests per mode, {args.distinct} photos per set, {uplink}")
+    print(f"Target: short side <= {vision_payload.short_side}, long side <= {vision_payload.long_side}, "
+          f"JPEG quality {vision_payload.quality}")
+    for name, paths in photo_sets.items():
+        size = Image.open(paths[0]).size
+        source_kb = statistics.mean(os.path.getsize(path) for path in paths) / 1024
+        print(f"\n{name} photos ({size[0]}x{size[1]}, {source_kb:.0f} KB on disk)")
+        print(f"{'mode':<8}{'body KB':>10}{'prepare p50':>14}{'upstream p50':>15}{'upstream p95':>15}{'total p50':>12}")
+        for mode in ("legacy", "cold", "warm"):
+            result = await run_mode(mode, paths)
+            print(f"{mode:<8}{result['body_kb']:>10.0f}{result['prepare_p50']:>12.1f}ms"
+                  f"{result['upstream_p50']:>13.1f}ms{result['upstream_p95']:>13.1f}ms{result['total_p50']:>10.1f}ms")
+
+    print(f"\nimage_diagnosis: {json.dumps(image_diagnosis.stats(), indent=2)}")
+    await http_clients.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,6 +6,8 @@ from app.models.watering import WateringSchedule, WateringHistory
 from app.models.feeding import FeedingSchedule, FeedingHistory
 from app.models.photo import PlantPhoto, DiagnosisSolution
 from app.models.reminder import Reminder
+# Registers the notification tables the reminder rows reference
+from app.models.notification import Notification, NotificationPreferences, NotificationToken  # noqa: F401
 from app.models.enrichment import PlantEnrichment, EnrichmentLog, SpeciesCache
 
 print("Creating database tables...")
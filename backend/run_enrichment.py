@@ -7,6 +7,7 @@ Usage:
     python run_enrichment.py --max 10     # Limit to 10 plants
     python run_enrichment.py --stats      # Show enrichment stats only
     python run_enrichment.py --reset-daily  # Reset today's API counter (for testing)
+    python run_enrichment.py --backfill   # Apply cached species data to all matching plants (no API calls)
 
 This script uses the Perenual API (100 free requests/day) to:
 1. Find plants missing care data (watering schedule, lighting, etc.)
@@ -45,6 +46,8 @@ def ensure_tables_exist():
     from app.models.feeding import FeedingSchedule, FeedingHistory
     from app.models.photo import PlantPhoto, DiagnosisSolution
     from app.models.reminder import Reminder
+    # Registers the notification tables the reminder rows reference
+    from app.models.notification import Notification, NotificationPreferences, NotificationToken  # noqa: F401
     from app.models.enrichment import PlantEnrichment, EnrichmentLog, SpeciesCache
 
     Base.metadata.create_all(bind=engine)
@@ -62,7 +65,7 @@ def show_stats():
         print(f"Plants pending:           {stats['plants_pending']}")
         print(f"Cached species:           {stats['cached_species']}")
         print(f"\n--- Today's API Usage ---")
-        print(f"Requests used:            {stats['today_requests_used']}/100")
+        print(f"Requests used:            {stats['today_requests_used']}/{data_scraper.daily_limit}")
         print(f"Requests remaining:       {stats['today_requests_remaining']}")
         print(f"Status:                   {stats['today_status']}")
         print()
@@ -93,6 +96,22 @@ def reset_daily_counter():
         db.close()
 
 
+def run_backfill():
+    """Apply every cached species to the plants that match it."""
+    db = SessionLocal()
+    try:
+        report = data_scraper.backfill_from_species_cache(db)
+        print("\n=== Species Cache Backfill ===")
+        print(f"Plants enriched:            {report.plants_enriched}")
+        print(f"Plant records updated:      {report.plants_updated}")
+        print(f"Enrichment rows created:    {report.enrichments_created}")
+        print(f"Watering schedules created: {report.watering_schedules_created}")
+        print(f"Elapsed:                    {report.elapsed_ms:.0f}ms")
+        print()
+    finally:
+        db.close()
+
+
 async def run_enrichment(max_plants: int = None):
     """Run the enrichment process."""
     print(f"\n=== Starting Plant Data Enrichment ===")
@@ -112,6 +131,18 @@ async def run_enrichment(max_plants: int = None):
         print(f"API requests used: {result.get('api_requests_used', 0)}")
         print(f"API remaining:     {result.get('api_requests_remaining', 0)}")
 
+        report = result.get('report')
+        if report:
+            print("\n--- Throughput ---")
+            print(f"Species:           {report['species']} ({report['cache_hit_species']} cached, "
+                  f"{report['api_species']} looked up, {report['skipped_species']} left for next run)")
+            print(f"Plants from cache: {report['plants_from_cache']}")
+            print(f"Plants from API:   {report['plants_from_api']}")
+            print(f"Plants backfilled: {report['plants_backfilled']}")
+            print(f"Requests/plant:    {report['requests_per_enriched_plant']}")
+            print(f"Rate limited:      {report['rate_limited']}")
+            print(f"Elapsed:           {report['elapsed_ms'] / 1000:.1f}s ({report['plants_per_minute']} plants/min)")
+
         if result.get('results'):
             print(f"\n--- Details ---")
             for r in result['results']:
@@ -142,6 +173,10 @@ def main():
         '--reset-daily', action='store_true',
         help='Reset daily API counter (for testing)'
     )
+    parser.add_argument(
+        '--backfill', action='store_true',
+        help='Apply cached species data to all matching plants (no API calls)'
+    )
 
     args = parser.parse_args()
 
@@ -156,6 +191,10 @@ def main():
         reset_daily_counter()
         return
 
+    if args.backfill:
+        run_backfill()
+        return
+
     # Run enrichment
     asyncio.run(run_enrichment(max_plants=args.max))
 
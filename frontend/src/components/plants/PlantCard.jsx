@@ -48,7 +48,7 @@ export default function PlantCard({ plant }) {
   };
 
   // Default plant image if no photo
-  const plantImage = getPhotoUrl(plant.photo_url) || 'https://via.placeholder.com/300x200?text=Plant';
+  const plantImage = getPhotoUrl(plant.photo_url, 400) || 'https://via.placeholder.com/300x200?text=Plant';
 
   return (
     <Card
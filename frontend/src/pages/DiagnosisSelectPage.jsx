@@ -480,7 +480,7 @@ export default function DiagnosisSelectPage() {
                     <CardMedia
                       component="img"
                       height="160"
-                      image={getPhotoUrl(plant.photo_url) || 'https://via.placeholder.com/300x160?text=Plant'}
+                      image={getPhotoUrl(plant.photo_url, 400) || 'https://via.placeholder.com/300x160?text=Plant'}
                       alt={plant.name}
                       sx={{ objectFit: 'cover' }}
                     />
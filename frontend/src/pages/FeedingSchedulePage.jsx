@@ -85,7 +85,7 @@ function PlantFeedingCard({ plant }) {
   const isDueToday = daysUntil === 0;
   const isDueSoon = daysUntil !== null && daysUntil > 0 && daysUntil <= 3;
 
-  const plantImage = getPhotoUrl(plant.photo_url) || 'https://via.placeholder.com/100x100?text=Plant';
+  const plantImage = getPhotoUrl(plant.photo_url, 200) || 'https://via.placeholder.com/100x100?text=Plant';
 
   return (
     <>
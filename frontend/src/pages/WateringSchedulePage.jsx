@@ -83,7 +83,7 @@ function PlantWateringCard({ plant }) {
   const isDueToday = daysUntil === 0;
   const isDueSoon = daysUntil !== null && daysUntil > 0 && daysUntil <= 2;
 
-  const plantImage = getPhotoUrl(plant.photo_url) || 'https://via.placeholder.com/100x100?text=Plant';
+  const plantImage = getPhotoUrl(plant.photo_url, 200) || 'https://via.placeholder.com/100x100?text=Plant';
 
   return (
     <>
@@ -4,14 +4,14 @@ const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api/v1';
 const API_BASE_URL = API_URL.replace('/api/v1', '');
 
 // Helper to get full URL for photos served by the backend
-export const getPhotoUrl = (photoPath) => {
+export const getPhotoUrl = (photoPath, width) => {
   if (!photoPath) return null;
   // If it's already a full URL, return as-is
   if (photoPath.startsWith('http://') || photoPath.startsWith('https://')) {
     return photoPath;
   }
-  // Otherwise, prefix with the backend base URL
-  return `${API_BASE_URL}${photoPath}`;
+  // Otherwise, prefix with the backend base URL (optionally asking for a smaller size)
+  return width ? `${API_BASE_URL}${photoPath}?w=${width}` : `${API_BASE_URL}${photoPath}`;
 };
 
 // Create axios instance